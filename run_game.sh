@@ -1,12 +1,22 @@
 #!/bin/bash
 
 # Quick start script for the Pacman vs Ghost Arena
-# Usage: ./run_game.sh <seeker_id> <hider_id> [arena options]
+# Usage: ./run_game.sh [--warm] <seeker_id> <hider_id> [arena options]
+#
+# --warm runs the game on a background server that keeps the arena loaded
+# (src/warm_server.py), so repeated runs skip interpreter and import startup.
+# Stop it with: python src/warm_server.py stop
 
 set -e
 
+WARM=0
+if [ "$1" = "--warm" ]; then
+	WARM=1
+	shift
+fi
+
 if [ "$#" -lt 2 ]; then
-	echo "Usage: $0 <seeker_id> <hider_id> [arena options]"
+	echo "Usage: $0 [--warm] <seeker_id> <hider_id> [arena options]"
 	exit 1
 fi
 
@@ -25,4 +35,13 @@ fi
 
 cd "$SRC_DIR"
 
+if [ "$WARM" -eq 1 ]; then
+	# The server runs in the configured environment; the client only needs
+	# the standard library, so a plain interpreter avoids conda's startup
+	if ! python3 warm_server.py ping; then
+		"${PYTHON_CMD[@]}" warm_server.py start
+	fi
+	exec python3 warm_server.py run --no-start -- --seek "$SEEKER" --hide "$HIDER" "$@"
+fi
+
 "${PYTHON_CMD[@]}" arena.py --seek "$SEEKER" --hide "$HIDER" "$@"
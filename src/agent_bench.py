@@ -0,0 +1,214 @@
+"""
+Agent-level benchmark harness.
+
+Drives a single agent's step() over a fixed corpus of positions, without a
+live opponent, and reports decision latency distributions. Agents that
+expose an integer ``nodes_searched`` attribute (incremented by their
+search) also get a nodes/sec figure.
+
+Examples:
+  python agent_bench.py --agent 23120405 --role ghost
+  python agent_bench.py --agent example_student --role pacman --maps default maze101
+  python agent_bench.py --agent alice --role pacman --positions 500 --output alice.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from agent_loader import AgentLoader, AgentLoadError
+from environment import Environment, generate_maze
+
+
+# Named maps available to the harness
+MAPS = {
+    'default': lambda: Environment().map,
+    'maze51': lambda: generate_maze(51, 51, seed=51),
+    'maze101': lambda: generate_maze(101, 101, seed=101),
+}
+
+
+def build_corpus(map_state: np.ndarray, count: int, seed: int = 0,
+                 stream: int = 0) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """
+    Sample a fixed corpus of (my_position, enemy_position) pairs.
+
+    Args:
+        map_state: Map to sample from (1 = wall, 0 = empty)
+        count: Number of positions
+        seed: Random seed; the same seed always yields the same corpus
+        stream: Independent corpus for the same seed (the warmup
+            positions use stream 1)
+
+    Returns:
+        List of position pairs on distinct empty cells
+    """
+    rng = np.random.default_rng(seed if stream == 0 else [seed, stream])
+    empty_cells = np.argwhere(map_state == 0)
+    corpus = []
+    for _ in range(count):
+        i, j = rng.choice(len(empty_cells), size=2, replace=False)
+        corpus.append((
+            (int(empty_cells[i][0]), int(empty_cells[i][1])),
+            (int(empty_cells[j][0]), int(empty_cells[j][1])),
+        ))
+    return corpus
+
+
+def latency_summary(latencies: np.ndarray) -> Dict:
+    """
+    Summarize a latency sample given in seconds.
+
+    Returns:
+        Dict of statistics in milliseconds
+    """
+    ms = latencies * 1000.0
+    return {
+        'count': int(len(ms)),
+        'mean_ms': float(ms.mean()),
+        'std_ms': float(ms.std()),
+        'min_ms': float(ms.min()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p90_ms': float(np.percentile(ms, 90)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'max_ms': float(ms.max()),
+    }
+
+
+def bench_agent(agent, map_state: np.ndarray,
+                corpus: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+                warmup_corpus: List[Tuple[Tuple[int, int], Tuple[int, int]]] = ()) -> Dict:
+    """
+    Time an agent's step() over a corpus of positions.
+
+    Args:
+        agent: Instantiated agent
+        map_state: Map passed to step()
+        corpus: Positions from build_corpus
+        warmup_corpus: Positions for untimed calls made first (imports,
+            caches, JIT-like warmup); positions also in ``corpus`` are
+            skipped, so results cached during warmup do not flatter the
+            timed calls
+
+    Returns:
+        Dict with latency summary and, when available, node statistics
+
+    Raises:
+        ValueError: If the corpus is empty
+    """
+    if not corpus:
+        raise ValueError("corpus must contain at least one position")
+    timed = set(corpus)
+    for i, (my_pos, enemy_pos) in enumerate(p for p in warmup_corpus if p not in timed):
+        agent.step(map_state.copy(), my_pos, enemy_pos, i + 1)
+
+    counts_nodes = isinstance(getattr(agent, 'nodes_searched', None), int)
+    latencies = np.empty(len(corpus))
+    nodes = np.zeros(len(corpus), dtype=np.int64)
+
+    for i, (my_pos, enemy_pos) in enumerate(corpus):
+        state = map_state.copy()
+        before = agent.nodes_searched if counts_nodes else 0
+        start = time.perf_counter()
+        agent.step(state, my_pos, enemy_pos, i + 1)
+        latencies[i] = time.perf_counter() - start
+        if counts_nodes:
+            nodes[i] = agent.nodes_searched - before
+
+    result = {'latency': latency_summary(latencies)}
+    if counts_nodes:
+        total_time = latencies.sum()
+        result['nodes'] = {
+            'total': int(nodes.sum()),
+            'mean_per_step': float(nodes.mean()),
+            'nodes_per_sec': float(nodes.sum() / total_time) if total_time > 0 else 0.0,
+        }
+    return result
+
+
+def run(agent_id: str, role: str, submissions_dir: str, map_names: List[str],
+        positions: int, seed: int, warmup: int) -> Dict:
+    """
+    Benchmark one submission on each requested map.
+
+    A fresh agent instance is loaded for every map so state cached for one
+    map does not leak into the next.
+
+    Returns:
+        Results keyed by map name
+    """
+    loader = AgentLoader(submissions_dir=submissions_dir)
+    results = {}
+    for name in map_names:
+        map_state = MAPS[name]()
+        agent = loader.load_agent(agent_id, role)
+        corpus = build_corpus(map_state, positions, seed=seed)
+        warmup_corpus = build_corpus(map_state, warmup, seed=seed, stream=1)
+        results[name] = bench_agent(agent, map_state, corpus, warmup_corpus)
+        results[name]['map_shape'] = list(map_state.shape)
+    return results
+
+
+def print_results(agent_id: str, role: str, results: Dict):
+    """Print a latency table for each map."""
+    print(f"\nAgent {agent_id} ({role})")
+    print(f"{'Map':<10}{'Mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'Max':>9}{'Nodes/s':>14}")
+    print('-' * 69)
+    for name, result in results.items():
+        lat = result['latency']
+        nps = f"{result['nodes']['nodes_per_sec']:.0f}" if 'nodes' in result else '-'
+        print(f"{name:<10}{lat['mean_ms']:>9.3f}{lat['p50_ms']:>9.3f}{lat['p90_ms']:>9.3f}"
+              f"{lat['p99_ms']:>9.3f}{lat['max_ms']:>9.3f}{nps:>14}")
+    print("(latencies in ms)")
+
+
+def main():
+    """Main entry point for the agent benchmark harness."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--agent', required=True,
+                        help='Student ID (folder name in submissions/)')
+    parser.add_argument('--role', choices=['pacman', 'ghost'], required=True,
+                        help='Which agent class to benchmark')
+    parser.add_argument('--submissions-dir', default='../submissions',
+                        help='Directory containing student submissions (default: ../submissions)')
+    parser.add_argument('--maps', nargs='+', default=['default', 'maze51'],
+                        choices=sorted(MAPS), help='Maps to benchmark on')
+    parser.add_argument('--positions', type=int, default=200,
+                        help='Positions in the corpus per map (default: 200)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Corpus seed (default: 0)')
+    parser.add_argument('--warmup', type=int, default=5,
+                        help='Untimed warmup calls per map, on positions not timed (default: 5)')
+    parser.add_argument('--output', default=None,
+                        help='Save results as JSON to this file')
+    args = parser.parse_args()
+    if args.positions < 1:
+        parser.error('--positions must be at least 1')
+    if args.warmup < 0:
+        parser.error('--warmup must not be negative')
+
+    try:
+        results = run(args.agent, args.role, args.submissions_dir, args.maps,
+                      args.positions, args.seed, args.warmup)
+    except AgentLoadError as e:
+        print(f"✗ Failed to load agent: {e}")
+        return 1
+
+    print_results(args.agent, args.role, results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'agent': args.agent, 'role': args.role, 'maps': results}, f, indent=2)
+        print(f"Results saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
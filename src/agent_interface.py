@@ -11,6 +11,10 @@ from environment import Move
 class AgentInterface(ABC):
     """
     Base interface that all student agents must implement.
+    
+    Optional: agents may keep an integer ``nodes_searched`` attribute and
+    increment it for every node their search expands. Benchmark tools
+    (agent_bench.py) then report nodes searched per second.
     """
     
     @abstractmethod
@@ -42,6 +46,32 @@ class AgentInterface(ABC):
             Move enum value (UP, DOWN, LEFT, RIGHT, or STAY)
         """
         pass
+    
+    def ponder(self, map_state: np.ndarray,
+               my_position: Tuple[int, int],
+               enemy_position: Tuple[int, int],
+               step_number: int) -> bool:
+        """
+        Optional hook: think ahead while waiting for the next step.
+        
+        Only used when the arena runs with pondering enabled
+        (--ponder-budget). After each step() the arena calls ponder()
+        repeatedly with the same arguments step() just received, until the
+        next state arrives, the CPU budget is used up, or ponder() returns
+        False. Keep each call short (a few milliseconds): the next step()
+        cannot start until the current call returns. Results should be kept
+        on the agent (e.g. a cache) for step() to use.
+        
+        Args:
+            map_state: Map passed to the last step()
+            my_position: Your position at the last step()
+            enemy_position: Enemy's position at the last step()
+            step_number: Step number of the last step()
+            
+        Returns:
+            True to be called again, False when there is nothing left to do
+        """
+        return False
 
 
 class PacmanAgent(AgentInterface):
@@ -5,8 +5,13 @@ Module for loading student agents dynamically.
 import sys
 import importlib.util
 from pathlib import Path
-from typing import Optional
-from agent_interface import PacmanAgent, GhostAgent
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from environment import Move
+
+# Imported by MoveValidator: only needed once a game starts
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class AgentLoadError(Exception):
@@ -35,7 +40,8 @@ class AgentLoader:
         Load a student's agent.
         
         Args:
-            student_id: Student ID (folder name in submissions/)
+            student_id: Student ID (folder name in submissions/), or
+                'builtin:<name>' for a reference agent (see reference_agents)
             agent_type: 'pacman' or 'ghost'
             
         Returns:
@@ -44,6 +50,13 @@ class AgentLoader:
         Raises:
             AgentLoadError: If agent cannot be loaded or doesn't meet requirements
         """
+        if student_id.startswith('builtin:'):
+            import reference_agents
+            try:
+                return reference_agents.create(student_id, agent_type)
+            except ValueError as e:
+                raise AgentLoadError(str(e))
+        
         agent_dir = self.submissions_dir / student_id
         agent_file = agent_dir / "agent.py"
         
@@ -74,6 +87,9 @@ class AgentLoader:
                 f"Failed to load module for student {student_id}: {str(e)}"
             )
         
+        # Deferred: only needed once an agent is actually loaded
+        from agent_interface import PacmanAgent, GhostAgent
+        
         # Get the appropriate agent class
         if agent_type.lower() == 'pacman':
             if not hasattr(module, 'PacmanAgent'):
@@ -122,10 +138,76 @@ class AgentLoader:
         Raises:
             AgentLoadError: If move is invalid
         """
-        from environment import Move
-        
         if not isinstance(move, Move):
             raise AgentLoadError(
                 f"Agent {student_id} ({agent_type}) returned invalid move type: {type(move)}. "
                 f"Must return a Move enum value."
             )
+
+
+# Bit of each move in MoveValidator's legal-move masks (map_graph.MOVES
+# order, which is the enum's)
+_MOVE_BITS = {move: 1 << i for i, move in enumerate(Move)}
+
+
+class MoveValidator:
+    """
+    Per-map move validator.
+
+    Precomputes, for every square, a bitmask of the moves that do not run
+    into a wall or off the map, so checking a move is one type check and
+    one table lookup. Moves into walls are legal (the agent just stays
+    put) but can be counted per agent type.
+    """
+
+    def __init__(self, map_state: "np.ndarray", count_wall_moves: bool = True):
+        """
+        Initialize the validator.
+
+        Args:
+            map_state: 2D numpy array where 1 = wall, 0 = empty
+            count_wall_moves: Count moves into walls in ``wall_moves``
+        """
+        import numpy as np
+        from map_graph import MOVES, compile_map
+
+        compiled = compile_map(map_state)
+        masks = np.zeros(compiled.map.shape, dtype=np.int32)
+        cells = np.arange(compiled.n_cells)
+        for m, move in enumerate(MOVES):
+            opens = (compiled.neighbors[:, m] != cells) | (move is Move.STAY)
+            masks[compiled.coords[:, 0], compiled.coords[:, 1]] |= np.where(opens, 1 << m, 0)
+        # Nested lists: scalar indexing is much faster than on an ndarray
+        self.legal_masks = masks.tolist()
+        self.count_wall_moves = count_wall_moves
+        self.wall_moves: Dict[str, int] = {'pacman': 0, 'ghost': 0}
+
+    def validate(self, move, position: Tuple[int, int], agent_type: str,
+                 student_id: str) -> bool:
+        """
+        Validate an agent's move from its current position.
+
+        Args:
+            move: The move returned by the agent
+            position: Agent's current (row, col)
+            agent_type: 'pacman' or 'ghost'
+            student_id: Student ID for error messages
+
+        Returns:
+            True if the move changes or keeps the position as intended,
+            False if it runs into a wall
+
+        Raises:
+            AgentLoadError: If move is not a Move
+        """
+        bit = _MOVE_BITS.get(move) if type(move) is Move else None
+        if bit is None:
+            raise AgentLoadError(
+                f"Agent {student_id} ({agent_type}) returned invalid move type: {type(move)}. "
+                f"Must return a Move enum value."
+            )
+        if self.legal_masks[position[0]][position[1]] & bit:
+            return True
+        if self.count_wall_moves:
+            self.wall_moves[agent_type] += 1
+        return False
@@ -0,0 +1,248 @@
+"""
+Run an agent in its own worker process.
+
+Used by the arena's parallel mode so both agents can think at the same
+time without the GIL serializing them. The parent talks to the worker
+over a pipe: the map and a seed are sent once per game, then each step
+sends only the positions and step number and waits for the move with a
+deadline. The worker seeds random and np.random with that seed, so a
+seeded parallel game replays the same way (unless agents ponder: the
+amount of pondering depends on timing).
+
+Steps run under a Deadline (deadline.py) of the step timeout, less
+STEP_MARGIN for the pipe round-trip, so deadline.remaining() and check()
+work inside workers as they do in process; ponder() runs under a
+Deadline of the ponder budget. An agent that overruns its own deadline
+reports a timeout; one stuck in a C call is still caught by the parent's
+deadline and killed.
+
+With a ponder budget, the worker keeps calling the agent's ponder() hook
+between steps until the next request arrives or the budget is spent.
+"""
+
+import multiprocessing as mp
+import random
+import time
+from typing import Optional
+
+import numpy as np
+
+from agent_loader import AgentLoader, AgentLoadError
+from deadline import AgentTimeoutError, Deadline
+
+# Seconds of the step timeout kept for sending the move back to the parent
+STEP_MARGIN = 0.02
+
+
+class AgentStepError(Exception):
+    """Raised when an agent's step() raised inside its worker process."""
+
+
+def _ponder(agent, conn, args, budget: float) -> float:
+    """
+    Call agent.ponder(*args) until a message arrives, the CPU budget is
+    spent or the agent has nothing left to do.
+
+    Returns:
+        CPU seconds used
+    """
+    start = time.process_time()
+    try:
+        with Deadline(budget):
+            while not conn.poll():
+                if time.process_time() - start >= budget:
+                    break
+                if not agent.ponder(*args):
+                    break
+    except Exception:
+        # A failing ponder() must not forfeit the game; step() decides
+        pass
+    return time.process_time() - start
+
+
+def _worker_main(conn, submissions_dir: str, student_id: str, agent_type: str,
+                 ponder_budget: float = 0.0):
+    """Worker process entry point: load the agent, then serve step requests."""
+    try:
+        agent = AgentLoader(submissions_dir=submissions_dir).load_agent(student_id, agent_type)
+    except Exception as e:
+        conn.send(('error', str(e)))
+        return
+    conn.send(('ready', None))
+
+    can_ponder = ponder_budget > 0 and callable(getattr(agent, 'ponder', None))
+    ponder_args = None
+    ponder_time = 0.0
+    map_state = None
+    layout = None
+    step_seconds = None
+    while True:
+        if ponder_args is not None:
+            # Undo whatever the agent wrote to the map during its step
+            np.copyto(map_state, layout)
+            ponder_time += _ponder(agent, conn, ponder_args, ponder_budget)
+            ponder_args = None
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        kind = message[0]
+        if kind == 'step':
+            _, my_position, enemy_position, step_number = message
+            np.copyto(map_state, layout)
+            try:
+                with Deadline(step_seconds):
+                    move = agent.step(map_state, my_position, enemy_position, step_number)
+            except AgentTimeoutError as e:
+                conn.send(('timeout', str(e), ponder_time))
+                continue
+            except Exception as e:
+                conn.send(('error', str(e), ponder_time))
+                continue
+            conn.send(('ok', move, ponder_time))
+            ponder_time = 0.0
+            if can_ponder:
+                ponder_args = (map_state, my_position, enemy_position, step_number)
+        elif kind == 'map':
+            # Reset before every call, like the map the in-process arena
+            # hands to agents
+            layout, seed, step_timeout = message[1:]
+            map_state = layout.copy()
+            step_seconds = max(step_timeout - STEP_MARGIN, step_timeout / 2) if step_timeout else None
+            if seed is not None:
+                random.seed(seed)
+                np.random.seed(seed)
+        elif kind == 'stop':
+            return
+
+
+class AgentWorker:
+    """
+    Proxy for an agent living in a separate process.
+    """
+
+    def __init__(self, submissions_dir: str, student_id: str, agent_type: str,
+                 ponder_budget: float = 0.0):
+        """
+        Initialize the worker proxy (the process is started by start()).
+
+        Args:
+            submissions_dir: Directory containing student submissions
+            student_id: Student ID (folder name in submissions/)
+            agent_type: 'pacman' or 'ghost'
+            ponder_budget: CPU seconds the agent may ponder between steps
+                (0 disables pondering)
+        """
+        self.submissions_dir = submissions_dir
+        self.student_id = student_id
+        self.agent_type = agent_type
+        self.ponder_budget = ponder_budget
+        self.ponder_time = 0.0
+        self.process: Optional[mp.Process] = None
+        self.conn = None
+        self.busy = False
+
+    def start(self, load_timeout: Optional[float] = None):
+        """
+        Start the process and load the agent in it.
+
+        Raises:
+            AgentLoadError: If the agent cannot be loaded
+        """
+        self.spawn()
+        self.wait_ready(load_timeout)
+
+    def spawn(self):
+        """Start the process without waiting for the agent to load."""
+        parent_conn, child_conn = mp.Pipe()
+        self.process = mp.Process(
+            target=_worker_main,
+            args=(child_conn, self.submissions_dir, self.student_id, self.agent_type,
+                  self.ponder_budget),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def wait_ready(self, load_timeout: Optional[float] = None):
+        """
+        Wait until the agent started by spawn() has loaded.
+
+        Raises:
+            AgentLoadError: If the agent cannot be loaded
+        """
+        if not self.conn.poll(load_timeout):
+            self.close()
+            raise AgentLoadError(f"Timed out loading agent for student {self.student_id}")
+        try:
+            status, detail = self.conn.recv()
+        except EOFError:
+            self.close()
+            raise AgentLoadError(f"Worker for student {self.student_id} exited while loading")
+        if status != 'ready':
+            self.close()
+            raise AgentLoadError(detail)
+
+    def set_map(self, map_state: np.ndarray, seed: Optional[int] = None,
+                step_timeout: Optional[float] = None):
+        """
+        Send the map used for the following steps.
+
+        Args:
+            map_state: Map handed to the agent
+            seed: Seed of the agent's random and np.random (None: unseeded)
+            step_timeout: Seconds allowed per step, enforced in the worker
+                with a Deadline (None: no deadline)
+        """
+        self.conn.send(('map', map_state, seed, step_timeout))
+
+    def request_step(self, my_position, enemy_position, step_number: int):
+        """Ask the agent for its next move without waiting for it."""
+        self.conn.send(('step', my_position, enemy_position, step_number))
+        self.busy = True
+
+    def wait_step(self, timeout: Optional[float] = None):
+        """
+        Wait for the move requested by request_step().
+
+        Args:
+            timeout: Seconds to wait (None waits forever)
+
+        Returns:
+            The move returned by the agent
+
+        Raises:
+            AgentTimeoutError: If no move arrives in time, or the agent
+                overran its deadline in the worker
+            AgentStepError: If the agent raised or its process died
+        """
+        if timeout is not None and not self.conn.poll(max(0.0, timeout)):
+            raise AgentTimeoutError("Agent step exceeded the allowed time")
+        try:
+            status, payload, ponder_time = self.conn.recv()
+        except EOFError:
+            raise AgentStepError("Agent worker process exited unexpectedly")
+        self.busy = False
+        self.ponder_time += ponder_time
+        if status == 'timeout':
+            raise AgentTimeoutError(payload)
+        if status != 'ok':
+            raise AgentStepError(payload)
+        return payload
+
+    def close(self):
+        """Stop the worker, killing it if it is stuck in a step."""
+        if self.process is None:
+            return
+        if not self.busy and self.process.is_alive():
+            try:
+                self.conn.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=0.5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+        self.process = None
@@ -0,0 +1,432 @@
+"""
+Analytics over per-game result archives.
+
+Batch runs (``python log.py ... --results games.jsonl``) write one JSON
+object per game. This module streams such files (plain or .gz) in chunks
+and aggregates them with NumPy, so archives with millions of games are
+summarized in constant memory:
+
+  - outcome counts and the capture-step distribution
+  - win rates per start cell, for each role
+  - outcomes grouped by maze distance between the two start cells
+  - a heatmap of capture locations over the map
+  - agent think time per step
+
+Examples:
+  python analytics.py games.jsonl
+  python analytics.py run1.jsonl run2.jsonl.gz --output-dir report/ --plot
+  python analytics.py maze.jsonl --maze 51 51 --maze-seed 3
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from environment import Environment, generate_maze
+from map_graph import compile_map
+
+
+RESULTS = ('pacman_wins', 'ghost_wins', 'draw')
+RESULT_INDEX = {result: i for i, result in enumerate(RESULTS)}
+
+# Log-spaced bins (seconds) for mean think time per step
+_THINK_BINS = np.logspace(-7, 2, 91)
+
+# Characters for the ASCII heatmap, from lowest to highest count
+_SHADES = ' .:-=+*%@'
+
+
+def game_record(game: int, seed: Optional[int], seek: str, hide: str,
+                result: str, stats: Dict, env: Environment,
+                versions: Optional[Tuple[str, str]] = None) -> Dict:
+    """
+    Build the result record of one finished game.
+
+    Args:
+        game: Game number within the batch
+        seed: Seed used for the game (None if unseeded)
+        seek: Pacman student ID
+        hide: Ghost student ID
+        result: 'pacman_wins', 'ghost_wins' or 'draw'
+        stats: Statistics returned by Arena.run_game()
+        env: The arena's environment after the game
+        versions: (seek, hide) submission fingerprints, stored as
+            'seek_version' / 'hide_version' (see fingerprint.py)
+
+    Returns:
+        JSON-serializable dictionary
+    """
+    pacman_start, ghost_start = stats['start_positions']
+    record = {
+        'game': game,
+        'seed': seed,
+        'seek': seek,
+        'hide': hide,
+        'result': result,
+        'steps': int(stats['total_steps']),
+        'max_steps': env.max_steps,
+        'pacman_start': list(pacman_start),
+        'ghost_start': list(ghost_start),
+        'pacman_end': [int(v) for v in env.pacman_pos],
+        'ghost_end': [int(v) for v in env.ghost_pos],
+        'think_time': {k: round(v, 6) for k, v in stats['think_time'].items()},
+        'wall_moves': dict(stats['wall_moves']),
+    }
+    if versions is not None:
+        record['seek_version'], record['hide_version'] = versions
+    if stats.get('forfeit'):
+        record['forfeit'] = stats['forfeit']
+    if 'memory' in stats:
+        record['memory'] = stats['memory']
+    return record
+
+
+def _open(path: str):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def iter_chunks(paths: Iterable[str], chunk_size: int = 50_000) -> Iterator[List[Dict]]:
+    """
+    Stream game records from JSONL files in chunks.
+
+    Blank and malformed lines are skipped.
+
+    Args:
+        paths: JSONL files ('-' for stdin, '.gz' files are decompressed)
+        chunk_size: Records per yielded chunk
+
+    Yields:
+        Lists of at most chunk_size records
+    """
+    chunk = []
+    for path in paths:
+        f = _open(path)
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    chunk.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        finally:
+            if f is not sys.stdin:
+                f.close()
+    if chunk:
+        yield chunk
+
+
+def _grow(counts: np.ndarray, length: int) -> np.ndarray:
+    if length <= len(counts):
+        return counts
+    grown = np.zeros((length,) + counts.shape[1:], dtype=counts.dtype)
+    grown[:len(counts)] = counts
+    return grown
+
+
+class ResultsSummary:
+    """
+    Streaming aggregate of game records on one map.
+
+    All state is a handful of fixed-size count arrays, updated one chunk
+    at a time with vectorized bincounts.
+    """
+
+    def __init__(self, map_state: np.ndarray):
+        """
+        Initialize the summary.
+
+        Args:
+            map_state: Map the games were played on (1 = wall, 0 = empty)
+        """
+        self.compiled = compile_map(map_state)
+        self.height, self.width = self.compiled.map.shape
+        cells = self.height * self.width
+
+        self.games = 0
+        self.errors = 0
+        self.skipped = 0
+        # Games won because the other agent timed out or failed; their end
+        # positions are not captures
+        self.forfeits = 0
+        self.outcomes = np.zeros(len(RESULTS), dtype=np.int64)
+        self.capture_steps = np.zeros(1, dtype=np.int64)
+        # Per start square: [games, pacman_wins, ghost_wins, draws]
+        self.pacman_starts = np.zeros((cells, 1 + len(RESULTS)), dtype=np.int64)
+        self.ghost_starts = np.zeros((cells, 1 + len(RESULTS)), dtype=np.int64)
+        # Row d holds outcomes of games whose starts were d apart; starts
+        # with no path between them are counted in `unreachable`
+        self.by_distance = np.zeros((1, len(RESULTS)), dtype=np.int64)
+        self.unreachable = np.zeros(len(RESULTS), dtype=np.int64)
+        self.captures = np.zeros(cells, dtype=np.int64)
+        self.think_total = {'pacman': 0.0, 'ghost': 0.0}
+        self.think_hist = {
+            'pacman': np.zeros(len(_THINK_BINS) + 1, dtype=np.int64),
+            'ghost': np.zeros(len(_THINK_BINS) + 1, dtype=np.int64),
+        }
+        self.total_steps = 0
+
+    def update(self, records: List[Dict]):
+        """Add a chunk of records."""
+        played = []
+        for record in records:
+            result = record.get('result')
+            if result == 'error':
+                self.errors += 1
+            elif result in RESULT_INDEX and 'pacman_start' in record:
+                played.append(record)
+            else:
+                self.skipped += 1
+        if not played:
+            return
+
+        n = len(played)
+        width, cells = self.width, self.height * self.width
+        results = np.fromiter((RESULT_INDEX[r['result']] for r in played), dtype=np.int64, count=n)
+        steps = np.fromiter((r['steps'] for r in played), dtype=np.int64, count=n)
+        starts = np.array([r['pacman_start'] + r['ghost_start'] for r in played], dtype=np.int64)
+        pacman_end = np.array([r['pacman_end'] for r in played], dtype=np.int64)
+
+        self.games += n
+        self.total_steps += int(steps.sum())
+        self.outcomes += np.bincount(results, minlength=len(RESULTS))
+
+        forfeited = np.fromiter((bool(r.get('forfeit')) for r in played), dtype=bool, count=n)
+        self.forfeits += int(forfeited.sum())
+        won = (results == RESULT_INDEX['pacman_wins']) & ~forfeited
+        captured = np.bincount(steps[won])
+        self.capture_steps = _grow(self.capture_steps, len(captured))
+        self.capture_steps[:len(captured)] += captured
+        capture_squares = pacman_end[won, 0] * width + pacman_end[won, 1]
+        self.captures += np.bincount(capture_squares, minlength=cells)
+
+        pacman_squares = starts[:, 0] * width + starts[:, 1]
+        ghost_squares = starts[:, 2] * width + starts[:, 3]
+        for table, squares in ((self.pacman_starts, pacman_squares),
+                               (self.ghost_starts, ghost_squares)):
+            table[:, 0] += np.bincount(squares, minlength=cells)
+            for i in range(len(RESULTS)):
+                table[:, 1 + i] += np.bincount(squares[results == i], minlength=cells)
+
+        cell_ids = self.compiled.cell_ids.ravel()
+        distances = self.compiled.distance_matrix()[cell_ids[pacman_squares], cell_ids[ghost_squares]]
+        reachable = distances >= 0
+        self.unreachable += np.bincount(results[~reachable], minlength=len(RESULTS))
+        if reachable.any():
+            rows = distances[reachable] * len(RESULTS) + results[reachable]
+            length = int(distances.max()) + 1
+            grouped = np.bincount(rows, minlength=length * len(RESULTS)).reshape(length, len(RESULTS))
+            self.by_distance = _grow(self.by_distance, length)
+            self.by_distance[:length] += grouped
+
+        steps_taken = np.maximum(steps, 1)
+        for role in ('pacman', 'ghost'):
+            think = np.fromiter((r.get('think_time', {}).get(role, 0.0) for r in played),
+                                dtype=np.float64, count=n)
+            self.think_total[role] += float(think.sum())
+            self.think_hist[role] += np.bincount(
+                np.searchsorted(_THINK_BINS, think / steps_taken), minlength=len(_THINK_BINS) + 1
+            )
+
+    def think_percentile(self, role: str, q: float) -> float:
+        """Approximate percentile of the per-game mean think time per step (seconds)."""
+        hist = self.think_hist[role]
+        if not hist.sum():
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(hist), q / 100 * hist.sum()))
+        return float(_THINK_BINS[min(index, len(_THINK_BINS) - 1)])
+
+    def heatmap(self) -> np.ndarray:
+        """(height, width) array of capture counts."""
+        return self.captures.reshape(self.height, self.width)
+
+    def format_heatmap(self) -> str:
+        """Render the capture heatmap as text (walls shown as '█')."""
+        grid = self.heatmap()
+        peak = grid.max()
+        lines = []
+        for row in range(self.height):
+            chars = []
+            for col in range(self.width):
+                if self.compiled.map[row, col]:
+                    chars.append('█')
+                elif peak == 0 or grid[row, col] == 0:
+                    chars.append(' ')
+                else:
+                    level = 1 + int((len(_SHADES) - 2) * grid[row, col] / peak)
+                    chars.append(_SHADES[level])
+            lines.append(''.join(chars))
+        return '\n'.join(lines)
+
+    def format_report(self, top: int = 10) -> str:
+        """Summary tables as text."""
+        lines = [f"Games: {self.games}  Errors: {self.errors}  Skipped: {self.skipped}"]
+        if not self.games:
+            return '\n'.join(lines)
+
+        for name, count in zip(RESULTS, self.outcomes):
+            lines.append(f"  {name:<12} {count:>10} ({count / self.games * 100:5.1f}%)")
+        lines.append(f"Mean game length: {self.total_steps / self.games:.1f} steps")
+        if self.forfeits:
+            lines.append(f"Forfeits: {self.forfeits} (timeouts and errors; not counted as captures)")
+
+        captures = self.capture_steps
+        if captures.sum():
+            cumulative = np.cumsum(captures) / captures.sum()
+            quartiles = [int(np.searchsorted(cumulative, q)) for q in (0.25, 0.5, 0.75)]
+            mean = (np.arange(len(captures)) * captures).sum() / captures.sum()
+            lines.append(f"Capture step: mean {mean:.1f}, quartiles {quartiles}, "
+                         f"max {len(captures) - 1}")
+
+        lines.append("\nOutcome by start distance:")
+        lines.append(f"  {'dist':>5} {'games':>8} {'pacman%':>8} {'ghost%':>8}")
+        for distance, counts in enumerate(self.by_distance):
+            total = counts.sum()
+            if total:
+                lines.append(f"  {distance:>5} {total:>8} {counts[0] / total * 100:>7.1f}% "
+                             f"{counts[1] / total * 100:>7.1f}%")
+        if self.unreachable.sum():
+            total = self.unreachable.sum()
+            lines.append(f"  {'none':>5} {total:>8} {self.unreachable[0] / total * 100:>7.1f}% "
+                         f"{self.unreachable[1] / total * 100:>7.1f}%")
+
+        played = self.ghost_starts[:, 0]
+        loss_rate = np.divide(self.ghost_starts[:, 1], played,
+                              out=np.zeros(len(played)), where=played > 0)
+        worst = [s for s in np.argsort(-loss_rate, kind='stable') if played[s] > 0][:top]
+        lines.append(f"\nGhost start cells with the highest loss rate (top {top}):")
+        for square in worst:
+            row, col = divmod(int(square), self.width)
+            lines.append(f"  ({row:>2}, {col:>2})  {self.ghost_starts[square, 1]:>7}/{played[square]:<7} "
+                         f"{loss_rate[square] * 100:5.1f}%")
+
+        lines.append("\nThink time per step (p50 / p95):")
+        for role in ('pacman', 'ghost'):
+            lines.append(f"  {role:<7} {self.think_percentile(role, 50) * 1000:8.3f} ms "
+                         f"/ {self.think_percentile(role, 95) * 1000:8.3f} ms")
+
+        lines.append("\nCapture heatmap:")
+        lines.append(self.format_heatmap())
+        return '\n'.join(lines)
+
+    def write_csv(self, output_dir: str):
+        """Write the summary tables as CSV files into ``output_dir``."""
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+
+        with open(out / 'capture_steps.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['step', 'captures'])
+            for step in np.flatnonzero(self.capture_steps):
+                writer.writerow([int(step), int(self.capture_steps[step])])
+
+        with open(out / 'start_cells.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['role', 'row', 'col', 'games'] + list(RESULTS))
+            for role, table in (('pacman', self.pacman_starts), ('ghost', self.ghost_starts)):
+                for square in np.flatnonzero(table[:, 0]):
+                    row, col = divmod(int(square), self.width)
+                    writer.writerow([role, row, col] + table[square].tolist())
+
+        with open(out / 'start_distance.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['distance', 'games'] + list(RESULTS))
+            for distance, counts in enumerate(self.by_distance):
+                if counts.sum():
+                    writer.writerow([distance, int(counts.sum())] + counts.tolist())
+            if self.unreachable.sum():
+                writer.writerow(['unreachable', int(self.unreachable.sum())] + self.unreachable.tolist())
+
+        np.savetxt(out / 'capture_heatmap.csv', self.heatmap(), fmt='%d', delimiter=',')
+
+    def plot_heatmap(self, path: str):
+        """
+        Save the capture heatmap as an image.
+
+        Raises:
+            ImportError: If matplotlib is not installed
+        """
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        grid = np.ma.masked_where(self.compiled.map != 0, self.heatmap())
+        fig, ax = plt.subplots(figsize=(self.width / 3 + 2, self.height / 3 + 1))
+        ax.imshow(self.compiled.map != 0, cmap='Greys', vmin=0, vmax=1.5)
+        image = ax.imshow(grid, cmap='hot', interpolation='nearest')
+        fig.colorbar(image, ax=ax, label='captures')
+        ax.set_title(f'Capture locations ({int(self.captures.sum())} captures)')
+        ax.set_xticks([])
+        ax.set_yticks([])
+        fig.savefig(path, bbox_inches='tight', dpi=120)
+        plt.close(fig)
+
+
+def summarize(paths: Iterable[str], map_state: Optional[np.ndarray] = None,
+              chunk_size: int = 50_000) -> ResultsSummary:
+    """
+    Aggregate result files into a ResultsSummary.
+
+    Args:
+        paths: JSONL result files
+        map_state: Map the games were played on (default map if None)
+        chunk_size: Records parsed per chunk
+    """
+    if map_state is None:
+        map_state = Environment().map
+    summary = ResultsSummary(map_state)
+    for chunk in iter_chunks(paths, chunk_size):
+        summary.update(chunk)
+    return summary
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('paths', nargs='+', help="JSONL result files ('-' for stdin)")
+    parser.add_argument('--maze', type=int, nargs=2, metavar=('HEIGHT', 'WIDTH'),
+                        help='Games were played on a procedural maze instead of the default map')
+    parser.add_argument('--maze-seed', type=int, default=0, help='Seed for --maze (default: 0)')
+    parser.add_argument('--chunk-size', type=int, default=50_000,
+                        help='Records parsed per chunk (default: 50000)')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Start cells listed in the report (default: 10)')
+    parser.add_argument('--output-dir', help='Write CSV tables to this directory')
+    parser.add_argument('--plot', action='store_true',
+                        help='Also save capture_heatmap.png (needs matplotlib and --output-dir)')
+    args = parser.parse_args()
+
+    map_state = generate_maze(*args.maze, seed=args.maze_seed) if args.maze else None
+    summary = summarize(args.paths, map_state, args.chunk_size)
+    print(summary.format_report(top=args.top))
+
+    if args.output_dir:
+        summary.write_csv(args.output_dir)
+        print(f"\nTables written to {args.output_dir}")
+        if args.plot:
+            try:
+                summary.plot_heatmap(str(Path(args.output_dir) / 'capture_heatmap.png'))
+            except ImportError:
+                print("matplotlib is not installed; skipping capture_heatmap.png")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,38 +3,34 @@ Main arena module that runs the game between two agents.
 """
 
 import argparse
-import math
-import signal
+import random
 import sys
 import time
 from pathlib import Path
-from typing import Optional, Tuple, Dict
-
-from environment import Environment, Move
-from agent_loader import AgentLoader, AgentLoadError
-from visualizer import GameVisualizer
-
-
-class AgentTimeoutError(Exception):
-    """Raised when an agent exceeds the allowed time per step."""
+from time import perf_counter
+from typing import TYPE_CHECKING, Optional, Tuple, Dict
 
+import numpy as np
 
-def _agent_timeout_handler(signum, frame):
-    raise AgentTimeoutError("Agent step exceeded the allowed time")
-
+from environment import Environment, Move
+from agent_loader import AgentLoader, AgentLoadError, MoveValidator
+from deadline import AgentTimeoutError, Deadline
 
-def _start_alarm(seconds: float):
-    if hasattr(signal, "setitimer"):
-        signal.setitimer(signal.ITIMER_REAL, seconds)
-    else:
-        signal.alarm(max(1, int(math.ceil(seconds))))
+# Imported where used: only visual, parallel and profiled runs need them,
+# and headless single games are dominated by startup time
+if TYPE_CHECKING:
+    from agent_worker import AgentWorker
+    from memtrack import MemoryTracker
+    from metrics import BatchMetrics
+    from profiler import PhaseProfiler
 
 
-def _cancel_alarm():
-    if hasattr(signal, "setitimer"):
-        signal.setitimer(signal.ITIMER_REAL, 0)
-    else:
-        signal.alarm(0)
+def position_pairs(history: np.ndarray):
+    """
+    Convert stats['positions_history'] to ((pacman_row, pacman_col),
+    (ghost_row, ghost_col)) tuples, for consumers that need them.
+    """
+    return [((pr, pc), (gr, gc)) for pr, pc, gr, gc in history.tolist()]
 
 
 class Arena:
@@ -49,7 +45,14 @@ class Arena:
                  max_steps: int = 200,
                  visualize: bool = True,
                  delay: float = 0.1,
-                 step_timeout: Optional[float] = 3.0):
+                 step_timeout: Optional[float] = 3.0,
+                 profiler: Optional["PhaseProfiler"] = None,
+                 map_layout: Optional[np.ndarray] = None,
+                 verbose: bool = True,
+                 parallel: bool = False,
+                 ponder_budget: Optional[float] = None,
+                 memory_tracker: Optional["MemoryTracker"] = None,
+                 metrics: Optional["BatchMetrics"] = None):
         """
         Initialize the arena.
         
@@ -61,6 +64,16 @@ class Arena:
             visualize: Whether to display the game
             delay: Delay between steps in seconds (for visualization)
             step_timeout: Max seconds allowed per agent step (>0 to enable)
+            profiler: Optional PhaseProfiler collecting per-phase timings
+            map_layout: Custom map (1 = wall, 0 = empty); default map if None
+            verbose: Print game progress and results to stdout
+            parallel: Run each agent in its own worker process and let both
+                decide at the same time
+            ponder_budget: CPU seconds per step each agent may spend in its
+                ponder() hook between steps (implies parallel)
+            memory_tracker: Optional MemoryTracker sampling each agent's
+                memory around its steps
+            metrics: Optional BatchMetrics receiving each step's latency
         """
         self.pacman_id = pacman_id
         self.ghost_id = ghost_id
@@ -69,116 +82,209 @@ class Arena:
         self.visualize = visualize
         self.delay = delay
         self.step_timeout = step_timeout if step_timeout and step_timeout > 0 else None
-        self._timeout_supported = hasattr(signal, "SIGALRM")
-        if self.step_timeout and not self._timeout_supported:
-            print("WARNING: Step timeout requested but SIGALRM is unavailable on this platform. Timeout disabled.")
-            self.step_timeout = None
+        self.profiler = profiler
+        self.memory_tracker = memory_tracker
+        self.metrics = metrics
+        self.verbose = verbose
+        self.ponder_budget = ponder_budget if ponder_budget and ponder_budget > 0 else 0.0
+        self.parallel = parallel or self.ponder_budget > 0
         
         # Initialize components
-        self.env = Environment(max_steps=max_steps)
+        self.env = Environment(map_layout=map_layout, max_steps=max_steps)
         self.loader = AgentLoader(submissions_dir=submissions_dir)
-        self.visualizer = GameVisualizer() if visualize else None
+        self.visualizer = None
+        if visualize:
+            from visualizer import GameVisualizer
+            self.visualizer = GameVisualizer()
         
         # Load agents
         self.pacman_agent = None
         self.ghost_agent = None
+        self.pacman_worker: Optional["AgentWorker"] = None
+        self.ghost_worker: Optional["AgentWorker"] = None
+        self._think_time = {'pacman_step': 0.0, 'ghost_step': 0.0}
+        
+        # Preallocated rows of (pacman_row, pacman_col, ghost_row, ghost_col)
+        self._history = np.zeros((max_steps, 4), dtype=np.int16)
         
         # Game statistics
         self.stats = {
             'total_steps': 0,
             'pacman_moves': [],
             'ghost_moves': [],
-            'positions_history': []
+            'positions_history': self._history[:0]
         }
     
     def load_agents(self):
         """Load both agents from student submissions."""
-        print(f"\n{'='*60}")
-        print(f"{'ARENA INITIALIZATION':^60}")
-        print(f"{'='*60}\n")
+        self._print(f"\n{'='*60}")
+        self._print(f"{'ARENA INITIALIZATION':^60}")
+        self._print(f"{'='*60}\n")
         
         try:
-            print(f"Loading Pacman agent from student: {self.pacman_id}")
-            self.pacman_agent = self.loader.load_agent(self.pacman_id, 'pacman')
-            print(f"✓ Pacman agent loaded successfully\n")
+            self._print(f"Loading Pacman agent from student: {self.pacman_id}")
+            if self.parallel:
+                from agent_worker import AgentWorker
+                self.pacman_worker = AgentWorker(
+                    self.submissions_dir, self.pacman_id, 'pacman', self.ponder_budget
+                )
+                self.pacman_worker.start()
+            else:
+                self.pacman_agent = self.loader.load_agent(self.pacman_id, 'pacman')
+            self._print(f"✓ Pacman agent loaded successfully\n")
         except AgentLoadError as e:
             print(f"✗ Failed to load Pacman agent: {e}\n")
             sys.exit(1)
         
         try:
-            print(f"Loading Ghost agent from student: {self.ghost_id}")
-            self.ghost_agent = self.loader.load_agent(self.ghost_id, 'ghost')
-            print(f"✓ Ghost agent loaded successfully\n")
+            self._print(f"Loading Ghost agent from student: {self.ghost_id}")
+            if self.parallel:
+                from agent_worker import AgentWorker
+                self.ghost_worker = AgentWorker(
+                    self.submissions_dir, self.ghost_id, 'ghost', self.ponder_budget
+                )
+                self.ghost_worker.start()
+            else:
+                self.ghost_agent = self.loader.load_agent(self.ghost_id, 'ghost')
+            self._print(f"✓ Ghost agent loaded successfully\n")
         except AgentLoadError as e:
             print(f"✗ Failed to load Ghost agent: {e}\n")
             sys.exit(1)
     
-    def run_game(self) -> Tuple[str, Dict]:
+    def run_game(self, pacman_start: Optional[Tuple[int, int]] = None,
+                 ghost_start: Optional[Tuple[int, int]] = None) -> Tuple[str, Dict]:
         """
         Run the game until completion.
         
+        Args:
+            pacman_start: Pacman's start cell (sampled by the environment if None)
+            ghost_start: Ghost's start cell (sampled by the environment if None)
+        
         Returns:
             Tuple of (result, statistics)
             - result: 'pacman_wins', 'ghost_wins', or 'draw'
             - statistics: Dictionary containing game statistics
+              ('positions_history' is an int16 array with one row of
+              (pacman_row, pacman_col, ghost_row, ghost_col) per step, see
+              position_pairs(); 'map_writes' counts the steps in which
+              an in-process agent wrote to map_state;
+              'wall_moves' counts moves into walls per agent type;
+              'think_time' is the seconds spent waiting for each agent's
+              moves; 'start_positions' is (pacman_start, ghost_start);
+              'memory' is MemoryTracker.end_game()'s report when tracking;
+              'forfeit' is {'role', 'reason'} when an agent lost by timing
+              out ('timeout') or failing ('error'), else None)
         """
+        prof = self.profiler
+        if prof is not None:
+            prof.start_game()
+            t0 = perf_counter()
+        
         # Reset environment
-        map_state, pacman_pos, ghost_pos = self.env.reset()
+        map_state, pacman_pos, ghost_pos = self.env.reset(pacman_start, ghost_start)
+        if prof is not None:
+            prof.add('env_reset', perf_counter() - t0)
+        if self.parallel:
+            # Workers were started before the caller seeded this process;
+            # seeds drawn from its (seeded) RNG make parallel games replayable
+            self.pacman_worker.set_map(map_state, random.getrandbits(32), self.step_timeout)
+            self.ghost_worker.set_map(map_state, random.getrandbits(32), self.step_timeout)
+        validator = MoveValidator(map_state)
+        self.stats['wall_moves'] = validator.wall_moves
+        self.stats['start_positions'] = (pacman_pos, ghost_pos)
+        self.stats['forfeit'] = None
+        self._think_time = {'pacman_step': 0.0, 'ghost_step': 0.0}
+        if self.memory_tracker is not None:
+            self.memory_tracker.start_game({
+                'pacman': (self.pacman_id, self.pacman_agent),
+                'ghost': (self.ghost_id, self.ghost_agent),
+            }, self.submissions_dir)
         
-        print(f"{'='*60}")
-        print(f"{'GAME START':^60}")
-        print(f"{'='*60}\n")
-        print(f"Pacman (Seeker): {self.pacman_id} at position {pacman_pos}")
-        print(f"Ghost (Hider): {self.ghost_id} at position {ghost_pos}")
-        print(f"Maximum steps: {self.max_steps}\n")
+        self._print(f"{'='*60}")
+        self._print(f"{'GAME START':^60}")
+        self._print(f"{'='*60}\n")
+        self._print(f"Pacman (Seeker): {self.pacman_id} at position {pacman_pos}")
+        self._print(f"Ghost (Hider): {self.ghost_id} at position {ghost_pos}")
+        self._print(f"Maximum steps: {self.max_steps}\n")
         
         if self.visualize:
+            if prof is not None:
+                t0 = perf_counter()
             self.visualizer.display(self.env, 0, self.pacman_id, self.ghost_id)
+            if prof is not None:
+                prof.add('render', perf_counter() - t0)
         
         game_over = False
         result = ''
         step = 0
+        dispatched = False
+        history = self._history
         
         while not game_over:
             step += 1
             
+            # Both agents decide from the same state at the same time
+            if self.parallel and not dispatched:
+                deadline = self._dispatch_workers(pacman_pos, ghost_pos, step)
+            dispatched = False
+            
             # Get moves from both agents
             try:
-                pacman_move = self._run_agent_step(
-                    lambda: self.pacman_agent.step(
-                        map_state, pacman_pos, ghost_pos, step
+                if self.parallel:
+                    pacman_move = self._wait_worker(self.pacman_worker, deadline, 'pacman_step')
+                else:
+                    pacman_move = self._run_agent_step(
+                        lambda: self.pacman_agent.step(
+                            map_state, pacman_pos, ghost_pos, step
+                        ),
+                        phase='pacman_step'
                     )
-                )
-                self.loader.validate_agent_move(pacman_move, 'pacman', self.pacman_id)
+                if prof is not None:
+                    t0 = perf_counter()
+                validator.validate(pacman_move, pacman_pos, 'pacman', self.pacman_id)
+                if prof is not None:
+                    prof.add('validate', perf_counter() - t0)
             except AgentTimeoutError:
-                print(f"\n✗ Pacman agent timed out at step {step} after {self.step_timeout}s")
-                print("Ghost wins by default!")
+                self._print(f"\n✗ Pacman agent timed out at step {step} after {self.step_timeout}s")
+                self.stats['forfeit'] = {'role': 'pacman', 'reason': 'timeout'}
+                self._print("Ghost wins by default!")
                 result = 'ghost_wins'
                 game_over = True
                 break
             except Exception as e:
-                print(f"\n✗ Error in Pacman agent at step {step}: {e}")
-                print(f"Ghost wins by default!")
+                self._print(f"\n✗ Error in Pacman agent at step {step}: {e}")
+                self.stats['forfeit'] = {'role': 'pacman', 'reason': 'error'}
+                self._print(f"Ghost wins by default!")
                 result = 'ghost_wins'
                 game_over = True
                 break
             
             try:
-                ghost_move = self._run_agent_step(
-                    lambda: self.ghost_agent.step(
-                        map_state, ghost_pos, pacman_pos, step
+                if self.parallel:
+                    ghost_move = self._wait_worker(self.ghost_worker, deadline, 'ghost_step')
+                else:
+                    ghost_move = self._run_agent_step(
+                        lambda: self.ghost_agent.step(
+                            map_state, ghost_pos, pacman_pos, step
+                        ),
+                        phase='ghost_step'
                     )
-                )
-                self.loader.validate_agent_move(ghost_move, 'ghost', self.ghost_id)
+                if prof is not None:
+                    t0 = perf_counter()
+                validator.validate(ghost_move, ghost_pos, 'ghost', self.ghost_id)
+                if prof is not None:
+                    prof.add('validate', perf_counter() - t0)
             except AgentTimeoutError:
-                print(f"\n✗ Ghost agent timed out at step {step} after {self.step_timeout}s")
-                print(f"Pacman wins by default!")
+                self._print(f"\n✗ Ghost agent timed out at step {step} after {self.step_timeout}s")
+                self.stats['forfeit'] = {'role': 'ghost', 'reason': 'timeout'}
+                self._print(f"Pacman wins by default!")
                 result = 'pacman_wins'
                 game_over = True
                 break
             except Exception as e:
-                print(f"\n✗ Error in Ghost agent at step {step}: {e}")
-                print(f"Pacman wins by default!")
+                self._print(f"\n✗ Error in Ghost agent at step {step}: {e}")
+                self.stats['forfeit'] = {'role': 'ghost', 'reason': 'error'}
+                self._print(f"Pacman wins by default!")
                 result = 'pacman_wins'
                 game_over = True
                 break
@@ -188,21 +294,53 @@ class Arena:
             self.stats['ghost_moves'].append(ghost_move)
             
             # Execute step in environment
+            if prof is not None:
+                t0 = perf_counter()
             game_over, result, new_state = self.env.step(pacman_move, ghost_move)
             map_state, pacman_pos, ghost_pos = new_state
+            if prof is not None:
+                prof.add('env_step', perf_counter() - t0)
+            
+            # Deliver the new state at once so agents think while we record and render
+            if self.parallel and not game_over:
+                deadline = self._dispatch_workers(pacman_pos, ghost_pos, step + 1)
+                dispatched = True
             
             # Record position history
-            self.stats['positions_history'].append((pacman_pos, ghost_pos))
+            history[step - 1] = (pacman_pos[0], pacman_pos[1], ghost_pos[0], ghost_pos[1])
             
             # Visualize if enabled
             if self.visualize:
                 time.sleep(self.delay)
+                if prof is not None:
+                    t0 = perf_counter()
                 self.visualizer.display(
                     self.env, step, self.pacman_id, self.ghost_id,
                     pacman_move, ghost_move, result if game_over else None
                 )
+                if prof is not None:
+                    prof.add('render', perf_counter() - t0)
         
         self.stats['total_steps'] = step
+        # Recorded into a preallocated array that the next game reuses
+        self.stats['positions_history'] = history[:self.env.current_step].copy()
+        self.stats['map_writes'] = self.env.map_writes
+        if self.env.map_writes:
+            self._print(f"⚠ An agent wrote to map_state in {self.env.map_writes} steps: the map is "
+                        f"reset before every step, so keep your own copy to remember changes")
+        self.stats['think_time'] = {
+            'pacman': self._think_time['pacman_step'],
+            'ghost': self._think_time['ghost_step'],
+        }
+        if self.ponder_budget:
+            self.stats['ponder_time'] = {
+                'pacman': self.pacman_worker.ponder_time,
+                'ghost': self.ghost_worker.ponder_time,
+            }
+        if self.memory_tracker is not None:
+            self.stats['memory'] = self.memory_tracker.end_game()
+        if prof is not None:
+            prof.end_game()
         
         # Display final results
         self.display_results(result)
@@ -216,37 +354,90 @@ class Arena:
         Args:
             result: Game result ('pacman_wins', 'ghost_wins', or 'draw')
         """
-        print(f"\n{'='*60}")
-        print(f"{'GAME OVER':^60}")
-        print(f"{'='*60}\n")
+        self._print(f"\n{'='*60}")
+        self._print(f"{'GAME OVER':^60}")
+        self._print(f"{'='*60}\n")
         
         if result == 'pacman_wins':
-            print(f"🏆 WINNER: {self.pacman_id} (Pacman)")
-            print(f"   Pacman caught the Ghost!")
+            self._print(f"🏆 WINNER: {self.pacman_id} (Pacman)")
+            self._print(f"   Pacman caught the Ghost!")
         elif result == 'ghost_wins':
-            print(f"🏆 WINNER: {self.ghost_id} (Ghost)")
-            print(f"   Ghost successfully evaded Pacman!")
+            self._print(f"🏆 WINNER: {self.ghost_id} (Ghost)")
+            self._print(f"   Ghost successfully evaded Pacman!")
         elif result == 'draw':
-            print(f"🤝 DRAW")
-            print(f"   Maximum steps ({self.max_steps}) reached without capture")
+            self._print(f"🤝 DRAW")
+            self._print(f"   Maximum steps ({self.max_steps}) reached without capture")
         
-        print(f"\nGame Statistics:")
-        print(f"  Total Steps: {self.stats['total_steps']}")
-        print(f"  Final Distance: {self.env.get_distance(self.env.pacman_pos, self.env.ghost_pos)}")
-        print(f"\n{'='*60}\n")
+        self._print(f"\nGame Statistics:")
+        self._print(f"  Total Steps: {self.stats['total_steps']}")
+        self._print(f"  Final Distance: {self.env.get_distance(self.env.pacman_pos, self.env.ghost_pos)}")
+        wall_moves = self.stats.get('wall_moves')
+        if wall_moves and any(wall_moves.values()):
+            self._print(f"  Moves into walls: Pacman {wall_moves['pacman']}, Ghost {wall_moves['ghost']}")
+        self._print(f"\n{'='*60}\n")
+
+    def close(self):
+        """Stop agent worker processes (parallel mode)."""
+        for worker in (self.pacman_worker, self.ghost_worker):
+            if worker is not None:
+                worker.close()
+        self.pacman_worker = None
+        self.ghost_worker = None
+
+    def _dispatch_workers(self, pacman_pos, ghost_pos, step: int) -> Optional[float]:
+        self.pacman_worker.request_step(pacman_pos, ghost_pos, step)
+        self.ghost_worker.request_step(ghost_pos, pacman_pos, step)
+        if not self.step_timeout:
+            return None
+        return perf_counter() + self.step_timeout
+
+    def _wait_worker(self, worker: "AgentWorker", deadline: Optional[float], phase: str):
+        t0 = perf_counter()
+        timeout = None if deadline is None else deadline - t0
+        try:
+            return worker.wait_step(timeout)
+        finally:
+            self._record_think(phase, perf_counter() - t0)
+            if self.memory_tracker is not None:
+                self.memory_tracker.sample_process(phase[:-len('_step')], worker.process.pid)
+
+    def _record_think(self, phase: str, elapsed: float):
+        self._think_time[phase] += elapsed
+        if self.profiler is not None:
+            self.profiler.add(phase, elapsed)
+        if self.metrics is not None:
+            agent_id = self.pacman_id if phase == 'pacman_step' else self.ghost_id
+            self.metrics.observe_step(agent_id, phase[:-len('_step')], elapsed)
+
+    def _print(self, *args, **kwargs):
+        if self.verbose:
+            print(*args, **kwargs)
 
-    def _run_agent_step(self, step_callable):
+    def _run_agent_step(self, step_callable, phase: Optional[str] = None):
+        if phase is None:
+            return self._call_with_timeout(step_callable)
+
+        profile = self.profiler.agent_profile(phase) if self.profiler is not None else None
+        if profile is not None:
+            inner = step_callable
+            step_callable = lambda: profile.runcall(inner)
+        memory = self.memory_tracker
+        if memory is not None:
+            memory.before_step()
+        t0 = perf_counter()
+        try:
+            return self._call_with_timeout(step_callable)
+        finally:
+            self._record_think(phase, perf_counter() - t0)
+            if memory is not None:
+                memory.after_step(phase[:-len('_step')])
+
+    def _call_with_timeout(self, step_callable):
         if not self.step_timeout or self.step_timeout <= 0:
             return step_callable()
 
-        previous_handler = signal.getsignal(signal.SIGALRM)
-        try:
-            signal.signal(signal.SIGALRM, _agent_timeout_handler)
-            _start_alarm(self.step_timeout)
+        with Deadline(self.step_timeout):
             return step_callable()
-        finally:
-            _cancel_alarm()
-            signal.signal(signal.SIGALRM, previous_handler)
 
 
 def main():
@@ -259,6 +450,9 @@ Examples:
   python arena.py --seek student1 --hide student2
   python arena.py --seek student1 --hide student2 --max-steps 300 --no-viz
   python arena.py --seek alice --hide bob --delay 0.5
+  python arena.py --seek alice --hide bob --no-viz --profile-agents --profile-output game.folded
+  python arena.py --seek builtin:tablebase --hide alice --no-viz
+  python arena.py --seek alice --hide bob --no-viz --track-memory
         """
     )
     
@@ -266,14 +460,14 @@ Examples:
         '--seek', '--pacman',
         dest='seek',
         required=True,
-        help='Student ID for the Pacman (seeker) agent'
+        help='Student ID for the Pacman (seeker) agent, or builtin:<name>'
     )
     
     parser.add_argument(
         '--hide', '--ghost',
         dest='hide',
         required=True,
-        help='Student ID for the Ghost (hider) agent'
+        help='Student ID for the Ghost (hider) agent, or builtin:<name>'
     )
     
     parser.add_argument(
@@ -308,8 +502,56 @@ Examples:
         default=3.0,
         help='Maximum seconds allowed per agent step (<=0 disables timeout)'
     )
+
+    parser.add_argument(
+        '--parallel',
+        action='store_true',
+        help='Run each agent in its own process and compute both moves concurrently'
+    )
+
+    parser.add_argument(
+        '--ponder-budget',
+        type=float,
+        default=0.0,
+        help='CPU seconds per step agents may spend pondering between steps (implies --parallel)'
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Print a per-phase timing breakdown after the game'
+    )
+
+    parser.add_argument(
+        '--profile-agents',
+        action='store_true',
+        help='Also run cProfile around each agent step (implies --profile)'
+    )
+
+    parser.add_argument(
+        '--profile-output',
+        default=None,
+        help='Write flamegraph-compatible folded stacks to this file (implies --profile)'
+    )
+    
+    parser.add_argument(
+        '--track-memory',
+        action='store_true',
+        help='Sample each agent\'s memory (tracemalloc/RSS) per step and report peak and growth'
+    )
     
     args = parser.parse_args()
+    if args.profile_agents and args.parallel:
+        parser.error('--profile-agents cannot profile agents running in --parallel worker processes')
+
+    profiler = None
+    if args.profile or args.profile_agents or args.profile_output:
+        from profiler import PhaseProfiler
+        profiler = PhaseProfiler(profile_agents=args.profile_agents)
+    memory_tracker = None
+    if args.track_memory:
+        from memtrack import MemoryTracker
+        memory_tracker = MemoryTracker()
     
     # Create and run arena
     arena = Arena(
@@ -319,11 +561,29 @@ Examples:
         max_steps=args.max_steps,
         visualize=not args.no_viz,
         delay=args.delay,
-        step_timeout=args.step_timeout
+        step_timeout=args.step_timeout,
+        profiler=profiler,
+        parallel=args.parallel,
+        ponder_budget=args.ponder_budget,
+        memory_tracker=memory_tracker
     )
     
     arena.load_agents()
-    result, stats = arena.run_game()
+    try:
+        result, stats = arena.run_game()
+    finally:
+        arena.close()
+
+    if profiler is not None:
+        print(profiler.format_breakdown())
+        if args.profile_agents:
+            profiler.print_agent_stats()
+        if args.profile_output:
+            profiler.write_folded(args.profile_output)
+            print(f"Folded stacks written to {args.profile_output}")
+    if memory_tracker is not None:
+        print(memory_tracker.format_report())
+        memory_tracker.close()
     
     return 0 if result in ['pacman_wins', 'ghost_wins', 'draw'] else 1
 
@@ -0,0 +1,494 @@
+"""
+Throughput benchmarks for the environment and the arena.
+
+Runs fixed-seed scenarios, reports steps/sec, games/sec and peak memory,
+saves the results as JSON and compares them against a stored baseline.
+
+Examples:
+  python benchmark.py run --output bench.json
+  python benchmark.py run --quick --baseline bench_baseline.json
+  python benchmark.py compare bench_baseline.json bench.json --threshold 0.1
+  python benchmark.py imports arena --budget-ms 150
+"""
+
+import argparse
+import json
+import platform
+import random
+import signal
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from agent_interface import GhostAgent, PacmanAgent
+from arena import Arena
+from deadline import AgentTimeoutError, Deadline
+from environment import Environment, Move, generate_maze
+
+
+SUBMISSIONS_DIR = str(Path(__file__).resolve().parent.parent / "submissions")
+ALL_MOVES = list(Move)
+
+# Metrics where a higher value is better; everything else is lower-is-better
+HIGHER_IS_BETTER = {'steps_per_sec', 'games_per_sec'}
+
+
+class RandomPacman(PacmanAgent):
+    """Pacman that picks uniformly random moves (baseline cost of the arena)."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.rng = random.Random(kwargs.get('seed', 0))
+
+    def step(self, map_state, my_position, enemy_position, step_number):
+        return self.rng.choice(ALL_MOVES)
+
+
+class RandomGhost(GhostAgent):
+    """Ghost that picks uniformly random moves (baseline cost of the arena)."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.rng = random.Random(kwargs.get('seed', 1))
+
+    def step(self, map_state, my_position, enemy_position, step_number):
+        return self.rng.choice(ALL_MOVES)
+
+
+def _seed_all(seed: int):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def bench_environment(map_layout: Optional[np.ndarray], steps: int, seed: int) -> Dict:
+    """
+    Drive Environment.step with random moves, resetting when a game ends.
+
+    Args:
+        map_layout: Map to play on (None for the default map)
+        steps: Number of environment steps to execute
+        seed: Random seed
+
+    Returns:
+        Dict with steps, games and elapsed seconds
+    """
+    _seed_all(seed)
+    env = Environment(map_layout=map_layout)
+    rng = np.random.default_rng(seed)
+    moves = [ALL_MOVES[i] for i in rng.integers(len(ALL_MOVES), size=(steps, 2)).ravel()]
+    games = 0
+
+    start = time.perf_counter()
+    env.reset()
+    for i in range(0, 2 * steps, 2):
+        game_over, _, _ = env.step(moves[i], moves[i + 1])
+        if game_over:
+            games += 1
+            env.reset()
+    elapsed = time.perf_counter() - start
+
+    return {'steps': steps, 'games': games, 'elapsed': elapsed}
+
+
+def _noop_step():
+    return Move.STAY
+
+
+def _timeout_handler(signum, frame):
+    raise AgentTimeoutError("Agent step exceeded the allowed time")
+
+
+def bench_step_timeout(calls: int, mechanism: str) -> Dict:
+    """
+    Per-call cost of guarding a trivial step with a timeout.
+
+    Args:
+        calls: Number of guarded calls
+        mechanism: 'deadline' (deadline.Deadline, what the arena uses) or
+            'sigalrm' (the handler swap plus setitimer pair it replaced)
+
+    Returns:
+        Dict with steps (= calls), games (0) and elapsed seconds
+    """
+    start = time.perf_counter()
+    if mechanism == 'deadline':
+        for _ in range(calls):
+            with Deadline(3.0):
+                _noop_step()
+    else:
+        for _ in range(calls):
+            previous = signal.getsignal(signal.SIGALRM)
+            try:
+                signal.signal(signal.SIGALRM, _timeout_handler)
+                signal.setitimer(signal.ITIMER_REAL, 3.0)
+                _noop_step()
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+    elapsed = time.perf_counter() - start
+    return {'steps': calls, 'games': 0, 'elapsed': elapsed}
+
+
+def bench_arena(pacman: str, ghost: str, games: int, seed: int,
+                map_layout: Optional[np.ndarray] = None,
+                max_steps: int = 200, step_timeout: Optional[float] = None) -> Dict:
+    """
+    Play full games through Arena.run_game.
+
+    Args:
+        pacman: Student ID of the Pacman agent, or 'random'
+        ghost: Student ID of the Ghost agent, or 'random'
+        games: Number of games to play
+        seed: Base random seed (game i uses seed + i)
+        map_layout: Map to play on (None for the default map)
+        max_steps: Maximum steps per game
+        step_timeout: Per-step timeout (None measures the arena without one)
+
+    Returns:
+        Dict with steps, games and elapsed seconds
+    """
+    total_steps = 0
+    elapsed = 0.0
+    for i in range(games):
+        _seed_all(seed + i)
+        arena = Arena(
+            pacman_id=pacman,
+            ghost_id=ghost,
+            submissions_dir=SUBMISSIONS_DIR,
+            max_steps=max_steps,
+            visualize=False,
+            delay=0,
+            step_timeout=step_timeout,
+            map_layout=map_layout,
+            verbose=False,
+        )
+        if pacman == 'random':
+            arena.pacman_agent = RandomPacman(seed=seed + i)
+        else:
+            arena.pacman_agent = arena.loader.load_agent(pacman, 'pacman')
+        if ghost == 'random':
+            arena.ghost_agent = RandomGhost(seed=seed + i + 1)
+        else:
+            arena.ghost_agent = arena.loader.load_agent(ghost, 'ghost')
+
+        start = time.perf_counter()
+        _, stats = arena.run_game()
+        elapsed += time.perf_counter() - start
+        total_steps += stats['total_steps']
+
+    return {'steps': total_steps, 'games': games, 'elapsed': elapsed}
+
+
+def build_scenarios(quick: bool = False) -> Dict[str, Callable[[], Dict]]:
+    """
+    Build the fixed-seed benchmark scenarios.
+
+    Args:
+        quick: Use smaller workloads (for smoke runs, not for baselines)
+
+    Returns:
+        Mapping of scenario name to a zero-argument callable
+    """
+    scale = 0.1 if quick else 1.0
+    env_steps = max(1000, int(200_000 * scale))
+    fast_games = max(2, int(100 * scale))
+    slow_games = max(2, int(20 * scale))
+    timeout_calls = max(1000, int(100_000 * scale))
+    large_map = generate_maze(101, 101, seed=2024)
+
+    scenarios = {
+        'env_step_default_map': lambda: bench_environment(None, env_steps, seed=1),
+        'env_step_large_map': lambda: bench_environment(large_map, env_steps, seed=2),
+        'arena_random_vs_random': lambda: bench_arena(
+            'random', 'random', fast_games, seed=3),
+        'arena_random_vs_random_timeout': lambda: bench_arena(
+            'random', 'random', fast_games, seed=3, step_timeout=3.0),
+        'step_timeout_deadline': lambda: bench_step_timeout(timeout_calls, 'deadline'),
+        'arena_greedy_vs_greedy': lambda: bench_arena(
+            'example_student', 'example_student', fast_games, seed=4),
+        'arena_greedy_vs_minimax': lambda: bench_arena(
+            'example_student', '23120405', slow_games, seed=5),
+        'arena_greedy_large_map': lambda: bench_arena(
+            'example_student', 'example_student', slow_games, seed=6,
+            map_layout=large_map, max_steps=1000),
+    }
+    if hasattr(signal, 'setitimer'):
+        scenarios['step_timeout_sigalrm'] = lambda: bench_step_timeout(timeout_calls, 'sigalrm')
+    return scenarios
+
+
+def run_scenario(scenario: Callable[[], Dict], repeat: int) -> Dict:
+    """
+    Run a scenario ``repeat`` times for timing plus once under tracemalloc.
+
+    The fastest repetition is reported, which is the least noisy estimate
+    of the achievable throughput. Memory is measured in a separate pass
+    because tracemalloc slows allocation-heavy code considerably.
+
+    Returns:
+        Dict with throughput and memory metrics
+
+    Raises:
+        ValueError: If repeat is less than 1
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+    best = None
+    for _ in range(repeat):
+        result = scenario()
+        if best is None or result['elapsed'] < best['elapsed']:
+            best = result
+
+    tracemalloc.start()
+    try:
+        scenario()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    elapsed = best['elapsed'] if best['elapsed'] > 0 else float('inf')
+    return {
+        'steps': best['steps'],
+        'games': best['games'],
+        'elapsed': best['elapsed'],
+        'steps_per_sec': best['steps'] / elapsed,
+        'games_per_sec': best['games'] / elapsed,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = 3,
+                   quick: bool = False) -> Dict:
+    """
+    Run the benchmark suite.
+
+    Args:
+        names: Scenario names to run (all when None)
+        repeat: Timed repetitions per scenario
+        quick: Use smaller workloads
+
+    Returns:
+        Results dictionary ready to be saved as JSON
+    """
+    scenarios = build_scenarios(quick=quick)
+    if names:
+        unknown = set(names) - set(scenarios)
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = {name: scenarios[name] for name in names}
+
+    results = {}
+    for name, scenario in scenarios.items():
+        print(f"Running {name}...", flush=True)
+        results[name] = run_scenario(scenario, repeat)
+        r = results[name]
+        print(f"  {r['steps_per_sec']:>12.1f} steps/s  {r['games_per_sec']:>9.2f} games/s"
+              f"  peak {r['peak_memory_kb']:>9.1f} KiB")
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'quick': quick,
+        },
+        'scenarios': results,
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.1) -> List[Dict]:
+    """
+    Compare two result files metric by metric.
+
+    Args:
+        baseline: Stored baseline results
+        current: Newly measured results
+        threshold: Relative change that counts as a regression (0.1 = 10%)
+
+    Returns:
+        List of comparison rows with a 'regression' flag
+    """
+    rows = []
+    for name, base in baseline['scenarios'].items():
+        cur = current['scenarios'].get(name)
+        if cur is None:
+            continue
+        for metric in ('steps_per_sec', 'games_per_sec', 'peak_memory_kb'):
+            old, new = base.get(metric), cur.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if metric in HIGHER_IS_BETTER:
+                regression = change < -threshold
+            else:
+                regression = change > threshold
+            rows.append({
+                'scenario': name,
+                'metric': metric,
+                'baseline': old,
+                'current': new,
+                'change': change,
+                'regression': regression,
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict]) -> bool:
+    """
+    Print a comparison table.
+
+    Returns:
+        True if any regression was found
+    """
+    print(f"\n{'Scenario':<28}{'Metric':<16}{'Baseline':>14}{'Current':>14}{'Change':>10}")
+    print('-' * 82)
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['scenario']:<28}{row['metric']:<16}{row['baseline']:>14.1f}"
+              f"{row['current']:>14.1f}{row['change'] * 100:>9.1f}%{flag}")
+    return any(row['regression'] for row in rows)
+
+
+def measure_imports(module: str, repeat: int = 5) -> Dict:
+    """
+    Measure the import time of a module in fresh interpreters.
+
+    Uses ``python -X importtime``; the fastest of ``repeat`` runs is kept,
+    since slower runs only add disk cache and scheduling noise.
+
+    Args:
+        module: Module to import (from this directory)
+        repeat: Interpreters started
+
+    Returns:
+        Dictionary with 'module', 'total_ms' and 'modules' (per imported
+        module: 'self_ms' and 'cumulative_ms')
+
+    Raises:
+        ValueError: If repeat is less than 1
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=Path(__file__).resolve().parent, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+        modules = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = {
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+            }
+        total = modules[module]['cumulative_ms']
+        if best is None or total < best['total_ms']:
+            best = {'module': module, 'total_ms': total, 'modules': modules}
+    return best
+
+
+def print_imports(result: Dict, top: int = 10):
+    """Print the import time of a module and its slowest dependencies."""
+    print(f"\nimport {result['module']}: {result['total_ms']:.1f} ms")
+    print(f"\n{'Module':<40}{'Self ms':>10}{'Cumulative ms':>16}")
+    print('-' * 66)
+    slowest = sorted(result['modules'].items(), key=lambda item: -item[1]['self_ms'])
+    for name, times in slowest[:top]:
+        print(f"{name:<40}{times['self_ms']:>10.1f}{times['cumulative_ms']:>16.1f}")
+
+
+def main():
+    """Main entry point for the benchmark suite."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='Run the benchmark scenarios')
+    run_parser.add_argument('--output', default='benchmark_results.json',
+                            help='Where to save the JSON results')
+    run_parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help='Run only this scenario (repeatable)')
+    run_parser.add_argument('--repeat', type=int, default=3,
+                            help='Timed repetitions per scenario (default: 3)')
+    run_parser.add_argument('--quick', action='store_true',
+                            help='Smaller workloads for a fast smoke run')
+    run_parser.add_argument('--baseline', default=None,
+                            help='Compare against this baseline after running')
+    run_parser.add_argument('--threshold', type=float, default=0.1,
+                            help='Relative change flagged as regression (default: 0.1)')
+
+    cmp_parser = sub.add_parser('compare', help='Compare two result files')
+    cmp_parser.add_argument('baseline', help='Baseline JSON results')
+    cmp_parser.add_argument('current', help='Current JSON results')
+    cmp_parser.add_argument('--threshold', type=float, default=0.1,
+                            help='Relative change flagged as regression (default: 0.1)')
+
+    sub.add_parser('list', help='List available scenarios')
+
+    imp_parser = sub.add_parser('imports', help='Measure module import time')
+    imp_parser.add_argument('modules', nargs='*', default=['arena'],
+                            help='Modules to import (default: arena)')
+    imp_parser.add_argument('--repeat', type=int, default=5,
+                            help='Fresh interpreters per module (default: 5)')
+    imp_parser.add_argument('--top', type=int, default=10,
+                            help='Slowest modules listed (default: 10)')
+    imp_parser.add_argument('--budget-ms', type=float, default=None,
+                            help='Fail if any module takes longer to import')
+
+    args = parser.parse_args()
+    if getattr(args, 'repeat', 1) < 1:
+        parser.error('--repeat must be at least 1')
+
+    if args.command == 'imports':
+        over = False
+        for module in args.modules:
+            result = measure_imports(module, repeat=args.repeat)
+            print_imports(result, top=args.top)
+            if args.budget_ms is not None and result['total_ms'] > args.budget_ms:
+                print(f"  OVER BUDGET ({args.budget_ms:g} ms)")
+                over = True
+        return 1 if over else 0
+
+    if args.command == 'list':
+        for name in build_scenarios(quick=True):
+            print(name)
+        return 0
+
+    if args.command == 'compare':
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+        regressed = print_comparison(compare_results(baseline, current, args.threshold))
+        return 1 if regressed else 0
+
+    results = run_benchmarks(args.scenarios, repeat=args.repeat, quick=args.quick)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressed = print_comparison(compare_results(baseline, results, args.threshold))
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
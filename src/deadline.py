@@ -0,0 +1,245 @@
+"""
+Per-thread deadlines for agent steps.
+
+Replaces the SIGALRM timer the arena used to set around every step,
+which only works in the main thread and needs a handler swap plus two
+setitimer syscalls per call. Deadlines here work from any thread:
+
+  - A single watchdog thread keeps a heap of armed deadlines and, when
+    one expires, raises AgentTimeoutError in the owning thread with
+    PyThreadState_SetAsyncExc.
+  - Scopes nest: an inner scope never outlives its enclosing one, and
+    a scope that cannot expire before its parent arms nothing.
+  - Code that wants to stop on its own (iterative deepening, anytime
+    search) can poll remaining() or call check().
+
+Usage:
+  from deadline import Deadline, remaining
+
+  with Deadline(3.0):
+      move = agent.step(...)
+
+  while remaining() > 0.05:   # inside an agent
+      deepen()
+
+Asynchronous exceptions are delivered between Python bytecodes, so a
+step blocked in a C call is interrupted only when that call returns.
+This is a change from SIGALRM, whose signal cut time.sleep() and lock
+waits short: an in-process agent that sleeps, waits on a lock or a
+queue, or runs a long NumPy operation past its deadline now overruns
+until the call returns, and only then gets AgentTimeoutError. Agents
+in worker processes (agent_worker) are stopped by their parent killing
+the process instead.
+"""
+
+import ctypes
+import heapq
+import itertools
+import math
+import os
+import threading
+from time import monotonic
+from typing import List, Optional
+
+
+class AgentTimeoutError(Exception):
+    """Raised when an agent exceeds the allowed time per step."""
+
+
+_ARMED, _CANCELLED, _FIRED = 0, 1, 2
+
+# Cancelled heap entries tolerated before the heap is rebuilt without them
+_COMPACT_MIN = 256
+
+
+def _raise_in_thread(thread_id: int, exc_type: Optional[type]):
+    """Set (or clear, with None) the pending async exception of a thread."""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), ctypes.py_object(exc_type) if exc_type else None
+    )
+
+
+class _Entry:
+    __slots__ = ('expiry', 'thread_id', 'state')
+
+    def __init__(self, expiry: float, thread_id: int):
+        self.expiry = expiry
+        self.thread_id = thread_id
+        self.state = _ARMED
+
+
+class _Watchdog:
+    """
+    Background thread firing expired deadlines.
+
+    Disarming only marks the entry (it is dropped when it reaches the top
+    of the heap), and arming only wakes the thread when the new deadline
+    is earlier than the one it is already sleeping towards. With steps
+    shorter than the timeout the previous step's entry is always earlier,
+    so in steady state the thread wakes about once per timeout period
+    rather than once per step.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._heap: List = []
+        self._order = itertools.count()
+        self._cancelled = 0
+        self._sleep_until = math.inf
+        self._thread: Optional[threading.Thread] = None
+
+    def arm(self, entry: _Entry):
+        with self._lock:
+            heapq.heappush(self._heap, (entry.expiry, next(self._order), entry))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='deadline-watchdog', daemon=True)
+                self._thread.start()
+            elif entry.expiry < self._sleep_until:
+                self._wakeup.notify()
+
+    def disarm(self, entry: _Entry) -> bool:
+        """
+        Cancel an entry.
+
+        Returns:
+            True if the watchdog fired it first
+        """
+        with self._lock:
+            if entry.state != _ARMED:
+                return entry.state == _FIRED
+            entry.state = _CANCELLED
+            self._cancelled += 1
+            if self._cancelled > _COMPACT_MIN and 2 * self._cancelled > len(self._heap):
+                self._heap = [item for item in self._heap if item[2].state == _ARMED]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+            return False
+
+    def _run(self):
+        with self._lock:
+            while True:
+                heap = self._heap
+                now = monotonic()
+                while heap and (heap[0][2].state != _ARMED or heap[0][0] <= now):
+                    entry = heapq.heappop(heap)[2]
+                    if entry.state == _ARMED:
+                        entry.state = _FIRED
+                        _raise_in_thread(entry.thread_id, AgentTimeoutError)
+                    else:
+                        self._cancelled = max(0, self._cancelled - 1)
+                self._sleep_until = heap[0][0] if heap else math.inf
+                self._wakeup.wait(self._sleep_until - now if heap else None)
+
+    def _after_fork(self):
+        # The thread does not survive fork(); the child starts its own on demand
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._heap = []
+        self._cancelled = 0
+        self._sleep_until = math.inf
+        self._thread = None
+
+
+_watchdog = _Watchdog()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_watchdog._after_fork)
+
+_local = threading.local()
+
+
+def _stack() -> List["Deadline"]:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class Deadline:
+    """
+    Context manager limiting the time spent in its block.
+
+    Raises AgentTimeoutError in the block's thread when the time is up.
+    If the deadline fires just as the block finishes, the error is raised
+    on exit instead, so an expired step is never reported as completed.
+    """
+
+    __slots__ = ('seconds', 'expiry', '_entry', '_depth')
+
+    def __init__(self, seconds: Optional[float]):
+        """
+        Args:
+            seconds: Time allowed; None or <= 0 means no limit of its own
+                (an enclosing deadline still applies)
+        """
+        self.seconds = seconds
+        self.expiry = math.inf
+        self._entry: Optional[_Entry] = None
+        self._depth = 0
+
+    def __enter__(self) -> "Deadline":
+        stack = _stack()
+        self._depth = len(stack)
+        parent = stack[-1].expiry if stack else math.inf
+        expiry = monotonic() + self.seconds if self.seconds and self.seconds > 0 else math.inf
+        if expiry < parent:
+            self.expiry = expiry
+            self._entry = _Entry(expiry, threading.get_ident())
+            try:
+                _watchdog.arm(self._entry)
+            except BaseException:
+                _watchdog.disarm(self._entry)
+                raise
+        else:
+            self.expiry = parent
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            entry = self._entry
+            if entry is None:
+                return False
+            self._entry = None
+            if _watchdog.disarm(entry):
+                # The exception may still be pending if it fired after the
+                # block's last bytecode; drop it and raise it here instead
+                _raise_in_thread(entry.thread_id, None)
+                if exc_type is None:
+                    raise AgentTimeoutError("Agent step exceeded the allowed time")
+            return False
+        finally:
+            # Truncate rather than pop: even if an asynchronous exception
+            # lands in here, this scope leaves the stack, along with any
+            # inner scope whose exit was cut short (its entry disarmed so
+            # it cannot fire later)
+            stack = _stack()
+            for stale in stack[self._depth + 1:]:
+                if stale._entry is not None:
+                    _watchdog.disarm(stale._entry)
+                    stale._entry = None
+            del stack[self._depth:]
+
+    def remaining(self) -> float:
+        """Seconds left before this deadline (inf if unlimited)."""
+        return max(0.0, self.expiry - monotonic())
+
+
+def remaining() -> float:
+    """Seconds left before the innermost deadline of this thread (inf if none)."""
+    stack = _stack()
+    if not stack:
+        return math.inf
+    return max(0.0, stack[-1].expiry - monotonic())
+
+
+def check():
+    """
+    Raise AgentTimeoutError if this thread's innermost deadline has passed.
+
+    Lets CPU-bound code stop promptly at points of its choosing, even
+    inside C calls the watchdog cannot interrupt.
+    """
+    stack = _stack()
+    if stack and monotonic() >= stack[-1].expiry:
+        raise AgentTimeoutError("Agent step exceeded the allowed time")
@@ -0,0 +1,191 @@
+"""
+Cached BFS distance fields keyed by target cell.
+
+A distance field holds, for every cell, the maze distance to one target.
+A Pacman chasing a Ghost needs the field of the Ghost's cell each step;
+the Ghost moves at most one cell per step, so fields are cached (LRU,
+keyed by map hash and target cell) and a field for a new target is
+derived from a cached neighbour's field when possible.
+
+Usage from an agent:
+  from distance_field import get_field, move_towards
+
+  field = get_field(map_state, enemy_position)   # 2D int32 array
+  move = move_towards(map_state, my_position, enemy_position)
+"""
+
+from collections import OrderedDict, deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+from environment import Move
+from map_graph import MOVES, CompiledMap, compile_map
+from pathfinding import bfs_distances
+
+
+class DistanceField:
+    """
+    Distance field of one target on one map.
+
+    Attributes:
+        target: Target cell id
+        cells: (n_cells,) int32 distances indexed by cell id, -1 unreachable
+        grid: (height, width) int32 distances, -1 for walls and unreachable
+    """
+
+    __slots__ = ('target', 'cells', 'grid')
+
+    def __init__(self, compiled: CompiledMap, target: int, cells: np.ndarray):
+        self.target = target
+        self.cells = cells
+        self.cells.flags.writeable = False
+        self.grid = np.full(compiled.map.shape, -1, dtype=np.int32)
+        self.grid[compiled.coords[:, 0], compiled.coords[:, 1]] = cells
+        self.grid.flags.writeable = False
+
+
+def _repair(compiled: CompiledMap, previous: DistanceField, target: int) -> np.ndarray:
+    """
+    Derive the field of ``target`` from the field of an adjacent cell.
+
+    Moving the target one step changes every distance by at most one, so
+    ``previous + 1`` is an upper bound everywhere. A BFS from the new
+    target then only lowers cells that are now at most as far as before
+    (every cell on their shortest path is lowered too, so the BFS reaches
+    them in order); cells behind the old target keep ``previous + 1``
+    without being visited.
+    """
+    unreachable = compiled.n_cells + 1
+    est = np.where(previous.cells >= 0, previous.cells + 1, unreachable).tolist()
+    neighbors = compiled.neighbor_lists
+    est[target] = 0
+    queue = deque([target])
+    while queue:
+        cell = queue.popleft()
+        candidate = est[cell] + 1
+        for nxt in neighbors[cell]:
+            if candidate < est[nxt]:
+                est[nxt] = candidate
+                queue.append(nxt)
+    cells = np.array(est, dtype=np.int32)
+    cells[cells == unreachable] = -1
+    return cells
+
+
+class DistanceFieldCache:
+    """
+    LRU cache of distance fields keyed by (map hash, target cell).
+    """
+
+    def __init__(self, max_fields: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            max_fields: Maximum number of fields kept (across all maps)
+        """
+        self.max_fields = max_fields
+        self._fields: "OrderedDict[Tuple[str, int], DistanceField]" = OrderedDict()
+        self.hits = 0
+        self.repairs = 0
+        self.misses = 0
+
+    def field(self, compiled: CompiledMap, target: int) -> DistanceField:
+        """
+        Get the field of a target cell on a compiled map.
+
+        Args:
+            compiled: Compiled map
+            target: Target cell id
+
+        Returns:
+            DistanceField (shared; its arrays are read-only)
+        """
+        key = (compiled.key, target)
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            self.hits += 1
+            return field
+
+        cells = None
+        for neighbor in compiled.adjacency[target]:
+            previous = self._fields.get((compiled.key, neighbor))
+            if previous is not None:
+                cells = _repair(compiled, previous, target)
+                self.repairs += 1
+                break
+        if cells is None:
+            cells = np.array(bfs_distances(compiled, [target]), dtype=np.int32)
+            self.misses += 1
+
+        field = DistanceField(compiled, target, cells)
+        self._fields[key] = field
+        if len(self._fields) > self.max_fields:
+            self._fields.popitem(last=False)
+        return field
+
+    def get(self, map_state: np.ndarray, target: Tuple[int, int]) -> np.ndarray:
+        """
+        Get the distance field of a target position.
+
+        Args:
+            map_state: 2D numpy array where 1 = wall, 0 = empty
+            target: Target (row, col)
+
+        Returns:
+            Read-only (height, width) int32 array of distances to target;
+            -1 for walls and unreachable cells
+
+        Raises:
+            ValueError: If target is a wall or outside the map
+        """
+        compiled = compile_map(map_state)
+        cell = compiled.cell_id(target)
+        if cell < 0:
+            raise ValueError(f"Target {target} is not an empty cell")
+        return self.field(compiled, cell).grid
+
+    def clear(self):
+        """Drop all cached fields."""
+        self._fields.clear()
+
+
+# Module-level cache shared by get_field() and move_towards()
+_default_cache = DistanceFieldCache()
+
+
+def get_field(map_state: np.ndarray, target: Tuple[int, int]) -> np.ndarray:
+    """Distance field of ``target`` from the shared cache (see DistanceFieldCache.get)."""
+    return _default_cache.get(map_state, target)
+
+
+def move_towards(map_state: np.ndarray, position: Tuple[int, int],
+                 target: Tuple[int, int],
+                 cache: Optional[DistanceFieldCache] = None) -> Move:
+    """
+    Move along a shortest path from position to target.
+
+    Args:
+        map_state: 2D numpy array where 1 = wall, 0 = empty
+        position: Current (row, col)
+        target: Target (row, col)
+        cache: Cache to use (the shared one by default)
+
+    Returns:
+        Move that decreases the distance, or Move.STAY if already there
+        or the target is unreachable
+    """
+    cache = cache if cache is not None else _default_cache
+    compiled = compile_map(map_state)
+    me, goal = compiled.cell_id(position), compiled.cell_id(target)
+    if me < 0 or goal < 0:
+        return Move.STAY
+    dist = cache.field(compiled, goal).cells
+    if dist[me] <= 0:
+        return Move.STAY
+    for m, nxt in enumerate(compiled.neighbor_lists[me]):
+        if dist[nxt] == dist[me] - 1:
+            return MOVES[m]
+    return Move.STAY
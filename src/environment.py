@@ -25,6 +25,60 @@ class Move(Enum):
     STAY = (0, 0)
 
 
+class GameState:
+    """
+    Snapshot of the game handed from the environment to the arena.
+    
+    Uses __slots__ and shares the environment's agent map (see
+    Environment.get_state), so a state costs one small object per step
+    instead of a freshly allocated map. It still
+    unpacks like the (map, pacman_position, ghost_position) tuple that
+    get_state() used to return.
+    """
+    
+    __slots__ = ('map', 'pacman_pos', 'ghost_pos', 'step')
+    
+    def __init__(self, map_view: np.ndarray, pacman_pos: Tuple[int, int],
+                 ghost_pos: Tuple[int, int], step: int):
+        self.map = map_view
+        self.pacman_pos = pacman_pos
+        self.ghost_pos = ghost_pos
+        self.step = step
+    
+    def __iter__(self):
+        yield self.map
+        yield self.pacman_pos
+        yield self.ghost_pos
+    
+    def __getitem__(self, index):
+        return (self.map, self.pacman_pos, self.ghost_pos)[index]
+    
+    def __len__(self) -> int:
+        return 3
+    
+    def pack(self) -> int:
+        """
+        Encode both positions and the step number as one integer.
+        
+        Cells are numbered row * width + col; the result is
+        (step * cells + pacman_cell) * cells + ghost_cell.
+        """
+        height, width = self.map.shape
+        cells = height * width
+        pacman_cell = self.pacman_pos[0] * width + self.pacman_pos[1]
+        ghost_cell = self.ghost_pos[0] * width + self.ghost_pos[1]
+        return (self.step * cells + pacman_cell) * cells + ghost_cell
+    
+    @classmethod
+    def unpack(cls, map_view: np.ndarray, packed: int) -> "GameState":
+        """Rebuild a state encoded with pack()."""
+        height, width = map_view.shape
+        cells = height * width
+        rest, ghost_cell = divmod(packed, cells)
+        step, pacman_cell = divmod(rest, cells)
+        return cls(map_view, divmod(pacman_cell, width), divmod(ghost_cell, width), step)
+
+
 class Environment:
     """
     Game environment that manages the map and agent positions.
@@ -45,6 +99,12 @@ class Environment:
             self.map = map_layout.copy()
         
         self.height, self.width = self.map.shape
+        # Copy handed to agents. It owns its memory, so agents cannot reach
+        # self.map through it, and get_state() refreshes it in place, which
+        # is cheaper than allocating a copy per step
+        self._agent_map = self.map.copy()
+        # get_state() calls that found the agents' copy written to
+        self.map_writes = 0
         self.max_steps = max_steps
         self.current_step = 0
         
@@ -92,44 +152,95 @@ class Environment:
         
         return map_array
     
-    def reset(self) -> Tuple[np.ndarray, Tuple[int, int], Tuple[int, int]]:
+    def reset(self, pacman_pos: Optional[Tuple[int, int]] = None,
+              ghost_pos: Optional[Tuple[int, int]] = None) -> GameState:
         """
         Reset the environment to initial state.
         
+        Args:
+            pacman_pos: Force Pacman's start cell instead of sampling it
+            ghost_pos: Force Ghost's start cell instead of sampling it
+        
         Returns:
-            Tuple of (map, pacman_position, ghost_position)
+            GameState (unpacks as map, pacman_position, ghost_position)
+        
+        Raises:
+            ValueError: If a forced start cell is a wall or outside the map
         """
+        for pos in (pacman_pos, ghost_pos):
+            if pos is not None and not self.is_valid_position(pos):
+                raise ValueError(f"Start position {pos} is not an empty cell")
+        
         self.current_step = 0
         
         # Find valid starting positions (empty cells)
         empty_cells = np.argwhere(self.map == 0)
+        bottom_cells, top_cells = self.start_cells()
         
         # Set Pacman at bottom area
-        bottom_cells = empty_cells[empty_cells[:, 0] > self.height * 0.6]
-        if len(bottom_cells) > 0:
+        if pacman_pos is not None:
+            self.pacman_pos = (int(pacman_pos[0]), int(pacman_pos[1]))
+        elif len(bottom_cells) > 0:
             pacman_idx = np.random.choice(len(bottom_cells))
-            self.pacman_pos = tuple(bottom_cells[pacman_idx])
+            self.pacman_pos = tuple(bottom_cells[pacman_idx].tolist())
         else:
-            self.pacman_pos = tuple(empty_cells[0])
+            self.pacman_pos = tuple(empty_cells[0].tolist())
         
         # Set Ghost at top area
-        top_cells = empty_cells[empty_cells[:, 0] < self.height * 0.4]
-        if len(top_cells) > 0:
+        if ghost_pos is not None:
+            self.ghost_pos = (int(ghost_pos[0]), int(ghost_pos[1]))
+        elif len(top_cells) > 0:
             ghost_idx = np.random.choice(len(top_cells))
-            self.ghost_pos = tuple(top_cells[ghost_idx])
+            self.ghost_pos = tuple(top_cells[ghost_idx].tolist())
         else:
-            self.ghost_pos = tuple(empty_cells[-1])
+            self.ghost_pos = tuple(empty_cells[-1].tolist())
+        
+        state = self.get_state()
+        self.map_writes = 0
+        return state
+    
+    def start_cells(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the candidate starting cells used by reset().
+        
+        Pacman starts in the bottom 40% of the map and Ghost in the top 40%.
+        Either array may be empty on unusual maps, in which case reset()
+        falls back to the first/last empty cell.
         
-        return self.get_state()
+        Returns:
+            Tuple of (pacman_cells, ghost_cells), each an (N, 2) array of (row, col)
+        """
+        empty_cells = np.argwhere(self.map == 0)
+        bottom_cells = empty_cells[empty_cells[:, 0] > self.height * 0.6]
+        top_cells = empty_cells[empty_cells[:, 0] < self.height * 0.4]
+        return bottom_cells, top_cells
+    
+    def is_mirror_symmetric(self) -> bool:
+        """Check whether the map is identical to its left-right mirror image."""
+        return bool(np.array_equal(self.map, self.map[:, ::-1]))
     
-    def get_state(self) -> Tuple[np.ndarray, Tuple[int, int], Tuple[int, int]]:
+    def mirror_position(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        """Reflect a position across the vertical center line of the map."""
+        return (pos[0], self.width - 1 - pos[1])
+    
+    def get_state(self) -> GameState:
         """
         Get the current state of the environment.
         
+        The map in the state is the same array every step, reset to the
+        environment's map on each call: changes an agent makes to it never
+        affect the game, and do not carry over to the next step (agents
+        that want to remember them must keep their own copy). Calls that
+        find the array written to are counted in ``map_writes`` so the
+        arena can warn about it.
+        
         Returns:
-            Tuple of (map, pacman_position, ghost_position)
+            GameState (unpacks as map, pacman_position, ghost_position)
         """
-        return self.map.copy(), self.pacman_pos, self.ghost_pos
+        if not np.array_equal(self._agent_map, self.map):
+            self.map_writes += 1
+            np.copyto(self._agent_map, self.map)
+        return GameState(self._agent_map, self.pacman_pos, self.ghost_pos, self.current_step)
     
     def is_valid_position(self, pos: Tuple[int, int]) -> bool:
         """
@@ -164,7 +275,7 @@ class Environment:
             return new_pos
         return current_pos
     
-    def step(self, pacman_move: Move, ghost_move: Move) -> Tuple[bool, str, Tuple[np.ndarray, Tuple[int, int], Tuple[int, int]]]:
+    def step(self, pacman_move: Move, ghost_move: Move) -> Tuple[bool, str, GameState]:
         """
         Execute one step of the game.
         
@@ -235,3 +346,62 @@ class Environment:
         
         rows = [''.join(row) for row in display]
         return '\n'.join(rows)
+
+
+def generate_maze(height: int, width: int, seed: Optional[int] = None,
+                  loop_fraction: float = 0.1) -> np.ndarray:
+    """
+    Generate a procedural maze map.
+    
+    Carves a spanning-tree maze with an iterative depth-first search over
+    odd cells, then removes a fraction of the remaining inner walls so the
+    maze contains loops (a pure tree is trivially lost by the Ghost).
+    
+    Args:
+        height: Number of rows (rounded up to an odd number, minimum 5)
+        width: Number of columns (rounded up to an odd number, minimum 5)
+        seed: Seed for the random generator (same seed, same maze)
+        loop_fraction: Fraction of inner walls to knock out after carving
+        
+    Returns:
+        2D numpy array where 1 = wall, 0 = empty
+    """
+    height = max(5, height | 1)
+    width = max(5, width | 1)
+    rng = np.random.default_rng(seed)
+    
+    maze = np.ones((height, width), dtype=int)
+    start = (1, 1)
+    maze[start] = 0
+    stack = [start]
+    directions = [(-2, 0), (2, 0), (0, -2), (0, 2)]
+    
+    while stack:
+        row, col = stack[-1]
+        candidates = []
+        for d_row, d_col in directions:
+            n_row, n_col = row + d_row, col + d_col
+            if 0 < n_row < height - 1 and 0 < n_col < width - 1 and maze[n_row, n_col] == 1:
+                candidates.append((n_row, n_col))
+        if not candidates:
+            stack.pop()
+            continue
+        n_row, n_col = candidates[rng.integers(len(candidates))]
+        maze[(row + n_row) // 2, (col + n_col) // 2] = 0
+        maze[n_row, n_col] = 0
+        stack.append((n_row, n_col))
+    
+    # Knock out inner walls that separate two corridors to create loops
+    inner = maze[1:-1, 1:-1]
+    rows, cols = np.nonzero(inner == 1)
+    rows += 1
+    cols += 1
+    horizontal = (maze[rows, cols - 1] == 0) & (maze[rows, cols + 1] == 0)
+    vertical = (maze[rows - 1, cols] == 0) & (maze[rows + 1, cols] == 0)
+    breakable = np.nonzero(horizontal ^ vertical)[0]
+    n_break = int(len(breakable) * loop_fraction)
+    if n_break > 0:
+        chosen = rng.choice(breakable, size=n_break, replace=False)
+        maze[rows[chosen], cols[chosen]] = 0
+    
+    return maze
@@ -0,0 +1,173 @@
+"""
+Content fingerprints of submissions.
+
+A submission's behaviour depends on its agent.py and on the modules it
+imports from its own folder (AgentLoader puts that folder on sys.path).
+fingerprint() hashes exactly those files: it parses agent.py, follows
+every import that resolves inside the folder, and repeats for the
+modules found, so editing a helper module changes the fingerprint while
+editing an unrelated file in the folder does not.
+
+Built-in agents (builtin:<name>) are fingerprinted from reference_agents.py
+and the arena modules it imports. framework_fingerprint() covers the game
+rules and the arena, which every result depends on.
+
+Examples:
+  python fingerprint.py alice bob
+  python fingerprint.py --all --submissions-dir ../submissions
+"""
+
+import argparse
+import ast
+import hashlib
+import sys
+from pathlib import Path
+from typing import Iterable, List, Set
+
+SRC_DIR = Path(__file__).resolve().parent
+
+# Modules defining the rules and how agents are run
+FRAMEWORK_MODULES = ('environment', 'arena', 'agent_loader', 'agent_interface', 'map_graph')
+
+# Hex digits kept
+_LENGTH = 16
+
+
+def _imported_names(tree: ast.AST) -> Iterable[str]:
+    """Dotted module names an AST imports (for 'from x import y', also x.y)."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            yield node.module
+            for alias in node.names:
+                yield f'{node.module}.{alias.name}'
+
+
+def _resolve(root: Path, name: str) -> List[Path]:
+    """Files under ``root`` that importing ``name`` would execute."""
+    files = []
+    path = root
+    for part in name.split('.'):
+        package = path / part / '__init__.py'
+        module = path / f'{part}.py'
+        if package.is_file():
+            files.append(package)
+            path = path / part
+        elif module.is_file():
+            files.append(module)
+            break
+        else:
+            break
+    return files
+
+
+def local_modules(entry: Path, root: Path) -> List[Path]:
+    """
+    ``entry`` and every module it imports, directly or not, from ``root``.
+
+    Args:
+        entry: Python file to start from
+        root: Directory on sys.path whose modules count as local
+
+    Returns:
+        Files sorted by path
+    """
+    seen: Set[Path] = set()
+    pending = [entry.resolve()]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except (SyntaxError, ValueError):
+            # Still hashed; the loader reports the error when it runs
+            continue
+        for name in _imported_names(tree):
+            for found in _resolve(root, name):
+                if found.resolve() not in seen:
+                    pending.append(found.resolve())
+    return sorted(seen)
+
+
+def _digest(files: Iterable[Path], root: Path, salt: str = '') -> str:
+    digest = hashlib.sha256(salt.encode())
+    for path in files:
+        digest.update(str(path.relative_to(root)).replace('\\', '/').encode() + b'\0')
+        digest.update(path.read_bytes() + b'\0')
+    return digest.hexdigest()[:_LENGTH]
+
+
+def fingerprint(agent_id: str, submissions_dir: str = '../submissions') -> str:
+    """
+    Fingerprint of a submission.
+
+    Args:
+        agent_id: Student ID (folder in submissions_dir) or builtin:<name>
+        submissions_dir: Directory containing student submissions
+
+    Returns:
+        Short hex digest; changes whenever the agent's code does
+
+    Raises:
+        FileNotFoundError: If the submission has no agent.py
+    """
+    if agent_id.startswith('builtin:'):
+        files = local_modules(SRC_DIR / 'reference_agents.py', SRC_DIR)
+        return _digest(files, SRC_DIR, salt=agent_id)
+    root = Path(submissions_dir).resolve() / agent_id
+    entry = root / 'agent.py'
+    if not entry.is_file():
+        raise FileNotFoundError(f"Agent file not found for student {agent_id} at {entry}")
+    return _digest(local_modules(entry, root), root)
+
+
+def framework_fingerprint() -> str:
+    """Fingerprint of the arena code every game result depends on."""
+    files = sorted(SRC_DIR / f'{name}.py' for name in FRAMEWORK_MODULES)
+    return _digest(files, SRC_DIR)
+
+
+def list_submissions(submissions_dir: str = '../submissions') -> List[str]:
+    """Student IDs with an agent.py in ``submissions_dir``."""
+    root = Path(submissions_dir)
+    return sorted(p.parent.name for p in root.glob('*/agent.py'))
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('agents', nargs='*', help='Student IDs (or builtin:<name>)')
+    parser.add_argument('--all', action='store_true', help='Every submission')
+    parser.add_argument('--submissions-dir', default='../submissions',
+                        help='Directory containing student submissions')
+    parser.add_argument('--files', action='store_true', help='List the files hashed')
+    args = parser.parse_args()
+
+    agents: List[str] = list(args.agents)
+    if args.all:
+        agents += [a for a in list_submissions(args.submissions_dir) if a not in agents]
+    print(f"{'framework':<24}{framework_fingerprint()}")
+    status = 0
+    for agent_id in agents:
+        try:
+            print(f"{agent_id:<24}{fingerprint(agent_id, args.submissions_dir)}")
+        except FileNotFoundError as e:
+            print(f"{agent_id:<24}✗ {e}")
+            status = 1
+            continue
+        if args.files and not agent_id.startswith('builtin:'):
+            root = Path(args.submissions_dir).resolve() / agent_id
+            for path in local_modules(root / 'agent.py', root):
+                print(f"{'':<24}  {path.relative_to(root)}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
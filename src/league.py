@@ -0,0 +1,487 @@
+"""
+Incremental league evaluation.
+
+A league plays every agent against every other one in both roles, a fixed
+number of seeded games per pairing (game i of every pairing uses seed
+base + i, so all pairings see the same starts). Results are cached per
+pairing, keyed by the fingerprints of both submissions (fingerprint.py)
+and by the league settings, which include the fingerprint of the arena
+code. A rerun therefore replays only the pairings involving a submission
+that changed since the last run, plus those of new submissions; editing
+the arena or the settings invalidates everything.
+
+The cache is saved as pairings complete, so an interrupted run resumes
+where it stopped. A pairing whose games all failed (an agent that does
+not load, for instance) is not cached and is retried on the next run.
+
+Worker processes play many games, so after each game they drop the
+modules imported from the submissions directory and restore sys.path:
+a submission's helper modules (``utils``, ``search``...) never shadow
+another's. Games played in a run can be appended to a JSONL file
+(same records as ``log.py --results``, with submission versions) for
+rating.py to consume incrementally.
+
+Examples:
+  python league.py --games 10 --results league.jsonl
+  python league.py --dry-run
+  python league.py --agents alice bob builtin:tablebase --workers 4
+  python league.py --metrics-port 9464      # live metrics at /metrics
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analytics import game_record
+from arena import Arena
+from environment import Environment
+from fingerprint import fingerprint, framework_fingerprint, list_submissions
+from map_graph import compile_map
+from metrics import BatchMetrics
+import reference_agents
+import shared_map
+
+
+CACHE_VERSION = 1
+
+# Seconds between cache saves while pairings complete
+SAVE_INTERVAL = 5.0
+
+Pairing = Tuple[str, str]
+
+
+def _roles(agent_id: str) -> Tuple[str, ...]:
+    """Roles an agent can play (submissions provide both agents)."""
+    if reference_agents.is_builtin(agent_id):
+        return tuple(reference_agents.AGENTS.get(agent_id[len(reference_agents.PREFIX):], ()))
+    return ('pacman', 'ghost')
+
+
+def pairings(agents: List[str], self_play: bool = False) -> List[Pairing]:
+    """
+    Every (seek, hide) pairing of a league.
+
+    Args:
+        agents: Student IDs or builtin:<name>
+        self_play: Also pair each agent with itself
+
+    Returns:
+        List of (pacman_id, ghost_id), skipping roles an agent lacks
+    """
+    seekers = [a for a in agents if 'pacman' in _roles(a)]
+    hiders = [a for a in agents if 'ghost' in _roles(a)]
+    return [(seek, hide) for seek in seekers for hide in hiders if self_play or seek != hide]
+
+
+def _pairing_key(seek: str, seek_version: str, hide: str, hide_version: str, settings: str) -> str:
+    payload = json.dumps([seek, seek_version, hide, hide_version, settings])
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+class ResultCache:
+    """
+    Per-pairing results, stored as JSON.
+
+    Each entry summarizes the games of one pairing of two submission
+    versions under one set of league settings: the two IDs and versions,
+    the number of Pacman wins, Ghost wins, draws and errors, and the
+    total steps.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        # Last fingerprint seen per agent, to report what changed
+        self.versions: Dict[str, str] = {}
+        self._dirty = False
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == CACHE_VERSION:
+                self.entries = state.get('entries', {})
+                self.versions = state.get('agents', {})
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.entries.get(key)
+
+    def put(self, key: str, entry: Dict):
+        self.entries[key] = entry
+        self.versions[entry['seek']] = entry['seek_version']
+        self.versions[entry['hide']] = entry['hide_version']
+        self._dirty = True
+
+    def prune(self, keep) -> int:
+        """Drop every entry whose key is not in ``keep``; returns the count."""
+        stale = [key for key in self.entries if key not in keep]
+        for key in stale:
+            del self.entries[key]
+        self._dirty = self._dirty or bool(stale)
+        return len(stale)
+
+    def save(self):
+        """Write the cache atomically, if anything changed."""
+        if not self._dirty:
+            return
+        state = {'version': CACHE_VERSION, 'agents': self.versions, 'entries': self.entries}
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def summarize(records: List[Dict]) -> Dict:
+    """Cache entry fields of a pairing's game records."""
+    counts = {'pacman_wins': 0, 'ghost_wins': 0, 'draws': 0, 'errors': 0, 'steps': 0}
+    for record in records:
+        result = record['result']
+        if result == 'pacman_wins':
+            counts['pacman_wins'] += 1
+        elif result == 'ghost_wins':
+            counts['ghost_wins'] += 1
+        elif result == 'draw':
+            counts['draws'] += 1
+        else:
+            counts['errors'] += 1
+        counts['steps'] += record.get('steps', 0)
+    return counts
+
+
+# Per-process settings, set by _init_worker
+_settings: Dict = {}
+
+# Step latencies of the worker's current game, shipped back with its record
+_metrics: Optional[BatchMetrics] = None
+
+
+def _init_worker(settings: Dict):
+    global _metrics
+    _settings.update(settings)
+    shared_map.attach(settings['shared_map'])
+    if settings['metrics']:
+        _metrics = BatchMetrics()
+
+
+def _play(task: Tuple[str, int, str, str, Tuple[str, str]]) -> Tuple[str, Dict, float, List]:
+    """
+    Play one game of a pairing in a worker process.
+
+    Returns:
+        (pairing key, game record, seconds taken, drained step histograms)
+    """
+    key, index, seek, hide, versions = task
+    started = time.perf_counter()
+    record = _play_game(index, seek, hide, versions)
+    steps = _metrics.drain_steps() if _metrics is not None else []
+    return key, record, time.perf_counter() - started, steps
+
+
+def _unload_submissions(submissions_dir: str, modules: set, path: List[str]):
+    """Drop the modules a game imported from ``submissions_dir`` and restore sys.path."""
+    root = os.path.abspath(submissions_dir) + os.sep
+    for name in set(sys.modules) - modules:
+        filename = getattr(sys.modules[name], '__file__', None)
+        if filename and os.path.abspath(filename).startswith(root):
+            del sys.modules[name]
+    sys.path[:] = path
+
+
+def _play_game(index: int, seek: str, hide: str, versions: Tuple[str, str]) -> Dict:
+    s = _settings
+    seed = (s['seed'] + index) % 2**32
+    modules, path = set(sys.modules), list(sys.path)
+    try:
+        arena = Arena(
+            pacman_id=seek,
+            ghost_id=hide,
+            submissions_dir=s['submissions_dir'],
+            max_steps=s['max_steps'],
+            visualize=False,
+            delay=0,
+            step_timeout=s['step_timeout'],
+            verbose=False,
+            metrics=_metrics,
+        )
+        arena.load_agents()
+        np.random.seed(seed)
+        random.seed(seed)
+        try:
+            result, stats = arena.run_game()
+        finally:
+            arena.close()
+        return game_record(index, seed, seek, hide, result, stats, arena.env, versions)
+    except (Exception, SystemExit) as e:
+        return {'game': index, 'seed': seed, 'seek': seek, 'hide': hide,
+                'seek_version': versions[0], 'hide_version': versions[1],
+                'result': 'error', 'error': str(e)}
+    finally:
+        _unload_submissions(s['submissions_dir'], modules, path)
+
+
+class League:
+    """
+    A league of agents with cached pairing results.
+
+    Args:
+        agents: Student IDs or builtin:<name>
+        cache: Result cache
+        submissions_dir: Directory containing student submissions
+        games: Games per pairing
+        max_steps: Maximum steps per game
+        step_timeout: Seconds allowed per agent step (None disables)
+        seed: Base seed; game i of every pairing uses seed + i
+        self_play: Also pair each agent with itself
+    """
+
+    def __init__(self, agents: List[str], cache: ResultCache, submissions_dir: str = '../submissions',
+                 games: int = 10, max_steps: int = 200, step_timeout: Optional[float] = 3.0,
+                 seed: int = 0, self_play: bool = False):
+        self.cache = cache
+        self.submissions_dir = submissions_dir
+        self.games = games
+        self.max_steps = max_steps
+        self.step_timeout = step_timeout
+        self.seed = seed
+        self.map_state = Environment().map
+
+        self.versions: Dict[str, str] = {}
+        self.missing: List[str] = []
+        for agent_id in agents:
+            try:
+                self.versions[agent_id] = fingerprint(agent_id, submissions_dir)
+            except FileNotFoundError:
+                self.missing.append(agent_id)
+        self.agents = list(self.versions)
+        self.pairings = pairings(self.agents, self_play)
+
+        settings = {
+            'games': games, 'max_steps': max_steps, 'step_timeout': step_timeout, 'seed': seed,
+            'map': compile_map(self.map_state).key, 'framework': framework_fingerprint(),
+        }
+        self.settings_key = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+        self.keys = {(seek, hide): _pairing_key(seek, self.versions[seek], hide, self.versions[hide],
+                                                self.settings_key)
+                     for seek, hide in self.pairings}
+
+    def stale(self) -> List[Pairing]:
+        """Pairings without a cached result."""
+        return [pair for pair in self.pairings if self.cache.get(self.keys[pair]) is None]
+
+    def changed_agents(self) -> Dict[str, Optional[str]]:
+        """Agents whose fingerprint differs from the last run: ID → previous version (None if new)."""
+        return {agent_id: self.cache.versions.get(agent_id) for agent_id, version in self.versions.items()
+                if self.cache.versions.get(agent_id) != version}
+
+    def play(self, workers: Optional[int] = None, results: Optional[str] = None,
+             progress: bool = True, metrics: Optional[BatchMetrics] = None) -> int:
+        """
+        Play every stale pairing and cache its result.
+
+        Pairings whose games all ended in an error are reported but not
+        cached, so the next run retries them.
+
+        Args:
+            workers: Worker processes (default: CPU count)
+            results: Append the records of the games played to this JSONL file
+            progress: Print each completed pairing
+            metrics: Live metrics to update as games finish
+
+        Returns:
+            Number of pairings played
+        """
+        todo = self.stale()
+        if not todo:
+            return 0
+        tasks = [(self.keys[pair], i, pair[0], pair[1], (self.versions[pair[0]], self.versions[pair[1]]))
+                 for pair in todo for i in range(self.games)]
+        settings = {
+            'submissions_dir': self.submissions_dir, 'max_steps': self.max_steps,
+            'step_timeout': self.step_timeout, 'seed': self.seed,
+            'shared_map': shared_map.publish(self.map_state),
+            'metrics': metrics is not None,
+        }
+        pending: Dict[str, List[Dict]] = defaultdict(list)
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        out = open(results, 'a', encoding='utf-8') if results else None
+        done = 0
+        played = 0
+        last_save = time.monotonic()
+        if metrics is not None:
+            metrics.workers = workers
+            metrics.in_flight = workers
+        try:
+            with mp.Pool(workers, initializer=_init_worker, initargs=(settings,)) as pool:
+                # Tasks are ordered by pairing, so pairings complete roughly in order
+                for key, record, duration, steps in pool.imap_unordered(_play, tasks):
+                    played += 1
+                    if metrics is not None:
+                        metrics.merge_steps(steps)
+                        metrics.game_finished(record['result'], record['seek'], record['hide'],
+                                              duration, record.get('forfeit'))
+                        metrics.in_flight = min(workers, len(tasks) - played)
+                    if out is not None:
+                        out.write(json.dumps(record) + '\n')
+                    records = pending[key]
+                    records.append(record)
+                    if len(records) < self.games:
+                        continue
+                    del pending[key]
+                    entry = {'seek': record['seek'], 'hide': record['hide'],
+                             'seek_version': record['seek_version'], 'hide_version': record['hide_version'],
+                             **summarize(records)}
+                    failed = entry['errors'] == len(records)
+                    if not failed:
+                        self.cache.put(key, entry)
+                    done += 1
+                    if progress:
+                        print(f"  [{done}/{len(todo)}] {entry['seek']} vs {entry['hide']}: "
+                              + ("all games failed; not cached" if failed else
+                                 f"{entry['pacman_wins']}-{entry['ghost_wins']}-{entry['draws']}"
+                                 + (f" ({entry['errors']} errors)" if entry['errors'] else '')), flush=True)
+                    if time.monotonic() - last_save >= SAVE_INTERVAL:
+                        self.cache.save()
+                        last_save = time.monotonic()
+        finally:
+            self.cache.save()
+            if out is not None:
+                out.close()
+        return done
+
+    def standings(self) -> List[Tuple[str, Dict]]:
+        """
+        Per-agent scores over the cached results of the current pairings.
+
+        Returns:
+            (agent_id, stats) sorted by overall score, where stats has the
+            'seek' and 'hide' scores (win = 1, draw = 0.5, per game) and
+            game counts
+        """
+        totals = {agent_id: {'seek': 0.0, 'seek_games': 0, 'hide': 0.0, 'hide_games': 0, 'errors': 0}
+                  for agent_id in self.agents}
+        for seek, hide in self.pairings:
+            entry = self.cache.get(self.keys[(seek, hide)])
+            if entry is None:
+                continue
+            played = entry['pacman_wins'] + entry['ghost_wins'] + entry['draws']
+            half = 0.5 * entry['draws']
+            totals[seek]['seek'] += entry['pacman_wins'] + half
+            totals[seek]['seek_games'] += played
+            totals[seek]['errors'] += entry['errors']
+            totals[hide]['hide'] += entry['ghost_wins'] + half
+            totals[hide]['hide_games'] += played
+            totals[hide]['errors'] += entry['errors']
+
+        table = []
+        for agent_id, t in totals.items():
+            games = t['seek_games'] + t['hide_games']
+            stats = {
+                'seek': t['seek'] / t['seek_games'] if t['seek_games'] else None,
+                'hide': t['hide'] / t['hide_games'] if t['hide_games'] else None,
+                'score': (t['seek'] + t['hide']) / games if games else 0.0,
+                'games': games,
+                'errors': t['errors'],
+            }
+            table.append((agent_id, stats))
+        table.sort(key=lambda item: -item[1]['score'])
+        return table
+
+
+def format_standings(table: List[Tuple[str, Dict]]) -> str:
+    """Standings as a text table."""
+    def pct(value):
+        return f"{100 * value:>7.1f}%" if value is not None else f"{'-':>8}"
+
+    lines = [f"{'#':>3}  {'Agent':<24}{'Seek':>8}{'Hide':>8}{'Total':>8}{'Games':>7}{'Errors':>8}"]
+    for rank, (agent_id, s) in enumerate(table, 1):
+        lines.append(f"{rank:>3}  {agent_id:<24}{pct(s['seek'])}{pct(s['hide'])}{pct(s['score'])}"
+                     f"{s['games']:>7}{s['errors']:>8}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--agents', nargs='+',
+                        help='Student IDs or builtin:<name> (default: every submission)')
+    parser.add_argument('--submissions-dir', default='../submissions',
+                        help='Directory containing student submissions')
+    parser.add_argument('--games', type=int, default=10, help='Games per pairing (default: 10)')
+    parser.add_argument('--max-steps', type=int, default=200, help='Maximum steps per game')
+    parser.add_argument('--step-timeout', type=float, default=3.0,
+                        help='Seconds allowed per agent step (0 disables)')
+    parser.add_argument('--seed', type=int, default=0, help='Base seed (default: 0)')
+    parser.add_argument('--self-play', action='store_true', help='Also pair each agent with itself')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--cache', default='league_cache.json',
+                        help='Pairing result cache (default: league_cache.json)')
+    parser.add_argument('--results', help='Append the games played to this JSONL file (for rating.py)')
+    parser.add_argument('--metrics-port', type=int,
+                        help='Serve live metrics (Prometheus format) at http://127.0.0.1:PORT/metrics')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only list what changed and which pairings would be replayed')
+    parser.add_argument('--prune', action='store_true',
+                        help='Drop cached results of pairings no longer in the league')
+    args = parser.parse_args()
+
+    agents = args.agents or list_submissions(args.submissions_dir)
+    cache = ResultCache(args.cache)
+    league = League(
+        agents, cache,
+        submissions_dir=args.submissions_dir,
+        games=args.games,
+        max_steps=args.max_steps,
+        step_timeout=args.step_timeout or None,
+        seed=args.seed,
+        self_play=args.self_play,
+    )
+    for agent_id in league.missing:
+        print(f"✗ Skipping {agent_id}: no agent.py in {args.submissions_dir}")
+    if len(league.pairings) == 0:
+        print("✗ No pairings to play")
+        return 1
+
+    changed = league.changed_agents()
+    for agent_id, previous in changed.items():
+        status = f"changed ({previous} → {league.versions[agent_id]})" if previous else "new"
+        print(f"  {agent_id}: {status}")
+    stale = league.stale()
+    print(f"Replaying {len(stale)} of {len(league.pairings)} pairings "
+          f"({len(stale) * args.games} games)")
+    if args.dry_run:
+        for seek, hide in stale:
+            print(f"  {seek} vs {hide}")
+        return 0
+
+    metrics = None
+    if args.metrics_port is not None:
+        metrics = BatchMetrics()
+        host, port = metrics.serve(args.metrics_port).server_address[:2]
+        print(f"Metrics → http://{host}:{port}/metrics")
+
+    start = time.perf_counter()
+    league.play(workers=args.workers, results=args.results, metrics=metrics)
+    if args.prune:
+        removed = cache.prune(set(league.keys.values()))
+        cache.save()
+        print(f"Pruned {removed} cached pairings")
+    print(f"Done in {time.perf_counter() - start:.1f}s\n")
+    print(format_standings(league.standings()))
+    if args.results and stale:
+        print(f"\nGames played → {args.results}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
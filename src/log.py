@@ -1,25 +1,207 @@
 import argparse
-import platform
+import json
+import random
 import time
 from datetime import datetime
 
-from colorama import Fore, Style, init
+import numpy as np
+
+try:
+    from colorama import Fore, Style, init
+except ImportError:
+    # colorama chỉ dùng để tô màu → chạy không màu nếu chưa cài
+    class _NoColor:
+        def __getattr__(self, name):
+            return ""
+
+    Fore = Style = _NoColor()
+
+    def init(**kwargs):
+        pass
 
 from arena import Arena
+from environment import Environment
+
+# analytics, fingerprint, memtrack, metrics, profiler và sequential được
+# nạp tại chỗ dùng: đa số lần chạy chỉ cần một vài module trong số đó
 
 # Khởi tạo colorama (hỗ trợ màu trên Windows)
 init(autoreset=True)
 
 
+def print_profile(profiler, args, log_filename):
+    """In bảng thời gian theo giai đoạn và ghi folded stacks cạnh file log."""
+    folded_filename = log_filename.replace(".log", ".folded")
+    print(Fore.CYAN + "\nPROFILE BREAKDOWN" + Style.RESET_ALL)
+    print(profiler.format_breakdown())
+    if args.profile_agents:
+        profiler.print_agent_stats()
+    profiler.write_folded(folded_filename)
+    print(f"Flamegraph (folded stacks) → {folded_filename}")
+
+
+def play_game(args, pacman_id, ghost_id, profiler, seed, pacman_start=None, ghost_start=None,
+              memory_tracker=None, metrics=None):
+    """Chơi một trận với seed cho trước; trả về (result, stats, env)."""
+    if metrics is not None:
+        metrics.game_started()
+    started = time.perf_counter()
+    result, stats = "error", {}
+    try:
+        arena = Arena(
+            pacman_id=pacman_id,
+            ghost_id=ghost_id,
+            submissions_dir=args.submissions_dir,
+            max_steps=args.max_steps,
+            visualize=False,
+            delay=0,
+            step_timeout=args.step_timeout,
+            profiler=profiler,
+            parallel=args.parallel,
+            ponder_budget=args.ponder_budget,
+            memory_tracker=memory_tracker,
+            metrics=metrics,
+        )
+
+        arena.load_agents()
+        np.random.seed(seed)
+        random.seed(seed)
+        try:
+            result, stats = arena.run_game(pacman_start, ghost_start)
+        finally:
+            arena.close()
+    finally:
+        if metrics is not None:
+            metrics.game_finished(result, pacman_id, ghost_id, time.perf_counter() - started,
+                                  stats.get("forfeit"))
+    return result, stats, arena.env
+
+
+def agent_versions(args, pacman_id, ghost_id):
+    """
+    Fingerprint mã nguồn của hai agent (None nếu không đọc được), ghi kèm
+    kết quả để rating.py / league.py phân biệt các phiên bản submission.
+    Tính lại mỗi trận vì agent.py cũng được nạp lại mỗi trận.
+    """
+    from fingerprint import fingerprint
+
+    versions = []
+    for agent_id in (pacman_id, ghost_id):
+        try:
+            versions.append(fingerprint(agent_id, args.submissions_dir))
+        except OSError:
+            versions.append(None)
+    return tuple(versions)
+
+
+def print_memory(memory_tracker, log):
+    """In bảng bộ nhớ của batch và cảnh báo agent có bộ nhớ tăng dần qua các trận."""
+    from memtrack import format_bytes
+
+    print("\n" + memory_tracker.format_report())
+    for agent_id, slope in memory_tracker.growing_agents().items():
+        print(Fore.RED + f"⚠️  Bộ nhớ của {agent_id} tăng dần qua các trận "
+              f"(+{format_bytes(slope)}/trận)" + Style.RESET_ALL)
+        log.write(f"Memory growth: {agent_id} +{slope:.0f} bytes/game\n")
+    memory_tracker.close()
+
+
+def run_paired(args, profiler, base_seed, log, results_file, memory_tracker=None, metrics=None):
+    """
+    Chế độ ghép cặp: mỗi cấu hình xuất phát được chơi với cả hai agent
+    ứng viên (cùng seed), tùy chọn thêm cấu hình đối xứng qua trục dọc.
+    So sánh hiệu số theo từng cấu hình nên nhiễu do vị trí xuất phát bị
+    triệt tiêu.
+    """
+    from analytics import game_record
+    from sequential import paired_difference
+
+    role = args.paired_role
+    candidates = [args.hide, args.paired] if role == "hide" else [args.seek, args.paired]
+    winning_result = "ghost_wins" if role == "hide" else "pacman_wins"
+
+    sampler = Environment(max_steps=args.max_steps)
+    mirror = args.mirror
+    if mirror and not sampler.is_mirror_symmetric():
+        print(Fore.YELLOW + "⚠️  Map không đối xứng → bỏ qua --mirror" + Style.RESET_ALL)
+        mirror = False
+
+    scores = {candidate: [] for candidate in candidates}
+    dropped = 0
+    game = 0
+    for config in range(1, args.games + 1):
+        seed = (base_seed + config) % 2**32
+        np.random.seed(seed)
+        pacman_start, ghost_start = sampler.reset()[1:]
+        starts = [(pacman_start, ghost_start)]
+        if mirror:
+            starts.append((sampler.mirror_position(pacman_start), sampler.mirror_position(ghost_start)))
+
+        config_scores = {}
+        for candidate in candidates:
+            pacman_id, ghost_id = (args.seek, candidate) if role == "hide" else (candidate, args.hide)
+            total = 0.0
+            for mirrored, (p_start, g_start) in enumerate(starts):
+                game += 1
+                try:
+                    result, stats, env = play_game(args, pacman_id, ghost_id, profiler, seed,
+                                                   p_start, g_start, memory_tracker, metrics)
+                except Exception as e:
+                    print(Fore.RED + f"⚠️  Error in config {config} ({candidate}): {e}" + Style.RESET_ALL)
+                    log.write(f"Error in config {config} ({candidate}): {e}\n")
+                    total = None
+                    break
+                total += 1.0 if result == winning_result else 0.5 if result == "draw" else 0.0
+                log.write(f"Config {config} {candidate} {'mirror' if mirrored else 'start'}: {result}\n")
+                if results_file is not None:
+                    record = game_record(game, seed, pacman_id, ghost_id, result, stats, env,
+                                         agent_versions(args, pacman_id, ghost_id))
+                    record.update(config=config, mirrored=bool(mirrored))
+                    results_file.write(json.dumps(record) + "\n")
+            if total is None:
+                break
+            config_scores[candidate] = total / len(starts)
+        log.flush()
+
+        if len(config_scores) < len(candidates):
+            dropped += 1
+            continue
+        for candidate in candidates:
+            scores[candidate].append(config_scores[candidate])
+        print(
+            Fore.YELLOW
+            + f"Progress: {config}/{args.games} configurations completed..."
+            + Style.RESET_ALL
+        )
+
+    stats = paired_difference(scores[candidates[0]], scores[candidates[1]], alpha=args.alpha)
+    label = "Ghost" if role == "hide" else "Pacman"
+    print("=" * 50)
+    print(Fore.CYAN + "PAIRED COMPARISON".center(50) + Style.RESET_ALL)
+    print("=" * 50)
+    print(f"Configurations : {stats['n']} (dropped {dropped}){' × 2 mirrored' if mirror else ''}")
+    print(f"Games played   : {game}")
+    print(f"{label} A ({candidates[0]}) score: {stats['mean_a']:.3f}")
+    print(f"{label} B ({candidates[1]}) score: {stats['mean_b']:.3f}")
+    print(f"A - B          : {stats['diff']:+.3f} "
+          f"({(1 - args.alpha) * 100:g}% CI {stats['low']:+.3f} … {stats['high']:+.3f})")
+    print(f"Std. error     : paired {stats['se_paired']:.4f} vs unpaired {stats['se_unpaired']:.4f}")
+    if 0 < stats['se_paired'] < stats['se_unpaired'] < float("inf"):
+        ratio = (stats['se_unpaired'] / stats['se_paired']) ** 2
+        print(f"               → unpaired games would need ≈{ratio:.1f}× as many configurations")
+    print("=" * 50)
+    log.write(f"Paired A-B: {stats}\n")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Run multiple Pacman vs Ghost games"
     )
     parser.add_argument(
-        "--seek", required=True, help="Student ID cho Pacman (Seeker)"
+        "--seek", required=True, help="Student ID cho Pacman (Seeker), hoặc builtin:<tên>"
     )
     parser.add_argument(
-        "--hide", required=True, help="Student ID cho Ghost (Hider)"
+        "--hide", required=True, help="Student ID cho Ghost (Hider), hoặc builtin:<tên>"
     )
     parser.add_argument(
         "--games",
@@ -41,16 +223,85 @@ def main():
         default=3.0,
         help="Timeout mỗi bước (giây)",
     )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Chạy mỗi agent trong một process riêng, hai agent suy nghĩ đồng thời",
+    )
+    parser.add_argument(
+        "--ponder-budget",
+        type=float,
+        default=0.0,
+        help="Thời gian CPU (giây) mỗi bước agent được suy nghĩ trước giữa các lượt (bao gồm --parallel)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Đo thời gian theo từng giai đoạn (agent, environment, render) cho cả batch",
+    )
+    parser.add_argument(
+        "--profile-agents",
+        action="store_true",
+        help="Chạy thêm cProfile cho step() của từng agent (bao gồm --profile)",
+    )
+    parser.add_argument(
+        "--track-memory",
+        action="store_true",
+        help="Theo dõi bộ nhớ (tracemalloc/RSS) của từng agent mỗi bước; cảnh báo agent có bộ nhớ tăng dần qua các trận",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Mở endpoint http://127.0.0.1:PORT/metrics (định dạng Prometheus): số trận/giây, timeout, độ trễ mỗi bước",
+    )
+    parser.add_argument(
+        "--results",
+        help="Ghi kết quả từng trận (seed, vị trí xuất phát, số bước, thời gian) ra file JSONL cho analytics.py",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed gốc; trận i dùng seed + i (mặc định: ngẫu nhiên)",
+    )
+    parser.add_argument(
+        "--early-stop",
+        action="store_true",
+        help="Dừng sớm khi một bên tốt hơn rõ rệt (SPRT) hoặc tỉ lệ thắng đã đủ chính xác; --games là số trận tối đa",
+    )
+    parser.add_argument(
+        "--precision",
+        type=float,
+        default=0.05,
+        help="Nửa độ rộng khoảng tin cậy của tỉ lệ thắng để dừng sớm (mặc định: 0.05)",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="Mức ý nghĩa cho SPRT và khoảng tin cậy (mặc định: 0.05)",
+    )
+    parser.add_argument(
+        "--paired",
+        metavar="ID",
+        help="So sánh ghép cặp: chơi mỗi cấu hình xuất phát với cả agent của --hide (hoặc --seek) và agent ID này",
+    )
+    parser.add_argument(
+        "--paired-role",
+        choices=["hide", "seek"],
+        default="hide",
+        help="Vai trò được so sánh trong --paired (mặc định: hide)",
+    )
+    parser.add_argument(
+        "--mirror",
+        action="store_true",
+        help="Với --paired: chơi thêm vị trí xuất phát đối xứng trái-phải (map mặc định đối xứng)",
+    )
     args = parser.parse_args()
-
-    # 🚫 Windows không hỗ trợ SIGALRM → bỏ timeout
-    if platform.system() == "Windows":
-        print(
-            Fore.YELLOW
-            + "⚠️  Windows detected → step timeout disabled.\n"
-            + Style.RESET_ALL
-        )
-        args.step_timeout = None
+    if args.profile_agents and args.parallel:
+        parser.error("--profile-agents không đo được agent chạy trong tiến trình --parallel")
+    from sequential import WinRateMonitor
+    if args.results:
+        from analytics import game_record
 
     pacman_wins = 0
     ghost_wins = 0
@@ -58,27 +309,59 @@ def main():
     errors = 0
 
     log_filename = f"batch_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+
+    # Mỗi trận có seed riêng để có thể chạy lại đúng trận đó
+    base_seed = args.seed if args.seed is not None else random.randrange(2**31)
+    results_file = open(args.results, "a", encoding="utf-8") if args.results else None
+    monitor = WinRateMonitor(precision=args.precision, alpha=args.alpha)
+    games_played = 0
+
+    # Một profiler dùng chung cho toàn bộ batch
+    profiler = None
+    if args.profile or args.profile_agents:
+        from profiler import PhaseProfiler
+        profiler = PhaseProfiler(profile_agents=args.profile_agents)
+    memory_tracker = None
+    if args.track_memory:
+        from memtrack import MemoryTracker
+        memory_tracker = MemoryTracker()
+    metrics = None
+    if args.metrics_port is not None:
+        from metrics import BatchMetrics
+        metrics = BatchMetrics()
+        server = metrics.serve(args.metrics_port)
+        host, port = server.server_address[:2]
+        print(Fore.CYAN + f"Metrics → http://{host}:{port}/metrics" + Style.RESET_ALL)
     print(
         Fore.CYAN
         + f"\nBatch run started! Logs → {log_filename}\n"
         + Style.RESET_ALL
     )
 
+    if args.paired:
+        with open(log_filename, "w", encoding="utf-8") as log:
+            run_paired(args, profiler, base_seed, log, results_file, memory_tracker, metrics)
+            if memory_tracker is not None:
+                print_memory(memory_tracker, log)
+        if results_file is not None:
+            results_file.close()
+        if profiler is not None:
+            print_profile(profiler, args, log_filename)
+        print(Fore.MAGENTA + f"\nDetailed log saved to: {log_filename}\n" + Style.RESET_ALL)
+        return
+
     with open(log_filename, "w", encoding="utf-8") as log:
         for i in range(1, args.games + 1):
+            seed = (base_seed + i) % 2**32
+            games_played = i
             try:
-                arena = Arena(
-                    pacman_id=args.seek,
-                    ghost_id=args.hide,
-                    submissions_dir=args.submissions_dir,
-                    max_steps=args.max_steps,
-                    visualize=False,
-                    delay=0,
-                    step_timeout=args.step_timeout,
-                )
+                result, stats, env = play_game(args, args.seek, args.hide, profiler, seed,
+                                               memory_tracker=memory_tracker, metrics=metrics)
 
-                arena.load_agents()
-                result, _ = arena.run_game()
+                if results_file is not None:
+                    record = game_record(i, seed, args.seek, args.hide, result, stats, env,
+                                         agent_versions(args, args.seek, args.hide))
+                    results_file.write(json.dumps(record) + "\n")
 
                 if result == "pacman_wins":
                     pacman_wins += 1
@@ -95,25 +378,56 @@ def main():
                 log.write(f"Game {i}: {result}\n")
                 log.flush()
 
+                monitor.update(result)
+                if args.early_stop and monitor.should_stop():
+                    print(Fore.CYAN + f"Early stop: {monitor.describe()}" + Style.RESET_ALL)
+                    log.write(f"Early stop after game {i}: {monitor.describe()}\n")
+                    break
+
             except Exception as e:
                 errors += 1
                 print(Fore.RED + f"⚠️  Error in game {i}: {e}" + Style.RESET_ALL)
                 log.write(f"Error in game {i}: {e}\n")
                 log.flush()
+                if results_file is not None:
+                    record = {"game": i, "seed": seed, "seek": args.seek, "hide": args.hide,
+                              "result": "error", "error": str(e)}
+                    results_file.write(json.dumps(record) + "\n")
+
+    if results_file is not None:
+        results_file.close()
 
     # Tổng kết
     print(Fore.GREEN + "\nAll games completed!\n" + Style.RESET_ALL)
     print("=" * 50)
     print(Fore.CYAN + "STATISTICS SUMMARY".center(50) + Style.RESET_ALL)
     print("=" * 50)
-    print(f"Total games : {args.games}")
+    total = max(games_played, 1)
+    print(f"Total games : {games_played}")
     print(
-        f"Pacman wins : {pacman_wins} ({pacman_wins / args.games * 100:.1f}%)"
+        f"Pacman wins : {pacman_wins} ({pacman_wins / total * 100:.1f}%)"
     )
-    print(f"Ghost wins  : {ghost_wins} ({ghost_wins / args.games * 100:.1f}%)")
-    print(f"Draws       : {draws} ({draws / args.games * 100:.1f}%)")
+    print(f"Ghost wins  : {ghost_wins} ({ghost_wins / total * 100:.1f}%)")
+    print(f"Draws       : {draws} ({draws / total * 100:.1f}%)")
     print(f"Errors      : {errors}")
+    if monitor.games:
+        low, high = monitor.interval()
+        print(f"Pacman score: {monitor.score:.3f} "
+              f"({(1 - args.alpha) * 100:g}% CI {low:.3f} – {high:.3f})")
+    if args.early_stop:
+        print(f"Games saved : {args.games - games_played}")
     print("=" * 50)
+
+    if profiler is not None:
+        print_profile(profiler, args, log_filename)
+
+    if memory_tracker is not None:
+        with open(log_filename, "a", encoding="utf-8") as log:
+            print_memory(memory_tracker, log)
+
+    if args.results:
+        print(f"Per-game results → {args.results} (python analytics.py {args.results})")
+
     print(
         Fore.MAGENTA
         + f"\nDetailed log saved to: {log_filename}\n"
@@ -0,0 +1,224 @@
+"""
+Compiled representation of a game map.
+
+Turns the 2D wall array into a graph over integer cell ids (one id per
+empty cell) with a precomputed neighbour table, so search code can work
+with small integers instead of (row, col) tuples and bounds checks.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from environment import Move
+
+
+# Move order used by the neighbour table columns
+MOVES = list(Move)
+MOVE_INDEX = {move: i for i, move in enumerate(MOVES)}
+
+# Maximum number of compiled maps kept by compile_map()
+_CACHE_SIZE = 8
+_cache: "OrderedDict[str, CompiledMap]" = OrderedDict()
+
+
+def successor_move(cell: int, successors: List[int], index: int) -> Move:
+    """
+    Move leading from ``cell`` to ``successors[index]``.
+
+    Blocked directions lead back to the cell itself in the neighbour
+    table; picking one of them means staying, so Move.STAY is returned
+    rather than a move into a wall (which the arena counts as a wall move).
+
+    Args:
+        cell: Current cell id
+        successors: The cell's row of the neighbour table
+        index: Chosen column, an index into MOVES
+    """
+    return Move.STAY if successors[index] == cell else MOVES[index]
+
+
+def map_key(map_state: np.ndarray) -> str:
+    """
+    Compute a stable content hash for a map.
+
+    Args:
+        map_state: 2D numpy array where 1 = wall, 0 = empty
+
+    Returns:
+        Hex digest identifying the layout
+    """
+    walls = np.ascontiguousarray(map_state != 0, dtype=np.uint8)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.asarray(walls.shape, dtype=np.int64).tobytes())
+    digest.update(walls.tobytes())
+    return digest.hexdigest()
+
+
+class CompiledMap:
+    """
+    Graph view of a map over integer cell ids.
+
+    Attributes:
+        height, width: Map dimensions
+        n_cells: Number of empty cells
+        coords: (n_cells, 2) array of (row, col) per cell id
+        cell_ids: (height, width) array of cell id per square, -1 for walls
+        neighbors: (n_cells, len(MOVES)) array; entry [c, m] is the cell
+            reached from c with MOVES[m] (c itself when blocked), matching
+            Environment.apply_move
+        neighbor_lists: The neighbour table as nested Python lists, which
+            are faster than NumPy for scalar indexing in search loops
+        adjacency: Per cell list of distinct neighbouring cell ids
+        key: Content hash of the layout (see map_key)
+    """
+
+    def __init__(self, map_state: np.ndarray, key: Optional[str] = None):
+        """
+        Compile a map.
+
+        Args:
+            map_state: 2D numpy array where 1 = wall, 0 = empty
+            key: Precomputed map_key(map_state), if already known
+        """
+        self.map = np.array(map_state, dtype=np.int8, copy=True)
+        self.map.flags.writeable = False
+        self.height, self.width = self.map.shape
+        self.key = key if key is not None else map_key(self.map)
+
+        self.coords = np.argwhere(self.map == 0).astype(np.int32)
+        self.n_cells = len(self.coords)
+        self.cell_ids = np.full(self.map.shape, -1, dtype=np.int32)
+        self.cell_ids[self.coords[:, 0], self.coords[:, 1]] = np.arange(self.n_cells, dtype=np.int32)
+
+        self.neighbors = np.empty((self.n_cells, len(MOVES)), dtype=np.int32)
+        rows, cols = self.coords[:, 0], self.coords[:, 1]
+        for m, move in enumerate(MOVES):
+            d_row, d_col = move.value
+            n_rows, n_cols = rows + d_row, cols + d_col
+            inside = (n_rows >= 0) & (n_rows < self.height) & (n_cols >= 0) & (n_cols < self.width)
+            target = np.full(self.n_cells, -1, dtype=np.int32)
+            target[inside] = self.cell_ids[n_rows[inside], n_cols[inside]]
+            self.neighbors[:, m] = np.where(target >= 0, target, np.arange(self.n_cells))
+        self.neighbors.flags.writeable = False
+        self._distances: Optional[np.ndarray] = None
+        self._build_lists()
+
+    def _build_lists(self):
+        self.neighbor_lists: List[List[int]] = self.neighbors.tolist()
+        self.adjacency: List[List[int]] = [
+            sorted(set(int(n) for n in row if n != c))
+            for c, row in enumerate(self.neighbor_lists)
+        ]
+
+    @classmethod
+    def from_arrays(cls, map_state: np.ndarray, coords: np.ndarray, cell_ids: np.ndarray,
+                    neighbors: np.ndarray, key: str,
+                    distances: Optional[np.ndarray] = None) -> "CompiledMap":
+        """
+        Rebuild a compiled map from previously computed arrays.
+
+        The arrays are used as given (no copy), so read-only memory-mapped
+        or shared-memory views stay shared.
+
+        Args:
+            map_state, coords, cell_ids, neighbors: Arrays of a CompiledMap
+            key: map_key of the layout
+            distances: distance_matrix() result, if already computed
+        """
+        compiled = cls.__new__(cls)
+        compiled.map = map_state
+        compiled.height, compiled.width = map_state.shape
+        compiled.key = key
+        compiled.coords = coords
+        compiled.n_cells = len(coords)
+        compiled.cell_ids = cell_ids
+        compiled.neighbors = neighbors
+        compiled._distances = distances
+        compiled._build_lists()
+        return compiled
+
+    def cell_id(self, pos: Tuple[int, int]) -> int:
+        """
+        Get the cell id of a position.
+
+        Returns:
+            Cell id, or -1 for walls and out-of-bounds positions
+        """
+        row, col = int(pos[0]), int(pos[1])
+        if row < 0 or row >= self.height or col < 0 or col >= self.width:
+            return -1
+        return int(self.cell_ids[row, col])
+
+    def position(self, cell: int) -> Tuple[int, int]:
+        """Get the (row, col) position of a cell id."""
+        row, col = self.coords[cell]
+        return int(row), int(col)
+
+    def distance_matrix(self) -> np.ndarray:
+        """
+        All-pairs shortest path lengths (computed once, then cached).
+
+        Runs one BFS per cell, so the cost is O(n_cells^2); instant on the
+        default map but worth caching or sharing on large procedural maps.
+
+        Returns:
+            (n_cells, n_cells) int32 array, -1 where unreachable
+        """
+        if self._distances is None:
+            n = self.n_cells
+            distances = np.full((n, n), -1, dtype=np.int32)
+            adjacency = self.adjacency
+            for source in range(n):
+                row = [-1] * n
+                row[source] = 0
+                frontier = [source]
+                depth = 0
+                while frontier:
+                    depth += 1
+                    next_frontier = []
+                    for cell in frontier:
+                        for nxt in adjacency[cell]:
+                            if row[nxt] < 0:
+                                row[nxt] = depth
+                                next_frontier.append(nxt)
+                    frontier = next_frontier
+                distances[source] = row
+            distances.flags.writeable = False
+            self._distances = distances
+        return self._distances
+
+
+def register(compiled: CompiledMap):
+    """
+    Put a compiled map into the compile_map() cache, so later calls for
+    the same layout return it instead of compiling again.
+    """
+    _cache[compiled.key] = compiled
+    _cache.move_to_end(compiled.key)
+    if len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def compile_map(map_state: np.ndarray) -> CompiledMap:
+    """
+    Get the compiled form of a map, reusing a cached one when possible.
+
+    Args:
+        map_state: 2D numpy array where 1 = wall, 0 = empty
+
+    Returns:
+        CompiledMap for this layout
+    """
+    key = map_key(map_state)
+    compiled = _cache.get(key)
+    if compiled is None:
+        compiled = CompiledMap(map_state, key=key)
+        _cache[key] = compiled
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return compiled
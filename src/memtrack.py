@@ -0,0 +1,334 @@
+"""
+Opt-in memory tracking for the arena.
+
+Samples the memory of each agent around every ``step()`` call and keeps
+per-game figures, so that state accumulating over a game (or leaking
+across the games of a batch) becomes visible:
+
+- in-process agents are measured with tracemalloc: the peak allocated
+  during a single step, and the net bytes steps leave allocated over a
+  game; the process RSS is sampled as well;
+- agents in worker processes (parallel mode) are measured by the RSS of
+  their worker, since tracemalloc only sees this process.
+
+At the start of each in-process game the tracker also counts the live
+bytes allocated from each agent's own source files (its submission folder,
+or the module of a built-in agent), after a garbage collection. Agents are
+loaded afresh for every game, so that baseline stays flat unless the
+agent keeps data in module globals, class attributes or caches that
+outlive a game; agents whose baseline keeps rising are flagged.
+
+tracemalloc slows allocations down noticeably, so tracking is meant for
+diagnostic batches, not for timing runs.
+"""
+
+import gc
+import inspect
+import os
+import tracemalloc
+from itertools import compress
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Frames stored per allocation, so that allocations made by library code
+# called from an agent are still attributed to it
+TRACE_FRAMES = 5
+
+# Baseline growth (bytes per game) above which an agent is flagged
+DEFAULT_GROWTH_THRESHOLD = 4096
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Resident set size of a process in bytes.
+
+    Args:
+        pid: Process ID (default: this process)
+
+    Returns:
+        RSS, or None where /proc is unavailable
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _source_prefixes(agent_id: str, agent, submissions_dir: str) -> Tuple[str, ...]:
+    """Filename prefixes of the code an agent's allocations come from."""
+    if agent_id.startswith('builtin:'):
+        paths = [inspect.getfile(type(agent))]
+    else:
+        # The loader uses the path as given for agent.py and the absolute
+        # path (on sys.path) for the modules it imports
+        folder = Path(submissions_dir) / agent_id
+        paths = [str(folder) + os.sep, str(folder.resolve()) + os.sep]
+    return tuple(sorted({p for path in paths for p in (path, os.path.abspath(path))}))
+
+
+def _retained_public(snapshot: tracemalloc.Snapshot, prefixes: Tuple[str, ...]) -> int:
+    """Bytes of the traces with a frame under ``prefixes``, through the public API (slow)."""
+    filters = [tracemalloc.Filter(True, prefix + '*', all_frames=True) for prefix in prefixes]
+    return sum(trace.size for trace in snapshot.filter_traces(filters).traces)
+
+
+def _retained_raw(snapshot: tracemalloc.Snapshot, prefixes: Tuple[str, ...]) -> int:
+    """
+    Same as _retained_public(), reading CPython's raw trace tuples.
+
+    filter_traces() matches every frame of every trace in Python and
+    takes seconds on a batch process. Here only the distinct tracebacks
+    are matched, and the per-trace work is done by C-level map/set
+    operations, which tracemalloc does not slow down, on the private
+    ``snapshot.traces._traces`` list of (domain, size, traceback,
+    total_nframe) tuples. _RAW_TRACES says whether that layout holds.
+    """
+    traces = snapshot.traces._traces
+    tracebacks = list(map(itemgetter(2), traces))
+    owned = {traceback for traceback in set(tracebacks)
+             if any(filename.startswith(prefixes) for filename, _ in traceback)}
+    return sum(compress(map(itemgetter(1), traces), map(owned.__contains__, tracebacks)))
+
+
+def _raw_traces_supported() -> bool:
+    """Check _retained_raw() against the public API on a synthetic snapshot."""
+    frames = (('/probe/agent.py', 1), ('/other/lib.py', 2))
+    probe = tracemalloc.Snapshot([(0, 4096, frames, 2), (0, 512, frames[1:], 1)], 2)
+    try:
+        return _retained_raw(probe, ('/probe/',)) == _retained_public(probe, ('/probe/',)) == 4096
+    except Exception:
+        return False
+
+
+# Whether this Python's private trace layout is the one _retained_raw() reads
+_RAW_TRACES = _raw_traces_supported()
+
+
+def _retained(snapshot: tracemalloc.Snapshot, prefixes: Tuple[str, ...]) -> int:
+    """Bytes of the traces allocated with a frame in a file under ``prefixes``."""
+    if _RAW_TRACES:
+        try:
+            return _retained_raw(snapshot, prefixes)
+        except (AttributeError, TypeError, IndexError, ValueError):
+            pass
+    return _retained_public(snapshot, prefixes)
+
+
+def _slope(values: List[int]) -> float:
+    """Least-squares slope of ``values`` against their index."""
+    n = len(values)
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    var = sum((x - mean_x) ** 2 for x in range(n))
+    return sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values)) / var
+
+
+def format_bytes(n: Optional[float]) -> str:
+    """Human-readable byte count."""
+    if n is None:
+        return '-'
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+class _RoleSample:
+    """Figures of one agent during the current game."""
+
+    __slots__ = ('agent_id', 'step_peak', 'growth', 'rss_first', 'rss_last', 'rss_peak')
+
+    def __init__(self, agent_id: str):
+        self.agent_id = agent_id
+        self.step_peak: Optional[int] = None
+        self.growth: Optional[int] = None
+        self.rss_first: Optional[int] = None
+        self.rss_last: Optional[int] = None
+        self.rss_peak: Optional[int] = None
+
+    def add_rss(self, value: Optional[int]):
+        if value is None:
+            return
+        if self.rss_first is None:
+            self.rss_first = value
+        self.rss_last = value
+        self.rss_peak = value if self.rss_peak is None else max(self.rss_peak, value)
+
+    def to_dict(self) -> Dict:
+        return {
+            'agent': self.agent_id,
+            'step_peak': self.step_peak,
+            'growth': self.growth,
+            'rss_peak': self.rss_peak,
+            'rss_growth': (self.rss_last - self.rss_first) if self.rss_first is not None else None,
+        }
+
+
+class MemoryTracker:
+    """
+    Collects per-step memory samples across one or more games.
+
+    Like PhaseProfiler, a single tracker can be shared by many Arena
+    instances to cover a whole batch; Arena calls start_game(),
+    before_step()/after_step() around in-process agent steps,
+    sample_process() after worker steps and end_game().
+    """
+
+    def __init__(self, growth_threshold: int = DEFAULT_GROWTH_THRESHOLD):
+        """
+        Initialize the tracker and start tracemalloc if needed.
+
+        Args:
+            growth_threshold: Bytes per game of baseline growth above
+                which an agent is reported as growing across games
+        """
+        self.growth_threshold = growth_threshold
+        self.games: List[Dict] = []
+        # Live bytes from each agent's sources at the start of each game
+        self.baselines: Dict[str, List[int]] = {}
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(TRACE_FRAMES)
+        self._samples: Dict[str, _RoleSample] = {}
+        self._before = 0
+
+    def start_game(self, agents: Dict[str, Tuple[str, object]], submissions_dir: str):
+        """
+        Mark the beginning of a game.
+
+        Args:
+            agents: Role → (agent_id, agent), the agent being None when it
+                runs in a worker process
+            submissions_dir: Directory containing student submissions
+        """
+        self._samples = {role: _RoleSample(agent_id) for role, (agent_id, _) in agents.items()}
+        local = {agent_id: agent for agent_id, agent in agents.values() if agent is not None}
+        if not local:
+            return
+        # Drop the previous game's agents (module ↔ class reference cycles)
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot()
+        for agent_id, agent in local.items():
+            prefixes = _source_prefixes(agent_id, agent, submissions_dir)
+            self.baselines.setdefault(agent_id, []).append(_retained(snapshot, prefixes))
+
+    def before_step(self):
+        """Call right before an in-process agent step."""
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.get_traced_memory()[0]
+
+    def after_step(self, role: str):
+        """Call right after an in-process agent step of ``role``."""
+        current, peak = tracemalloc.get_traced_memory()
+        sample = self._samples[role]
+        step_peak = peak - self._before
+        if sample.step_peak is None or step_peak > sample.step_peak:
+            sample.step_peak = step_peak
+        sample.growth = (sample.growth or 0) + current - self._before
+        sample.add_rss(rss())
+
+    def sample_process(self, role: str, pid: int):
+        """Record the RSS of the worker process running ``role``."""
+        self._samples[role].add_rss(rss(pid))
+
+    def end_game(self) -> Dict:
+        """
+        Mark the end of a game.
+
+        Returns:
+            Role → {'agent', 'step_peak', 'growth', 'rss_peak',
+            'rss_growth'} in bytes ('step_peak' and 'growth' are None for
+            agents in worker processes)
+        """
+        report = {role: sample.to_dict() for role, sample in self._samples.items()}
+        self.games.append(report)
+        return report
+
+    def growth_per_game(self, agent_id: str) -> Optional[float]:
+        """
+        Trend of an agent's baseline, in bytes per game.
+
+        The first game is left out: it includes one-off work such as
+        imports and caches filled on first use.
+
+        Returns:
+            Least-squares slope, or None with fewer than three games
+        """
+        values = self.baselines.get(agent_id, [])[1:]
+        if len(values) < 2:
+            return None
+        return _slope(values)
+
+    def growing_agents(self) -> Dict[str, float]:
+        """Agents whose baseline grows faster than the threshold → bytes per game."""
+        flagged = {}
+        for agent_id in self.baselines:
+            slope = self.growth_per_game(agent_id)
+            if slope is not None and slope > self.growth_threshold:
+                flagged[agent_id] = slope
+        return flagged
+
+    def summary(self) -> List[Dict]:
+        """
+        Per-agent figures over all games.
+
+        Returns:
+            One dict per (agent, role) with games, max step peak, mean
+            growth per game, max RSS, and the agent's baseline trend
+        """
+        rows: Dict[Tuple[str, str], Dict] = {}
+        for game in self.games:
+            for role, s in game.items():
+                row = rows.setdefault((s['agent'], role), {
+                    'agent': s['agent'], 'role': role, 'games': 0, 'step_peak': None,
+                    'growth_total': 0, 'growth_games': 0, 'rss_peak': None,
+                })
+                row['games'] += 1
+                if s['step_peak'] is not None:
+                    row['step_peak'] = max(row['step_peak'] or 0, s['step_peak'])
+                if s['growth'] is not None:
+                    row['growth_total'] += s['growth']
+                    row['growth_games'] += 1
+                if s['rss_peak'] is not None:
+                    row['rss_peak'] = max(row['rss_peak'] or 0, s['rss_peak'])
+        for row in rows.values():
+            games = row.pop('growth_games')
+            total = row.pop('growth_total')
+            row['growth'] = total / games if games else None
+            row['growth_per_game'] = self.growth_per_game(row['agent'])
+        return list(rows.values())
+
+    def format_report(self) -> str:
+        """Render the summary as a text table, flagging growing agents."""
+        flagged = self.growing_agents()
+        lines = [
+            f"{'Agent':<24}{'Role':<8}{'Games':>6}{'Step peak':>12}{'Growth/game':>13}"
+            f"{'Peak RSS':>12}{'Across games':>14}",
+            '-' * 89,
+        ]
+        for row in self.summary():
+            trend = row['growth_per_game']
+            across = f"{format_bytes(trend)}/g" if trend is not None else '-'
+            lines.append(
+                f"{row['agent']:<24}{row['role']:<8}{row['games']:>6}{format_bytes(row['step_peak']):>12}"
+                f"{format_bytes(row['growth']):>13}{format_bytes(row['rss_peak']):>12}{across:>14}"
+                + ('  ⚠' if row['agent'] in flagged else '')
+            )
+        lines.append('-' * 89)
+        if flagged:
+            lines.append("⚠ Memory grows across games: " + ', '.join(
+                f"{agent_id} (+{format_bytes(slope)}/game)" for agent_id, slope in flagged.items()))
+        lines.append("Growth/game: bytes a game's steps leave allocated; "
+                     "Across games: trend of the agent's live memory at game start")
+        return '\n'.join(lines)
+
+    def close(self):
+        """Stop tracemalloc if this tracker started it."""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
@@ -0,0 +1,248 @@
+"""
+Live metrics of a batch run, in the Prometheus text format.
+
+BatchMetrics is updated by the batch loop (log.py, league.py) and by
+Arena after every agent step. ``serve()`` exposes it on a local HTTP
+endpoint (``/metrics``), for Prometheus or a plain ``curl``:
+
+  python log.py --seek alice --hide bob --games 5000 --metrics-port 9464
+  curl -s localhost:9464/metrics
+
+Exposed metrics:
+  arena_games_total{result}              finished games by result
+  arena_games_in_flight                  games being played
+  arena_games_per_second                 completion rate over the last minute
+  arena_last_game_timestamp_seconds      when the last game finished
+  arena_forfeits_total{agent,role,reason}  games lost to a timeout or error
+  arena_agent_timeouts_total{agent,role} step timeouts
+  arena_step_seconds{agent,role}         histogram of step latency
+  arena_worker_busy_seconds_total        time workers spent playing games
+  arena_worker_utilization               busy time / (workers × elapsed)
+
+Only the batch loop writes. Updates are plain dictionary and list
+operations, with no locks, so the per-step cost stays well under a
+microsecond. The server thread copies each dictionary with list() before
+reading it; the copy is atomic under the GIL. A scrape can land between
+two related updates (a game counted as finished but still in flight, for
+instance), but it never sees torn values.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the step latency buckets; the default step
+# timeout is 3 s
+STEP_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Window (seconds) of arena_games_per_second
+RATE_WINDOW = 60.0
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _labels(**labels) -> str:
+    """Prometheus label set, escaping the values."""
+    if not labels:
+        return ''
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Bucket counts of a latency distribution (non-cumulative, plus +Inf)."""
+
+    __slots__ = ('counts', 'total')
+
+    def __init__(self):
+        self.counts = [0] * (len(STEP_BUCKETS) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(STEP_BUCKETS, value)] += 1
+        self.total += value
+
+    def merge(self, counts: List[int], total: float):
+        """Add the buckets of another histogram (see BatchMetrics.drain_steps)."""
+        for i, n in enumerate(counts):
+            self.counts[i] += n
+        self.total += total
+
+
+class BatchMetrics:
+    """
+    Counters of a batch run.
+
+    Args:
+        workers: Processes playing games in parallel (for utilization)
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self.busy = 0.0
+        self.last_game: Optional[float] = None
+        self.results: Dict[str, int] = {}
+        # (agent, role, reason) → games forfeited
+        self.forfeits: Dict[Tuple[str, str, str], int] = {}
+        # (agent, role) → step latency histogram
+        self.steps: Dict[Tuple[str, str], Histogram] = {}
+        # [second, games finished in it] for the last RATE_WINDOW seconds
+        # (monotonic clock), so the rate is exact at any throughput
+        self._per_second: deque = deque(maxlen=int(RATE_WINDOW) + 1)
+
+    def game_started(self):
+        """Call when a game starts."""
+        self.in_flight += 1
+
+    def game_finished(self, result: str, seek: str, hide: str, duration: float,
+                      forfeit: Optional[Dict] = None):
+        """
+        Call when a game ends.
+
+        Args:
+            result: 'pacman_wins', 'ghost_wins', 'draw' or 'error'
+            seek: Pacman agent ID
+            hide: Ghost agent ID
+            duration: Seconds a worker spent on the game
+            forfeit: stats['forfeit'] of the game ({'role', 'reason'}), if any
+        """
+        self.results[result] = self.results.get(result, 0) + 1
+        if forfeit:
+            agent = seek if forfeit['role'] == 'pacman' else hide
+            key = (agent, forfeit['role'], forfeit['reason'])
+            self.forfeits[key] = self.forfeits.get(key, 0) + 1
+        self.busy += duration
+        self.in_flight = max(0, self.in_flight - 1)
+        second = int(time.monotonic())
+        buckets = self._per_second
+        if buckets and buckets[-1][0] == second:
+            buckets[-1][1] += 1
+        else:
+            buckets.append([second, 1])
+        self.last_game = time.time()
+
+    def observe_step(self, agent: str, role: str, seconds: float):
+        """Record the latency of one agent step."""
+        histogram = self.steps.get((agent, role))
+        if histogram is None:
+            histogram = self.steps[(agent, role)] = Histogram()
+        histogram.observe(seconds)
+
+    def drain_steps(self) -> List[Tuple[str, str, List[int], float]]:
+        """
+        Take the step histograms collected so far and reset them.
+
+        Worker processes use this to ship their observations to the
+        process serving the metrics, which applies them with merge_steps().
+        """
+        drained = [(agent, role, h.counts, h.total) for (agent, role), h in self.steps.items()]
+        self.steps = {}
+        return drained
+
+    def merge_steps(self, drained: List[Tuple[str, str, List[int], float]]):
+        """Add histograms returned by drain_steps() in another process."""
+        for agent, role, counts, total in drained:
+            histogram = self.steps.get((agent, role))
+            if histogram is None:
+                histogram = self.steps[(agent, role)] = Histogram()
+            histogram.merge(counts, total)
+
+    def games_per_second(self) -> float:
+        """Games finished per second over the last RATE_WINDOW seconds (to the second)."""
+        now = time.monotonic()
+        oldest = int(now) - int(RATE_WINDOW)
+        recent = sum(n for second, n in list(self._per_second) if second > oldest)
+        window = min(RATE_WINDOW, now - self.started)
+        return recent / window if window > 0 else 0.0
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{labels} {_number(value)}")
+
+        elapsed = time.monotonic() - self.started
+        metric('arena_games_total', 'counter', 'Finished games by result.',
+               [('', _labels(result=r), n) for r, n in sorted(list(self.results.items()))])
+        metric('arena_games_in_flight', 'gauge', 'Games being played.', [('', '', self.in_flight)])
+        metric('arena_games_per_second', 'gauge',
+               f'Games finished per second over the last {RATE_WINDOW:g} s.',
+               [('', '', self.games_per_second())])
+        if self.last_game is not None:
+            metric('arena_last_game_timestamp_seconds', 'gauge', 'Unix time the last game finished.',
+                   [('', '', self.last_game)])
+
+        forfeits = sorted(list(self.forfeits.items()))
+        metric('arena_forfeits_total', 'counter', 'Games forfeited by an agent, by reason.',
+               [('', _labels(agent=a, role=r, reason=why), n) for (a, r, why), n in forfeits])
+        metric('arena_agent_timeouts_total', 'counter', 'Agent steps that exceeded the step timeout.',
+               [('', _labels(agent=a, role=r), n) for (a, r, why), n in forfeits if why == 'timeout'])
+
+        samples = []
+        for (agent, role), h in sorted(list(self.steps.items())):
+            counts = list(h.counts)
+            cumulative = 0
+            for bound, n in zip(STEP_BUCKETS + (float('inf'),), counts):
+                cumulative += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                samples.append(('_bucket', _labels(agent=agent, role=role, le=le), cumulative))
+            samples.append(('_sum', _labels(agent=agent, role=role), h.total))
+            samples.append(('_count', _labels(agent=agent, role=role), cumulative))
+        metric('arena_step_seconds', 'histogram', 'Latency of agent steps.', samples)
+
+        metric('arena_worker_busy_seconds_total', 'counter', 'Time workers spent playing games.',
+               [('', '', self.busy)])
+        utilization = self.busy / (self.workers * elapsed) if elapsed > 0 else 0.0
+        metric('arena_worker_utilization', 'gauge', 'Busy time / (workers × elapsed time).',
+               [('', '', min(1.0, utilization))])
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+        Serve /metrics from a daemon thread.
+
+        Args:
+            port: TCP port (0 picks a free one; see server.server_address)
+            host: Interface to bind (local only by default)
+
+        Returns:
+            The running server (call shutdown() to stop it)
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        return server
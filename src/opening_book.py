@@ -0,0 +1,311 @@
+"""
+Opening book for the start positions chosen by Environment.reset().
+
+Every game starts from one of a small, fixed set of (Pacman, Ghost) cell
+pairs, so the first decision can be searched once offline and looked up
+during play. The book stores the best first move of each side for every
+start pair, found by a memoized depth-limited minimax over maze distances.
+
+Build a book (offline):
+  python opening_book.py build --output default_book.npz --depth 24
+
+Use it from an agent:
+  from opening_book import OpeningBook
+  book = OpeningBook.load("default_book.npz")
+  move = book.lookup(map_state, my_position, enemy_position, 'pacman',
+                     fallback=lambda: self.search(map_state, my_position, enemy_position))
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from environment import Environment, Move, generate_maze
+from map_graph import MOVE_INDEX, MOVES, CompiledMap, compile_map
+
+
+# Sentinel stored for pairs that have no entry
+NO_MOVE = 255
+
+# Score of a capture; distances are always far below this
+CAPTURE = 1_000_000
+
+_STAY = MOVE_INDEX[Move.STAY]
+
+
+class _MinimaxSearcher:
+    """
+    Depth-limited minimax over the compiled map, memoized on
+    (pacman cell, ghost cell, remaining depth, side to move).
+
+    The search alternates turns (the side choosing the root move moves
+    first), which is the conservative reading of the simultaneous-move
+    rules. The Ghost maximizes and the Pacman minimizes the maze distance
+    at the horizon; captures score -CAPTURE minus the remaining depth so
+    Pacman prefers quick captures and Ghost prefers late ones.
+    """
+
+    def __init__(self, compiled: CompiledMap, depth: int):
+        self.depth = depth
+        self.n = compiled.n_cells
+        self.successors = [sorted(set(int(c) for c in row)) for row in compiled.neighbors]
+        self.neighbors = compiled.neighbor_lists
+        self.distances = compiled.distance_matrix().tolist()
+        self.memo: Dict[int, int] = {}
+
+    def value(self, p: int, g: int, remaining: int, pacman_to_move: bool) -> int:
+        if p == g:
+            return -(CAPTURE + remaining)
+        if remaining == 0:
+            d = self.distances[p][g]
+            return CAPTURE if d < 0 else d
+
+        key = ((p * self.n + g) * (self.depth + 1) + remaining) * 2 + pacman_to_move
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+
+        if pacman_to_move:
+            best = None
+            for nxt in self.successors[p]:
+                v = self.value(nxt, g, remaining - 1, False)
+                if best is None or v < best:
+                    best = v
+        else:
+            best = None
+            for nxt in self.successors[g]:
+                v = self.value(p, nxt, remaining - 1, True)
+                if best is None or v > best:
+                    best = v
+
+        self.memo[key] = best
+        return best
+
+    def best_move(self, p: int, g: int, role: str) -> int:
+        """
+        Index into MOVES of the best root move for ``role``.
+
+        Blocked directions lead back to the agent's own cell, like STAY;
+        they are skipped so a tie with staying never stores a move into a
+        wall (which the arena would count as a wall move).
+        """
+        me = p if role == 'pacman' else g
+        successors = self.neighbors[me]
+        best_index, best_value = NO_MOVE, None
+        for m in range(len(MOVES)):
+            if successors[m] == me and m != _STAY:
+                continue
+            if role == 'pacman':
+                v = self.value(successors[m], g, self.depth - 1, False)
+                better = best_value is None or v < best_value
+            else:
+                v = self.value(p, successors[m], self.depth - 1, True)
+                better = best_value is None or v > best_value
+            if better:
+                best_index, best_value = m, v
+        return best_index
+
+
+class OpeningBook:
+    """
+    Best first moves for every start pair of one map.
+
+    Lookups are a dictionary access plus a table read; positions outside
+    the book (or a different map) return None so the caller can fall back
+    to its own search.
+    """
+
+    def __init__(self, map_state: np.ndarray, pacman_cells: np.ndarray,
+                 ghost_cells: np.ndarray, pacman_moves: np.ndarray,
+                 ghost_moves: np.ndarray, depth: int):
+        """
+        Initialize the book from its tables.
+
+        Args:
+            map_state: Map the book was built for
+            pacman_cells: (P, 2) Pacman start cells
+            ghost_cells: (G, 2) Ghost start cells
+            pacman_moves: (P, G) uint8 indices into MOVES for Pacman
+            ghost_moves: (P, G) uint8 indices into MOVES for Ghost
+            depth: Search depth used to build the book
+        """
+        self.map = np.asarray(map_state, dtype=np.uint8)
+        self.pacman_cells = np.asarray(pacman_cells, dtype=np.int16)
+        self.ghost_cells = np.asarray(ghost_cells, dtype=np.int16)
+        self.pacman_moves = np.asarray(pacman_moves, dtype=np.uint8)
+        self.ghost_moves = np.asarray(ghost_moves, dtype=np.uint8)
+        self.depth = depth
+        self.hits = 0
+        self.misses = 0
+
+        self._pacman_index = {
+            (int(r), int(c)): i for i, (r, c) in enumerate(self.pacman_cells)
+        }
+        self._ghost_index = {
+            (int(r), int(c)): i for i, (r, c) in enumerate(self.ghost_cells)
+        }
+        self._last_map = None
+
+    def __len__(self) -> int:
+        return len(self.pacman_cells) * len(self.ghost_cells)
+
+    @classmethod
+    def build(cls, map_state: Optional[np.ndarray] = None, depth: int = 24,
+              verbose: bool = False) -> "OpeningBook":
+        """
+        Search every start pair of a map.
+
+        Args:
+            map_state: Map to build for (default map if None)
+            depth: Plies searched per root move
+            verbose: Print progress
+
+        Returns:
+            The built OpeningBook
+        """
+        env = Environment(map_layout=map_state)
+        compiled = compile_map(env.map)
+        pacman_cells, ghost_cells = env.start_cells()
+        searcher = _MinimaxSearcher(compiled, depth)
+
+        pacman_moves = np.full((len(pacman_cells), len(ghost_cells)), NO_MOVE, dtype=np.uint8)
+        ghost_moves = np.full_like(pacman_moves, NO_MOVE)
+        start = time.perf_counter()
+        for i, pac in enumerate(pacman_cells):
+            p = compiled.cell_id(pac)
+            for j, ghost in enumerate(ghost_cells):
+                g = compiled.cell_id(ghost)
+                if p == g:
+                    continue
+                pacman_moves[i, j] = searcher.best_move(p, g, 'pacman')
+                ghost_moves[i, j] = searcher.best_move(p, g, 'ghost')
+            if verbose:
+                print(f"  {i + 1}/{len(pacman_cells)} Pacman starts "
+                      f"({time.perf_counter() - start:.1f}s, {len(searcher.memo)} states)")
+
+        return cls(env.map, pacman_cells, ghost_cells, pacman_moves, ghost_moves, depth)
+
+    def save(self, path: str):
+        """Save the book as a compressed .npz file."""
+        np.savez_compressed(
+            path,
+            map=self.map,
+            pacman_cells=self.pacman_cells,
+            ghost_cells=self.ghost_cells,
+            pacman_moves=self.pacman_moves,
+            ghost_moves=self.ghost_moves,
+            depth=np.array(self.depth),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "OpeningBook":
+        """Load a book saved with save()."""
+        with np.load(path) as data:
+            return cls(
+                data['map'], data['pacman_cells'], data['ghost_cells'],
+                data['pacman_moves'], data['ghost_moves'], int(data['depth']),
+            )
+
+    def _same_map(self, map_state: np.ndarray) -> bool:
+        if map_state is self._last_map:
+            return True
+        if map_state.shape != self.map.shape or not np.array_equal(map_state, self.map):
+            return False
+        self._last_map = map_state
+        return True
+
+    def probe(self, map_state: np.ndarray, my_position: Tuple[int, int],
+              enemy_position: Tuple[int, int], role: str) -> Optional[Move]:
+        """
+        Look up the book move for a position.
+
+        Args:
+            map_state: Current map (must match the book's map)
+            my_position: Position of the agent asking
+            enemy_position: Position of the opponent
+            role: 'pacman' or 'ghost'
+
+        Returns:
+            Book move, or None when the position is out of book
+        """
+        if role == 'pacman':
+            i = self._pacman_index.get((int(my_position[0]), int(my_position[1])))
+            j = self._ghost_index.get((int(enemy_position[0]), int(enemy_position[1])))
+            table = self.pacman_moves
+        else:
+            i = self._pacman_index.get((int(enemy_position[0]), int(enemy_position[1])))
+            j = self._ghost_index.get((int(my_position[0]), int(my_position[1])))
+            table = self.ghost_moves
+
+        if i is None or j is None or not self._same_map(map_state):
+            self.misses += 1
+            return None
+        move_index = table[i, j]
+        if move_index == NO_MOVE:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return MOVES[move_index]
+
+    def lookup(self, map_state: np.ndarray, my_position: Tuple[int, int],
+               enemy_position: Tuple[int, int], role: str,
+               fallback: Callable[[], Move]) -> Move:
+        """
+        Get the book move, or run ``fallback`` (the agent's live search).
+
+        Returns:
+            Move from the book when in book, otherwise fallback()
+        """
+        move = self.probe(map_state, my_position, enemy_position, role)
+        if move is None:
+            return fallback()
+        return move
+
+
+def main():
+    """Command-line entry point for building and inspecting books."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = sub.add_parser('build', help='Build a book for a map')
+    build_parser.add_argument('--output', required=True, help='Output .npz file')
+    build_parser.add_argument('--depth', type=int, default=24,
+                              help='Search depth in plies (default: 24)')
+    build_parser.add_argument('--maze', type=int, nargs=2, metavar=('HEIGHT', 'WIDTH'),
+                              help='Build for a procedural maze instead of the default map')
+    build_parser.add_argument('--seed', type=int, default=0,
+                              help='Seed for --maze (default: 0)')
+
+    info_parser = sub.add_parser('info', help='Show statistics about a book')
+    info_parser.add_argument('path', help='Book .npz file')
+
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        book = OpeningBook.load(args.path)
+        print(f"Map: {book.map.shape[0]}x{book.map.shape[1]}")
+        print(f"Pacman starts: {len(book.pacman_cells)}  Ghost starts: {len(book.ghost_cells)}")
+        print(f"Entries: {len(book)}  Depth: {book.depth}")
+        for role, table in (('pacman', book.pacman_moves), ('ghost', book.ghost_moves)):
+            counts = np.bincount(table[table != NO_MOVE], minlength=len(MOVES))
+            summary = ', '.join(f"{m.name}={c}" for m, c in zip(MOVES, counts))
+            print(f"{role:>7} moves: {summary}")
+        return 0
+
+    map_state = generate_maze(*args.maze, seed=args.seed) if args.maze else None
+    print(f"Building opening book (depth {args.depth})...")
+    start = time.perf_counter()
+    book = OpeningBook.build(map_state, depth=args.depth, verbose=True)
+    book.save(args.output)
+    print(f"Saved {len(book)} entries to {args.output} in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Shared pathfinding toolkit for agents.
+
+BFS, A* and multi-source BFS over the compiled map (integer cell ids and a
+precomputed neighbour table). Searches keep parent pointers in flat lists
+instead of copying a path per expanded node, and only build the path when
+the goal is reached.
+
+Usage from an agent:
+  from pathfinding import bfs_first_move, astar_path
+
+  move = bfs_first_move(map_state, my_position, enemy_position)
+  path = astar_path(map_state, my_position, enemy_position)  # list of Moves
+"""
+
+import heapq
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from environment import Move
+from map_graph import MOVES, CompiledMap, compile_map
+
+
+# Neighbour table columns that actually move (STAY excluded)
+_STEP_COLUMNS = [i for i, move in enumerate(MOVES) if move is not Move.STAY]
+
+
+def _cells(compiled: CompiledMap, start: Tuple[int, int],
+           goal: Tuple[int, int]) -> Tuple[int, int]:
+    return compiled.cell_id(start), compiled.cell_id(goal)
+
+
+def _moves_from_parents(compiled: CompiledMap, parent: List[int],
+                        parent_move: List[int], goal: int) -> List[Move]:
+    moves = []
+    cell = goal
+    while parent[cell] != cell:
+        moves.append(MOVES[parent_move[cell]])
+        cell = parent[cell]
+    moves.reverse()
+    return moves
+
+
+def _bfs(compiled: CompiledMap, start: int, goal: int):
+    """Parent-pointer BFS from start; stops when goal is dequeued."""
+    n = compiled.n_cells
+    parent = [-1] * n
+    parent_move = [0] * n
+    parent[start] = start
+    neighbors = compiled.neighbor_lists
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        if cell == goal:
+            return parent, parent_move
+        row = neighbors[cell]
+        for m in _STEP_COLUMNS:
+            nxt = row[m]
+            if parent[nxt] < 0:
+                parent[nxt] = cell
+                parent_move[nxt] = m
+                queue.append(nxt)
+    return None
+
+
+def bfs_path(map_state: np.ndarray, start: Tuple[int, int],
+             goal: Tuple[int, int]) -> Optional[List[Move]]:
+    """
+    Shortest path from start to goal using BFS.
+
+    Args:
+        map_state: 2D numpy array where 1 = wall, 0 = empty
+        start: Start (row, col)
+        goal: Goal (row, col)
+
+    Returns:
+        List of Moves (empty if start == goal), or None if unreachable
+    """
+    compiled = compile_map(map_state)
+    s, g = _cells(compiled, start, goal)
+    if s < 0 or g < 0:
+        return None
+    found = _bfs(compiled, s, g)
+    if found is None:
+        return None
+    return _moves_from_parents(compiled, found[0], found[1], g)
+
+
+def bfs_first_move(map_state: np.ndarray, start: Tuple[int, int],
+                   goal: Tuple[int, int]) -> Move:
+    """
+    First move of a shortest path from start to goal.
+
+    Returns:
+        Move, or Move.STAY if already at the goal or it is unreachable
+    """
+    path = bfs_path(map_state, start, goal)
+    return path[0] if path else Move.STAY
+
+
+def astar_path(map_state: np.ndarray, start: Tuple[int, int],
+               goal: Tuple[int, int]) -> Optional[List[Move]]:
+    """
+    Shortest path from start to goal using A* with the Manhattan heuristic.
+
+    Args:
+        map_state: 2D numpy array where 1 = wall, 0 = empty
+        start: Start (row, col)
+        goal: Goal (row, col)
+
+    Returns:
+        List of Moves (empty if start == goal), or None if unreachable
+    """
+    compiled = compile_map(map_state)
+    s, g = _cells(compiled, start, goal)
+    if s < 0 or g < 0:
+        return None
+
+    n = compiled.n_cells
+    neighbors = compiled.neighbor_lists
+    rows = compiled.coords[:, 0].tolist()
+    cols = compiled.coords[:, 1].tolist()
+    goal_row, goal_col = rows[g], cols[g]
+
+    g_cost = [-1] * n
+    parent = [-1] * n
+    parent_move = [0] * n
+    g_cost[s] = 0
+    parent[s] = s
+    closed = [False] * n
+    # Entries are (f, -g, cell): ties prefer deeper nodes, which are closer to the goal
+    frontier = [(abs(rows[s] - goal_row) + abs(cols[s] - goal_col), 0, s)]
+
+    while frontier:
+        _, neg_cost, cell = heapq.heappop(frontier)
+        if closed[cell]:
+            continue
+        if cell == g:
+            return _moves_from_parents(compiled, parent, parent_move, g)
+        closed[cell] = True
+        cost = -neg_cost + 1
+        row = neighbors[cell]
+        for m in _STEP_COLUMNS:
+            nxt = row[m]
+            if nxt == cell or closed[nxt]:
+                continue
+            if g_cost[nxt] < 0 or cost < g_cost[nxt]:
+                g_cost[nxt] = cost
+                parent[nxt] = cell
+                parent_move[nxt] = m
+                h = abs(rows[nxt] - goal_row) + abs(cols[nxt] - goal_col)
+                heapq.heappush(frontier, (cost + h, -cost, nxt))
+    return None
+
+
+def astar_first_move(map_state: np.ndarray, start: Tuple[int, int],
+                     goal: Tuple[int, int]) -> Move:
+    """
+    First move of an A* path from start to goal.
+
+    Returns:
+        Move, or Move.STAY if already at the goal or it is unreachable
+    """
+    path = astar_path(map_state, start, goal)
+    return path[0] if path else Move.STAY
+
+
+def multi_source_bfs(map_state: np.ndarray,
+                     sources: Iterable[Tuple[int, int]]) -> np.ndarray:
+    """
+    Distance from every cell to the nearest source.
+
+    Useful for "distance to the closest of several targets" and for
+    distance fields (one source).
+
+    Args:
+        map_state: 2D numpy array where 1 = wall, 0 = empty
+        sources: Source (row, col) positions
+
+    Returns:
+        (height, width) int32 array of distances; -1 for walls and
+        unreachable cells
+    """
+    compiled = compile_map(map_state)
+    cells = [compiled.cell_id(pos) for pos in sources]
+    dist = bfs_distances(compiled, [cell for cell in cells if cell >= 0])
+
+    field = np.full(compiled.map.shape, -1, dtype=np.int32)
+    field[compiled.coords[:, 0], compiled.coords[:, 1]] = dist
+    return field
+
+
+def bfs_distances(compiled: CompiledMap, sources: Iterable[int]) -> List[int]:
+    """
+    Multi-source BFS in cell-id space.
+
+    Args:
+        compiled: Compiled map
+        sources: Source cell ids
+
+    Returns:
+        Distance per cell id to the nearest source, -1 if unreachable
+    """
+    neighbors = compiled.neighbor_lists
+    dist = [-1] * compiled.n_cells
+    frontier = []
+    for cell in sources:
+        if dist[cell] < 0:
+            dist[cell] = 0
+            frontier.append(cell)
+
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for cell in frontier:
+            for nxt in neighbors[cell]:
+                if dist[nxt] < 0:
+                    dist[nxt] = depth
+                    next_frontier.append(nxt)
+        frontier = next_frontier
+    return dist
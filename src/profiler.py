@@ -0,0 +1,222 @@
+"""
+Opt-in profiling support for the arena.
+
+Attributes wall-clock time of a game to its phases (agent steps, move
+validation, environment updates and rendering) and can optionally run
+cProfile around each agent's ``step()`` calls.
+"""
+
+import cProfile
+import pstats
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+
+# Deepest call stack written by folded_stacks()
+MAX_STACK_DEPTH = 64
+
+
+def _frame(func: Tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    return f"{name} ({filename}:{lineno})".replace(';', ',')
+
+
+def _call_stacks(profile: cProfile.Profile) -> Dict[Tuple[str, ...], float]:
+    """
+    Rebuild call stacks from a cProfile profile.
+
+    cProfile keeps per-function totals and, for each function, the time
+    spent in it when called from each caller. Starting from the functions
+    nobody called (the step() entry points), each function's cumulative
+    time on a path is split between its own time and its callees in
+    proportion to their shares; recursive calls are folded into the
+    outermost frame.
+
+    Returns:
+        Stack of frames → own seconds on that path
+    """
+    stats = pstats.Stats(profile).stats
+    callees: Dict[Tuple, List[Tuple[Tuple, float]]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    stacks: Dict[Tuple[str, ...], float] = {}
+
+    def walk(func, seconds: float, path: Tuple, frames: Tuple[str, ...]):
+        _, _, tottime, cumtime, _ = stats[func]
+        share = seconds / cumtime if cumtime > 0 else 0.0
+        own = tottime * share
+        if len(frames) < MAX_STACK_DEPTH:
+            for callee, edge_time in callees.get(func, ()):
+                if callee in path or callee not in stats:
+                    continue
+                child = edge_time * share
+                if child * 1e6 >= 1:
+                    walk(callee, child, path + (callee,), frames + (_frame(callee),))
+                else:
+                    own += child
+        else:
+            own = seconds
+        stacks[frames] = stacks.get(frames, 0.0) + own
+
+    for func, (_, _, _, cumtime, callers) in stats.items():
+        if not callers:
+            walk(func, cumtime, (func,), (_frame(func),))
+    return stacks
+
+
+# Phases recorded by Arena.run_game, in display order
+PHASES = (
+    'pacman_step',
+    'ghost_step',
+    'validate',
+    'env_reset',
+    'env_step',
+    'render',
+)
+
+
+class PhaseProfiler:
+    """
+    Accumulates per-phase timings across one or more games.
+
+    Timing uses plain ``perf_counter`` deltas added to dictionaries so the
+    overhead per phase is two clock reads and one addition. A single
+    profiler can be shared by many Arena instances to cover a whole batch.
+    """
+
+    def __init__(self, profile_agents: bool = False):
+        """
+        Initialize the profiler.
+
+        Args:
+            profile_agents: Also run cProfile around each agent's step()
+        """
+        self.totals: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.calls: Dict[str, int] = {phase: 0 for phase in PHASES}
+        self.games = 0
+        self.wall_time = 0.0
+        self.profile_agents = profile_agents
+        self.agent_profiles: Dict[str, cProfile.Profile] = {}
+        self._game_start: Optional[float] = None
+
+    def add(self, phase: str, elapsed: float):
+        """Record ``elapsed`` seconds spent in ``phase``."""
+        self.totals[phase] = self.totals.get(phase, 0.0) + elapsed
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def start_game(self):
+        """Mark the beginning of a game."""
+        self._game_start = perf_counter()
+
+    def end_game(self):
+        """Mark the end of a game."""
+        if self._game_start is not None:
+            self.wall_time += perf_counter() - self._game_start
+            self._game_start = None
+        self.games += 1
+
+    def agent_profile(self, phase: str) -> Optional[cProfile.Profile]:
+        """
+        Get the cProfile instance used for an agent phase.
+
+        Args:
+            phase: 'pacman_step' or 'ghost_step'
+
+        Returns:
+            Profile object, or None when agent profiling is disabled
+        """
+        if not self.profile_agents:
+            return None
+        profile = self.agent_profiles.get(phase)
+        if profile is None:
+            profile = cProfile.Profile()
+            self.agent_profiles[phase] = profile
+        return profile
+
+    def breakdown(self) -> List[Dict]:
+        """
+        Summarize time per phase.
+
+        Returns:
+            List of dicts with phase, total, calls, mean and share of wall time
+        """
+        measured = sum(self.totals.values())
+        wall = self.wall_time if self.wall_time > 0 else measured
+        rows = []
+        for phase, total in self.totals.items():
+            calls = self.calls.get(phase, 0)
+            rows.append({
+                'phase': phase,
+                'total': total,
+                'calls': calls,
+                'mean': total / calls if calls else 0.0,
+                'share': total / wall if wall > 0 else 0.0,
+            })
+        rows.append({
+            'phase': 'other',
+            'total': max(0.0, wall - measured),
+            'calls': 0,
+            'mean': 0.0,
+            'share': max(0.0, wall - measured) / wall if wall > 0 else 0.0,
+        })
+        return rows
+
+    def format_breakdown(self) -> str:
+        """Render the per-phase breakdown as a text table."""
+        lines = [
+            f"{'Phase':<14}{'Total (s)':>12}{'Calls':>10}{'Mean (ms)':>12}{'Share':>9}",
+            '-' * 57,
+        ]
+        for row in self.breakdown():
+            lines.append(
+                f"{row['phase']:<14}{row['total']:>12.4f}{row['calls']:>10}"
+                f"{row['mean'] * 1000:>12.4f}{row['share'] * 100:>8.1f}%"
+            )
+        lines.append('-' * 57)
+        lines.append(f"Games: {self.games}   Wall time: {self.wall_time:.4f}s")
+        return '\n'.join(lines)
+
+    def folded_stacks(self) -> List[str]:
+        """
+        Produce flamegraph-compatible folded stack lines.
+
+        Each line is ``frame;frame;... <microseconds>``, accepted by
+        flamegraph.pl, speedscope and inferno. Phases form the first level
+        below ``game``; when agent profiling is enabled, the agents' call
+        stacks, rebuilt from cProfile's caller data, hang below their
+        phase.
+
+        Returns:
+            List of folded stack lines
+        """
+        lines = []
+        for phase, total in self.totals.items():
+            own = total
+            profile = self.agent_profiles.get(phase)
+            if profile is not None:
+                for frames, seconds in _call_stacks(profile).items():
+                    own -= seconds
+                    micros = int(seconds * 1e6)
+                    if micros > 0:
+                        lines.append(f"game;{phase};{';'.join(frames)} {micros}")
+            micros = int(max(0.0, own) * 1e6)
+            if micros > 0:
+                lines.append(f"game;{phase} {micros}")
+        other = int(max(0.0, self.wall_time - sum(self.totals.values())) * 1e6)
+        if other > 0:
+            lines.append(f"game {other}")
+        return lines
+
+    def write_folded(self, path: str):
+        """Write folded stacks to ``path``."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for line in self.folded_stacks():
+                f.write(line + '\n')
+
+    def print_agent_stats(self, limit: int = 15):
+        """Print the top functions by cumulative time for each profiled agent."""
+        for phase, profile in self.agent_profiles.items():
+            print(f"\ncProfile for {phase} (top {limit} by cumulative time):")
+            pstats.Stats(profile).sort_stats('cumulative').print_stats(limit)
@@ -0,0 +1,467 @@
+"""
+Incremental ratings for seekers and hiders.
+
+A win-rate table needs every pairing played and is recomputed from
+scratch whenever a submission changes. This module keeps Glicko ratings
+instead, updated one game at a time:
+
+  - Every submission version has two independent ratings, one as seeker
+    (Pacman) and one as hider (Ghost); a game updates the seeker's
+    seeker rating against the hider's hider rating. A Glicko rating is
+    an estimate plus a rating deviation (RD) saying how uncertain it is.
+  - A version is the agent ID plus the optional 'seek_version' /
+    'hide_version' fields of a result record. A new version starts from
+    the previous version's rating with its RD raised, so it converges in
+    a few games instead of starting over.
+  - The store remembers how far it has read each results file, so
+    updating with a growing JSONL file only reads the new games.
+  - next_pairings() picks the pairings whose next game is expected to
+    shrink the uncertainty of the standings the most: new versions and
+    agents whose rank is still unclear play first, and the league is
+    ranked long before every pairing has been played.
+
+Examples:
+  python rating.py update games.jsonl --store ratings.json
+  python rating.py update games.jsonl --follow     # while log.py writes it
+  python rating.py show --store ratings.json --role hide
+  python rating.py next --store ratings.json -n 10 --agents alice bob carol
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import sys
+import time
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+ROLES = ('seek', 'hide')
+
+# Agent type playing each role (see reference_agents.AGENTS)
+_AGENT_TYPES = {'seek': 'pacman', 'hide': 'ghost'}
+
+DEFAULT_RATING = 1500.0
+MAX_RD = 350.0
+MIN_RD = 30.0
+
+# Score of the seeker per result
+SEEKER_SCORE = {'pacman_wins': 1.0, 'ghost_wins': 0.0, 'draw': 0.5}
+
+_Q = math.log(10) / 400
+
+
+def _g(rd: float) -> float:
+    return 1 / math.sqrt(1 + 3 * (_Q * rd) ** 2 / math.pi ** 2)
+
+
+def player_key(agent_id: str, version: Optional[str] = None) -> str:
+    """Key of one submission version: 'id' or 'id@version'."""
+    return f'{agent_id}@{version}' if version else agent_id
+
+
+def split_key(key: str) -> Tuple[str, Optional[str]]:
+    """Inverse of player_key()."""
+    agent_id, _, version = key.partition('@')
+    return agent_id, version or None
+
+
+class Rating:
+    """Glicko rating of one player in one role, with its game counts."""
+
+    __slots__ = ('rating', 'rd', 'games', 'wins', 'draws', 'losses')
+
+    def __init__(self, rating: float = DEFAULT_RATING, rd: float = MAX_RD,
+                 games: int = 0, wins: int = 0, draws: int = 0, losses: int = 0):
+        self.rating = rating
+        self.rd = rd
+        self.games = games
+        self.wins = wins
+        self.draws = draws
+        self.losses = losses
+
+    @property
+    def conservative(self) -> float:
+        """Rating minus two RDs: the value used for rankings."""
+        return self.rating - 2 * self.rd
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def expected_score(a: Rating, b: Rating) -> float:
+    """Expected score of ``a`` against ``b``."""
+    g = _g(math.sqrt(a.rd ** 2 + b.rd ** 2))
+    return 1 / (1 + 10 ** (-g * (a.rating - b.rating) / 400))
+
+
+def _variance_after(a: Rating, b: Rating) -> float:
+    """Variance of ``a`` after one more game against ``b`` (any result)."""
+    g = _g(b.rd)
+    e = 1 / (1 + 10 ** (-g * (a.rating - b.rating) / 400))
+    return 1 / (1 / a.rd ** 2 + _Q ** 2 * g ** 2 * e * (1 - e))
+
+
+def _updated(a: Rating, b: Rating, score: float) -> Tuple[float, float]:
+    """New (rating, rd) of ``a`` after scoring ``score`` against ``b``."""
+    g = _g(b.rd)
+    e = 1 / (1 + 10 ** (-g * (a.rating - b.rating) / 400))
+    variance = 1 / (1 / a.rd ** 2 + _Q ** 2 * g ** 2 * e * (1 - e))
+    return a.rating + _Q * variance * g * (score - e), max(MIN_RD, math.sqrt(variance))
+
+
+def _rank_ambiguity(players: Dict[str, Rating]) -> Dict[str, float]:
+    """
+    Per player, the expected number of same-role players it is ordered
+    wrongly against: the sum over others of the probability that the true
+    order differs from the rating order (plus a floor so no player is
+    ignored entirely).
+    """
+    normal = NormalDist()
+    items = list(players.items())
+    ambiguity = {}
+    for key, a in items:
+        total = 0.01
+        for other, b in items:
+            if other != key:
+                total += normal.cdf(-abs(a.rating - b.rating) / math.sqrt(a.rd ** 2 + b.rd ** 2))
+        ambiguity[key] = total
+    return ambiguity
+
+
+class RatingStore:
+    """
+    Seeker and hider ratings of every submission version.
+    """
+
+    def __init__(self, drift: float = 0.0, new_version_rd: float = 150.0):
+        """
+        Initialize an empty store.
+
+        Args:
+            drift: RD added (in quadrature) before each game, so ratings
+                of agents that keep playing can still move
+            new_version_rd: Minimum RD of a new version that inherits the
+                rating of the previous one
+        """
+        self.drift = drift
+        self.new_version_rd = new_version_rd
+        self.ratings: Dict[str, Dict[str, Rating]] = {role: {} for role in ROLES}
+        # Latest version key per role and agent ID
+        self.latest: Dict[str, Dict[str, str]] = {role: {} for role in ROLES}
+        # Read position per results file
+        self.sources: Dict[str, Dict] = {}
+        self.games = 0
+
+    def get(self, role: str, key: str) -> Rating:
+        """
+        Rating of a player in a role, created on first use.
+
+        A new version of a known agent inherits the latest version's
+        rating with at least ``new_version_rd`` of uncertainty.
+        """
+        ratings = self.ratings[role]
+        rating = ratings.get(key)
+        if rating is None:
+            agent_id, _ = split_key(key)
+            previous = ratings.get(self.latest[role].get(agent_id, ''))
+            if previous is not None:
+                rating = Rating(previous.rating, max(previous.rd, self.new_version_rd))
+            else:
+                rating = Rating()
+            ratings[key] = rating
+        return rating
+
+    def update(self, record: Dict) -> bool:
+        """
+        Apply one game result.
+
+        Args:
+            record: Result record with 'seek', 'hide', 'result' and optionally
+                'seek_version' / 'hide_version'
+
+        Returns:
+            False if the record is not a finished game and was skipped
+        """
+        score = SEEKER_SCORE.get(record.get('result'))
+        if score is None:
+            return False
+        seeker_key = player_key(record['seek'], record.get('seek_version'))
+        hider_key = player_key(record['hide'], record.get('hide_version'))
+        seeker = self.get('seek', seeker_key)
+        hider = self.get('hide', hider_key)
+        self.latest['seek'][record['seek']] = seeker_key
+        self.latest['hide'][record['hide']] = hider_key
+
+        if self.drift:
+            for player in (seeker, hider):
+                player.rd = min(MAX_RD, math.sqrt(player.rd ** 2 + self.drift ** 2))
+        # Both sides are updated from the pre-game ratings
+        seeker_new = _updated(seeker, hider, score)
+        hider_new = _updated(hider, seeker, 1 - score)
+        seeker.rating, seeker.rd = seeker_new
+        hider.rating, hider.rd = hider_new
+
+        for player, player_score in ((seeker, score), (hider, 1 - score)):
+            player.games += 1
+            if player_score == 1:
+                player.wins += 1
+            elif player_score == 0:
+                player.losses += 1
+            else:
+                player.draws += 1
+        self.games += 1
+        return True
+
+    def update_many(self, records: Iterable[Dict]) -> int:
+        """Apply results in order; returns the number of games applied."""
+        return sum(self.update(record) for record in records)
+
+    def consume(self, path: str) -> int:
+        """
+        Apply the games of a results file not read before.
+
+        Plain files are resumed from the stored byte offset, gzip files by
+        skipping the lines already read. A trailing line without a newline
+        (a writer mid-write) is left for the next call.
+
+        Returns:
+            Number of games applied
+        """
+        if path == '-':
+            return self.update_many(json.loads(line) for line in sys.stdin if line.strip())
+
+        source = self.sources.setdefault(os.path.abspath(path), {'offset': 0, 'lines': 0})
+        applied = 0
+        if path.endswith('.gz'):
+            with gzip.open(path, 'rb') as f:
+                for number, line in enumerate(f):
+                    if number < source['lines']:
+                        continue
+                    if not line.endswith(b'\n'):
+                        break
+                    if line.strip():
+                        applied += self.update(json.loads(line))
+                    source['lines'] += 1
+            return applied
+
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < source['offset']:
+                # Truncated or replaced: read it again
+                source['offset'] = source['lines'] = 0
+            f.seek(source['offset'])
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                if line.strip():
+                    applied += self.update(json.loads(line))
+                source['offset'] += len(line)
+                source['lines'] += 1
+        return applied
+
+    def standings(self, role: str, latest_only: bool = True) -> List[Tuple[str, Rating]]:
+        """
+        Players of a role, best first (by conservative rating).
+
+        Args:
+            role: 'seek' or 'hide'
+            latest_only: Only each agent's latest version
+        """
+        ratings = self.ratings[role]
+        keys = ratings.keys()
+        if latest_only:
+            latest = set(self.latest[role].values())
+            keys = [key for key in keys if key in latest]
+        return sorted(((key, ratings[key]) for key in keys), key=lambda item: -item[1].conservative)
+
+    def next_pairings(self, n: int = 10, agents: Optional[Iterable[str]] = None,
+                      per_agent: Optional[int] = None,
+                      allow_self: bool = False) -> List[Tuple[str, str, float]]:
+        """
+        Most informative pairings to play next.
+
+        A pairing's value is the variance its next game removes from the
+        seeker's and the hider's ratings (largest for uncertain ratings and
+        evenly matched opponents), each weighted by how likely that player
+        is to be ranked wrongly against the others of its role. Players
+        whose place in the standings is already clear stop being picked.
+
+        Args:
+            n: Pairings to return
+            agents: Agent IDs to pair in both roles (default: the agents
+                seen in each role); agents without games are included
+                with a fresh rating. Built-in agents only get the roles
+                they implement
+            per_agent: At most this many pairings per agent and role
+                (default: 3, or more if needed to fill ``n``)
+            allow_self: Allow an agent to play itself
+
+        Returns:
+            List of (seek_id, hide_id, value), most informative first
+        """
+        if agents is None:
+            role_ids = {role: set(self.latest[role]) for role in ROLES}
+        else:
+            agents = set(agents)
+            role_ids = {role: agents for role in ROLES}
+        if any(agent_id.startswith('builtin:') for ids in role_ids.values() for agent_id in ids):
+            # Deferred: reference_agents pulls in NumPy and the tablebase
+            from reference_agents import AGENTS, PREFIX
+            role_ids = {role: {agent_id for agent_id in ids
+                               if not agent_id.startswith(PREFIX)
+                               or _AGENT_TYPES[role] in AGENTS.get(agent_id[len(PREFIX):], {})}
+                        for role, ids in role_ids.items()}
+        if per_agent is None:
+            per_agent = max(3, math.ceil(n / max(1, len(role_ids['seek'] | role_ids['hide']))))
+
+        def current(role: str, agent_id: str) -> Rating:
+            key = self.latest[role].get(agent_id, agent_id)
+            return self.ratings[role].get(key) or Rating()
+
+        players = {role: {agent_id: current(role, agent_id) for agent_id in sorted(role_ids[role])}
+                   for role in ROLES}
+        ambiguity = {role: _rank_ambiguity(players[role]) for role in ROLES}
+
+        candidates = []
+        for seek_id, seeker in players['seek'].items():
+            for hide_id, hider in players['hide'].items():
+                if seek_id == hide_id and not allow_self:
+                    continue
+                value = ((seeker.rd ** 2 - _variance_after(seeker, hider)) * ambiguity['seek'][seek_id]
+                         + (hider.rd ** 2 - _variance_after(hider, seeker)) * ambiguity['hide'][hide_id])
+                candidates.append((value, seek_id, hide_id))
+        candidates.sort(reverse=True)
+
+        chosen = []
+        seek_count: Dict[str, int] = {}
+        hide_count: Dict[str, int] = {}
+        for value, seek_id, hide_id in candidates:
+            if seek_count.get(seek_id, 0) >= per_agent or hide_count.get(hide_id, 0) >= per_agent:
+                continue
+            chosen.append((seek_id, hide_id, value))
+            seek_count[seek_id] = seek_count.get(seek_id, 0) + 1
+            hide_count[hide_id] = hide_count.get(hide_id, 0) + 1
+            if len(chosen) == n:
+                break
+        return chosen
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable state."""
+        return {
+            'drift': self.drift,
+            'new_version_rd': self.new_version_rd,
+            'games': self.games,
+            'latest': self.latest,
+            'sources': self.sources,
+            'ratings': {role: {key: r.to_dict() for key, r in ratings.items()}
+                        for role, ratings in self.ratings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "RatingStore":
+        """Rebuild a store saved with to_dict()."""
+        store = cls(state.get('drift', 0.0), state.get('new_version_rd', 150.0))
+        store.games = state.get('games', 0)
+        store.latest = {role: dict(state.get('latest', {}).get(role, {})) for role in ROLES}
+        store.sources = state.get('sources', {})
+        for role in ROLES:
+            store.ratings[role] = {key: Rating(**r) for key, r in state.get('ratings', {}).get(role, {}).items()}
+        return store
+
+    @classmethod
+    def load(cls, path: str) -> "RatingStore":
+        """Load a store, or start an empty one if the file does not exist."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path: str):
+        """Write the store atomically."""
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+
+def format_standings(store: RatingStore, role: str, top: Optional[int] = None,
+                     latest_only: bool = True) -> str:
+    """Text table of a role's standings."""
+    title = 'Seekers (Pacman)' if role == 'seek' else 'Hiders (Ghost)'
+    lines = [title, f"{'#':>3}  {'Player':<32}{'Rating':>8}{'RD':>7}{'Games':>7}{'W-D-L':>14}"]
+    for rank, (key, r) in enumerate(store.standings(role, latest_only)[:top], 1):
+        lines.append(f"{rank:>3}  {key:<32}{r.rating:>8.0f}{r.rd:>7.0f}{r.games:>7}"
+                     f"{f'{r.wins}-{r.draws}-{r.losses}':>14}")
+    return '\n'.join(lines)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--store', default='ratings.json',
+                        help='Rating store (JSON, default: ratings.json)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    update_parser = sub.add_parser('update', help='Apply new games from results files')
+    update_parser.add_argument('results', nargs='+', help='JSONL result files (.gz or - for stdin)')
+    update_parser.add_argument('--drift', type=float,
+                               help='RD added before each game (new stores only)')
+    update_parser.add_argument('--follow', type=float, nargs='?', const=5.0, metavar='SECONDS',
+                               help='Keep reading new games every SECONDS (default: 5) until interrupted')
+
+    show_parser = sub.add_parser('show', help='Print the standings')
+    show_parser.add_argument('--role', choices=ROLES, help='Only this role')
+    show_parser.add_argument('--top', type=int, help='Players listed per role')
+    show_parser.add_argument('--all-versions', action='store_true',
+                             help='Include older versions of each agent')
+
+    next_parser = sub.add_parser('next', help='Suggest the next pairings to play')
+    next_parser.add_argument('-n', type=int, default=10, help='Pairings (default: 10)')
+    next_parser.add_argument('--agents', nargs='+', help='Agent IDs to pair (default: all rated)')
+    next_parser.add_argument('--per-agent', type=int, help='Max pairings per agent and role')
+    next_parser.add_argument('--allow-self', action='store_true', help='Let agents play themselves')
+
+    args = parser.parse_args()
+    store = RatingStore.load(args.store)
+
+    if args.command == 'update':
+        if args.drift is not None and not store.games:
+            store.drift = args.drift
+        while True:
+            applied = 0
+            for path in args.results:
+                new = store.consume(path)
+                applied += new
+                if new or not args.follow:
+                    print(f"{path}: {new} new games")
+            if applied or not args.follow:
+                store.save(args.store)
+                print(f"{store.games} games rated → {args.store}", flush=True)
+            if not args.follow:
+                return 0
+            try:
+                time.sleep(args.follow)
+            except KeyboardInterrupt:
+                return 0
+
+    if args.command == 'show':
+        roles = [args.role] if args.role else list(ROLES)
+        print('\n\n'.join(format_standings(store, role, args.top, not args.all_versions) for role in roles))
+        return 0
+
+    pairings = store.next_pairings(args.n, args.agents, args.per_agent, args.allow_self)
+    if not pairings:
+        print("No pairings: rate some games first or pass --agents")
+        return 1
+    for seek_id, hide_id, value in pairings:
+        print(f"{seek_id}\t{hide_id}\t{value:.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
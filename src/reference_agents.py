@@ -0,0 +1,181 @@
+"""
+Built-in reference agents.
+
+Fixed-strength opponents to benchmark submissions against, selected with
+a ``builtin:`` prefix wherever a student ID is accepted:
+
+  python arena.py --seek builtin:bfs --hide <your_id>
+  python log.py --seek <your_id> --hide builtin:tablebase
+
+Available agents (name: roles):
+  bfs:        pacman  steps along a shortest path to the Ghost
+  evader:     ghost   maximizes the distance Pacman can reach next step
+  tablebase:  both    perfect play of the turn-based game (tablebase.py)
+
+All of them read precomputed tables (the all-pairs distance matrix, the
+solved tablebase) and pick a move with a handful of scalar lookups, so a
+decision takes a few microseconds and never dominates a batch run. The
+tables are built once per map and process.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from agent_interface import GhostAgent, PacmanAgent
+from environment import Move
+from map_graph import CompiledMap, compile_map, successor_move
+from tablebase import Tablebase, solve
+
+
+PREFIX = 'builtin:'
+
+# Sorts after every real distance
+_FAR = np.iinfo(np.int32).max
+
+# Solved tablebases by map key, shared by all agents of the process
+_tablebases: Dict[str, Tablebase] = {}
+
+
+def is_builtin(agent_id: str) -> bool:
+    """True if ``agent_id`` names a built-in agent."""
+    return agent_id.startswith(PREFIX)
+
+
+def get_tablebase(compiled: CompiledMap) -> Tablebase:
+    """Solved tablebase of a map, built on first use."""
+    tb = _tablebases.get(compiled.key)
+    if tb is None:
+        tb = _tablebases[compiled.key] = Tablebase(compiled, solve(compiled))
+    return tb
+
+
+class _MapTables:
+    """Per-map lookups, refreshed only when the agent sees another map."""
+
+    def _tables(self, map_state: np.ndarray) -> CompiledMap:
+        # The arena hands out the same read-only map object every step
+        if map_state is not self._map:
+            self._map = map_state
+            self._compiled = compile_map(map_state)
+            self._distances = self._compiled.distance_matrix()
+        return self._compiled
+
+    def _cells(self, map_state: np.ndarray, my_position: Tuple[int, int],
+               enemy_position: Tuple[int, int]) -> Tuple[int, int]:
+        cell_ids = self._tables(map_state).cell_ids
+        return (cell_ids.item(my_position[0], my_position[1]),
+                cell_ids.item(enemy_position[0], enemy_position[1]))
+
+    def _distance(self, a: int, b: int) -> int:
+        d = self._distances.item(a, b)
+        return _FAR if d < 0 else d
+
+
+class BFSPursuer(_MapTables, PacmanAgent):
+    """Pacman taking a shortest path to the Ghost's current cell."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.name = 'BFS pursuer'
+        self._map = None
+
+    def step(self, map_state: np.ndarray, my_position: Tuple[int, int],
+             enemy_position: Tuple[int, int], step_number: int) -> Move:
+        me, ghost = self._cells(map_state, my_position, enemy_position)
+        successors = self._compiled.neighbor_lists[me]
+        distances = [self._distance(nxt, ghost) for nxt in successors]
+        return successor_move(me, successors, distances.index(min(distances)))
+
+
+class MaxDistanceEvader(_MapTables, GhostAgent):
+    """
+    Ghost maximizing its distance from every cell Pacman can reach next.
+
+    Moves are scored by the minimum maze distance between the Ghost's new
+    cell and Pacman's possible next cells (a one-ply lookahead, so it
+    never steps next to Pacman when it can avoid it), then by the
+    distance from Pacman's current cell, then by the number of exits.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.name = 'Max-distance evader'
+        self._map = None
+
+    def step(self, map_state: np.ndarray, my_position: Tuple[int, int],
+             enemy_position: Tuple[int, int], step_number: int) -> Move:
+        me, pacman = self._cells(map_state, my_position, enemy_position)
+        neighbors = self._compiled.neighbor_lists
+        adjacency = self._compiled.adjacency
+        replies = set(neighbors[pacman])
+        scores: List[Tuple[int, int, int]] = []
+        for nxt in neighbors[me]:
+            nearest = min(self._distance(p, nxt) for p in replies)
+            scores.append((nearest, self._distance(pacman, nxt), len(adjacency[nxt])))
+        return successor_move(me, neighbors[me], scores.index(max(scores)))
+
+
+class _TablebaseAgent(_MapTables):
+    role = ''
+
+    def step(self, map_state: np.ndarray, my_position: Tuple[int, int],
+             enemy_position: Tuple[int, int], step_number: int) -> Move:
+        if map_state is not self._map:
+            self._tb = get_tablebase(self._tables(map_state))
+        return self._tb.best_move(my_position, enemy_position, self.role)
+
+
+class TablebasePacman(_TablebaseAgent, PacmanAgent):
+    """Pacman playing the tablebase's fastest capture."""
+
+    role = 'pacman'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.name = 'Tablebase pacman'
+        self._map = None
+
+
+class TablebaseGhost(_TablebaseAgent, GhostAgent):
+    """Ghost playing the tablebase's longest survival (or escape)."""
+
+    role = 'ghost'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.name = 'Tablebase ghost'
+        self._map = None
+
+
+# Agent classes by name and role
+AGENTS = {
+    'bfs': {'pacman': BFSPursuer},
+    'evader': {'ghost': MaxDistanceEvader},
+    'tablebase': {'pacman': TablebasePacman, 'ghost': TablebaseGhost},
+}
+
+
+def create(agent_id: str, agent_type: str):
+    """
+    Instantiate a built-in agent.
+
+    Args:
+        agent_id: 'builtin:<name>' (or just the name)
+        agent_type: 'pacman' or 'ghost'
+
+    Returns:
+        Agent instance
+
+    Raises:
+        ValueError: If there is no such agent for this role
+    """
+    name = agent_id[len(PREFIX):] if is_builtin(agent_id) else agent_id
+    roles = AGENTS.get(name)
+    if roles is None:
+        raise ValueError(f"Unknown built-in agent '{name}' (available: {', '.join(sorted(AGENTS))})")
+    agent_class = roles.get(agent_type.lower())
+    if agent_class is None:
+        raise ValueError(f"Built-in agent '{name}' has no {agent_type} "
+                       f"(available roles: {', '.join(sorted(roles))})")
+    return agent_class()
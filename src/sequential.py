@@ -0,0 +1,199 @@
+"""
+Sequential stopping rules for batch evaluations.
+
+A pairing does not need a fixed number of games: once one side is clearly
+better, or the win rate is pinned down to the requested precision, more
+games add little. WinRateMonitor watches results as they come in and
+says when to stop, using two rules:
+
+  - SPRT: two of Wald's sequential probability ratio tests on Pacman's
+    score rate p, H0: p = 0.5 against H1: p = 0.5 + delta and against
+    H1: p = 0.5 - delta. Accepting either H1 means that agent is
+    significantly better; accepting both H0s means the agents are even
+    to within delta (error rates alpha and beta).
+  - Precision: the Wilson score interval of p is narrower than
+    +/- precision.
+
+Draws score half a point for each side.
+
+paired_difference() compares two agents that played the same start
+configurations (see log.py --paired).
+"""
+
+import math
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class WinRateMonitor:
+    """
+    Tracks Pacman's score rate in a pairing and decides when to stop.
+    """
+
+    def __init__(self, precision: Optional[float] = 0.05, alpha: float = 0.05,
+                 beta: Optional[float] = None, delta: float = 0.1, min_games: int = 10):
+        """
+        Initialize the monitor.
+
+        Args:
+            precision: Stop once the interval half-width is at most this
+                (None disables the precision rule)
+            alpha: Type I error of the SPRT and 1 - confidence of the interval
+            beta: Type II error of the SPRT (defaults to alpha)
+            delta: Distance from 0.5 of the SPRT hypotheses
+                (None disables the SPRT)
+            min_games: Never stop before this many games
+        """
+        self.precision = precision
+        self.alpha = alpha
+        self.beta = alpha if beta is None else beta
+        self.delta = delta
+        self.min_games = min_games
+        self.z = NormalDist().inv_cdf(1 - alpha / 2)
+
+        self.games = 0
+        self.pacman_wins = 0
+        self.ghost_wins = 0
+        self.draws = 0
+        # Log-likelihood ratios of the "Pacman better" / "Ghost better" tests
+        self.llr_pacman = 0.0
+        self.llr_ghost = 0.0
+        self.decision: Optional[str] = None
+
+        if delta is not None:
+            # Per-game increment for a Pacman win / loss; a draw scores the mean
+            self._pacman_win = math.log((0.5 + delta) / 0.5)
+            self._pacman_loss = math.log((0.5 - delta) / 0.5)
+            self._upper = math.log((1 - self.beta) / alpha)
+            self._lower = math.log(self.beta / (1 - alpha))
+
+    @property
+    def score(self) -> float:
+        """Pacman's score rate (wins + draws / 2) / games."""
+        if not self.games:
+            return 0.5
+        return (self.pacman_wins + 0.5 * self.draws) / self.games
+
+    def update(self, result: str) -> Optional[str]:
+        """
+        Record one game.
+
+        Args:
+            result: 'pacman_wins', 'ghost_wins' or 'draw'
+
+        Returns:
+            The stop decision ('pacman_better', 'ghost_better', 'even' or
+            'precise'), or None to keep playing
+        """
+        self.games += 1
+        if result == 'pacman_wins':
+            self.pacman_wins += 1
+        elif result == 'ghost_wins':
+            self.ghost_wins += 1
+        else:
+            self.draws += 1
+
+        if self.delta is not None:
+            if result == 'pacman_wins':
+                self.llr_pacman += self._pacman_win
+                self.llr_ghost += self._pacman_loss
+            elif result == 'ghost_wins':
+                self.llr_pacman += self._pacman_loss
+                self.llr_ghost += self._pacman_win
+            else:
+                half = 0.5 * (self._pacman_win + self._pacman_loss)
+                self.llr_pacman += half
+                self.llr_ghost += half
+
+        if self.decision is None and self.games >= self.min_games:
+            self.decision = self._decide()
+        return self.decision
+
+    def _decide(self) -> Optional[str]:
+        if self.delta is not None:
+            if self.llr_pacman >= self._upper:
+                return 'pacman_better'
+            if self.llr_ghost >= self._upper:
+                return 'ghost_better'
+            if self.llr_pacman <= self._lower and self.llr_ghost <= self._lower:
+                return 'even'
+        if self.precision is not None:
+            low, high = self.interval()
+            if (high - low) / 2 <= self.precision:
+                return 'precise'
+        return None
+
+    def should_stop(self) -> bool:
+        """True once a stopping rule has fired."""
+        return self.decision is not None
+
+    def interval(self) -> Tuple[float, float]:
+        """
+        Wilson score interval of Pacman's score rate.
+
+        Returns:
+            (low, high) at confidence 1 - alpha
+        """
+        n = self.games
+        if not n:
+            return 0.0, 1.0
+        p, z = self.score, self.z
+        denominator = 1 + z * z / n
+        center = (p + z * z / (2 * n)) / denominator
+        margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+        return max(0.0, center - margin), min(1.0, center + margin)
+
+    def describe(self) -> str:
+        """One-line description of the estimate and the decision."""
+        low, high = self.interval()
+        confidence = (1 - self.alpha) * 100
+        reasons = {
+            'pacman_better': 'Pacman significantly better (SPRT)',
+            'ghost_better': 'Ghost significantly better (SPRT)',
+            'even': f'agents even within ±{self.delta} (SPRT)',
+            'precise': f'interval within ±{self.precision}',
+            None: 'no stopping rule reached',
+        }
+        return (f"Pacman score {self.score:.3f} after {self.games} games, "
+                f"{confidence:g}% CI [{low:.3f}, {high:.3f}] — {reasons[self.decision]}")
+
+
+def paired_difference(scores_a: Sequence[float], scores_b: Sequence[float],
+                      alpha: float = 0.05) -> Dict[str, float]:
+    """
+    Compare two agents scored on the same start configurations.
+
+    Each index is one configuration played by both agents, so start
+    position noise cancels out of the per-configuration differences.
+
+    Args:
+        scores_a: Score of agent A per configuration
+        scores_b: Score of agent B per configuration (same order)
+        alpha: 1 - confidence of the interval
+
+    Returns:
+        Dictionary with 'n', 'mean_a', 'mean_b', 'diff' (A - B), 'low'
+        and 'high' (interval of diff), 'se_paired' and 'se_unpaired'
+        (standard error of diff with and without pairing)
+    """
+    a = np.asarray(scores_a, dtype=np.float64)
+    b = np.asarray(scores_b, dtype=np.float64)
+    n = len(a)
+    diff = a - b
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    se_paired = float(diff.std(ddof=1) / math.sqrt(n)) if n > 1 else math.inf
+    se_unpaired = (float(math.sqrt((a.var(ddof=1) + b.var(ddof=1)) / n))
+                   if n > 1 else math.inf)
+    mean = float(diff.mean()) if n else 0.0
+    return {
+        'n': n,
+        'mean_a': float(a.mean()) if n else 0.0,
+        'mean_b': float(b.mean()) if n else 0.0,
+        'diff': mean,
+        'low': mean - z * se_paired,
+        'high': mean + z * se_paired,
+        'se_paired': se_paired,
+        'se_unpaired': se_unpaired,
+    }
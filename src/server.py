@@ -0,0 +1,483 @@
+"""
+Asyncio arena server hosting many games in one process.
+
+Arena runs one blocking game at a time, with step timeouts raised in
+the agent's thread (deadline.py). The server instead runs each game as an
+asyncio task: both agents live in AgentWorker subprocesses, the event
+loop waits on their pipes with ``loop.add_reader`` and per-step
+deadlines are enforced with ``asyncio.wait_for``, so a slow agent only
+delays its own game.
+
+Clients talk JSON lines over a Unix socket (or TCP). Requests:
+
+  {"op": "match", "seek": "alice", "hide": "bob", "games": 10,
+   "seed": 0, "max_steps": 200, "step_timeout": 3.0}
+  {"op": "status"}
+
+A match request streams back {"event": "accepted", ...}, one
+{"event": "game", ...} per game (same fields as log.py --results) and a
+final {"event": "done", ...} with the totals.
+
+Requests are checked before anything runs: "seek" and "hide" must name a
+submission of the server's submissions directory (a plain folder name)
+or a built-in agent with that role, "games" and "max_steps" are capped,
+and "step_timeout" may lower the server's step timeout but not raise or
+disable it. Invalid requests get {"event": "error", ...}.
+
+Examples:
+  python server.py serve --socket /tmp/arena.sock --max-games 16
+  python server.py submit --socket /tmp/arena.sock --seek alice --hide bob --games 20
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+from time import perf_counter
+from typing import Dict, Optional
+
+import numpy as np
+
+from agent_loader import AgentLoadError, MoveValidator
+from agent_worker import AgentTimeoutError, AgentWorker
+from analytics import game_record
+from environment import Environment
+from fingerprint import list_submissions
+import reference_agents
+
+# Largest values a client may request
+MAX_MATCH_GAMES = 1000
+MAX_STEPS_LIMIT = 10_000
+
+
+async def _readable(conn, timeout: Optional[float]):
+    """Wait until a pipe connection has data, without blocking the loop."""
+    if conn.poll():
+        return
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    fd = conn.fileno()
+    loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+    try:
+        await asyncio.wait_for(ready, timeout)
+    finally:
+        loop.remove_reader(fd)
+
+
+async def _start_worker(worker: AgentWorker, load_timeout: float):
+    worker.spawn()
+    try:
+        await _readable(worker.conn, load_timeout)
+    except asyncio.TimeoutError:
+        worker.close()
+        raise AgentLoadError(f"Timed out loading agent for student {worker.student_id}")
+    worker.wait_ready(0)
+
+
+async def _wait_move(worker: AgentWorker, deadline: Optional[float]):
+    timeout = None if deadline is None else max(0.0, deadline - perf_counter())
+    try:
+        await _readable(worker.conn, timeout)
+    except asyncio.TimeoutError:
+        raise AgentTimeoutError("Agent step exceeded the allowed time")
+    return worker.wait_step(0)
+
+
+async def _timed_move(worker: AgentWorker, started: float, deadline: Optional[float]):
+    """
+    Wait for a worker's move, timing it from the step request.
+
+    Returns:
+        (move, error, seconds): error is the exception raised instead of
+        a move, if any
+    """
+    try:
+        move, error = await _wait_move(worker, deadline), None
+    except Exception as e:
+        move, error = None, e
+    return move, error, perf_counter() - started
+
+
+async def play_game(submissions_dir: str, seek: str, hide: str, seed: int,
+                    max_steps: int = 200, step_timeout: Optional[float] = 3.0,
+                    map_layout: Optional[np.ndarray] = None,
+                    load_timeout: float = 30.0) -> Dict:
+    """
+    Play one game with both agents in worker processes.
+
+    Follows Arena's rules: both agents move from the same state, and an
+    agent that times out, raises or returns an invalid move forfeits
+    (Pacman is checked first).
+
+    Args:
+        submissions_dir: Directory containing student submissions
+        seek: Pacman student ID
+        hide: Ghost student ID
+        seed: Seed for the start positions and the agents' RNGs
+        max_steps: Maximum steps per game
+        step_timeout: Seconds allowed per step (None disables)
+        map_layout: Custom map (default map if None)
+        load_timeout: Seconds allowed to load each agent
+
+    Returns:
+        Game record (see analytics.game_record); 'forfeit' is
+        {'role', 'reason'} when an agent lost by a 'timeout', an 'error'
+        or an 'invalid' move
+    """
+    env = Environment(map_layout=map_layout, max_steps=max_steps)
+    rng = np.random.RandomState(seed)
+    pacman_cells, ghost_cells = env.start_cells()
+    map_state, pacman_pos, ghost_pos = env.reset(
+        tuple(pacman_cells[rng.randint(len(pacman_cells))]),
+        tuple(ghost_cells[rng.randint(len(ghost_cells))]),
+    )
+    validator = MoveValidator(map_state)
+    stats = {
+        'total_steps': 0,
+        'start_positions': (pacman_pos, ghost_pos),
+        'wall_moves': validator.wall_moves,
+        'think_time': {'pacman': 0.0, 'ghost': 0.0},
+        'forfeit': None,
+    }
+    # Separate from rng so the agents' seeds do not shift the start positions
+    agent_seeds = random.Random(seed)
+
+    pacman = AgentWorker(submissions_dir, seek, 'pacman')
+    ghost = AgentWorker(submissions_dir, hide, 'ghost')
+    forfeit = None
+    result = ''
+    try:
+        await asyncio.gather(_start_worker(pacman, load_timeout), _start_worker(ghost, load_timeout))
+        pacman.set_map(map_state, agent_seeds.getrandbits(32), step_timeout)
+        ghost.set_map(map_state, agent_seeds.getrandbits(32), step_timeout)
+
+        game_over = False
+        step = 0
+        while not game_over:
+            step += 1
+            started = perf_counter()
+            deadline = started + step_timeout if step_timeout else None
+            pacman.request_step(pacman_pos, ghost_pos, step)
+            ghost.request_step(ghost_pos, pacman_pos, step)
+            # Wait for both at once so each think time ends when that
+            # agent's move arrives, not after the other agent's
+            replies = await asyncio.gather(_timed_move(pacman, started, deadline),
+                                           _timed_move(ghost, started, deadline))
+
+            moves = {}
+            for (role, worker, position), (move, error, seconds) in zip(
+                    (('pacman', pacman, pacman_pos), ('ghost', ghost, ghost_pos)), replies):
+                stats['think_time'][role] += seconds
+                if forfeit is not None:
+                    continue
+                # Like Arena, any failure (timeout, agent error, invalid
+                # move) forfeits the game
+                if error is not None:
+                    reason = 'timeout' if isinstance(error, AgentTimeoutError) else 'error'
+                else:
+                    try:
+                        validator.validate(move, position, role, worker.student_id)
+                        moves[role] = move
+                        continue
+                    except Exception:
+                        reason = 'invalid'
+                forfeit = {'role': role, 'reason': reason}
+            if forfeit is not None:
+                stats['forfeit'] = forfeit
+                result = 'ghost_wins' if forfeit['role'] == 'pacman' else 'pacman_wins'
+                break
+
+            game_over, result, (map_state, pacman_pos, ghost_pos) = env.step(moves['pacman'], moves['ghost'])
+        stats['total_steps'] = step
+    finally:
+        # close() joins (and may kill) the processes: keep it off the loop
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(loop.run_in_executor(None, pacman.close),
+                             loop.run_in_executor(None, ghost.close))
+
+    return game_record(0, seed, seek, hide, result, stats, env)
+
+
+class MatchServer:
+    """
+    Serves match requests, running up to ``max_games`` games at once.
+    """
+
+    def __init__(self, submissions_dir: str = "../submissions", max_games: int = 8,
+                 step_timeout: Optional[float] = 3.0, max_steps: int = 200,
+                 max_match_games: int = MAX_MATCH_GAMES):
+        """
+        Initialize the server.
+
+        Args:
+            submissions_dir: Directory containing student submissions
+            max_games: Games played concurrently across all matches
+            step_timeout: Default (and longest) seconds allowed per agent
+                step; None disables the limit
+            max_steps: Default maximum steps per game
+            max_match_games: Most games a single match request may ask for
+        """
+        self.submissions_dir = submissions_dir
+        self.max_games = max_games
+        self.max_match_games = max_match_games
+        self.step_timeout = step_timeout
+        self.max_steps = max_steps
+        self._slots = asyncio.Semaphore(max_games)
+        self._match_ids = itertools.count(1)
+        self.active_games = 0
+        self.games_played = 0
+
+    def _check_agent(self, agent_id, agent_type: str):
+        """Raise ValueError unless ``agent_id`` is a known agent that can play ``agent_type``."""
+        if not isinstance(agent_id, str) or not agent_id:
+            raise ValueError(f"invalid agent ID {agent_id!r}")
+        if reference_agents.is_builtin(agent_id):
+            roles = reference_agents.AGENTS.get(agent_id[len(reference_agents.PREFIX):], {})
+            if agent_type not in roles:
+                raise ValueError(f"{agent_id} has no {agent_type} agent")
+            return
+        # Only plain folder names of the submissions directory: an ID is
+        # joined to that directory to find the code to run
+        if ('/' in agent_id or '\\' in agent_id or '..' in agent_id
+                or agent_id not in list_submissions(self.submissions_dir)):
+            raise ValueError(f"unknown agent {agent_id!r}")
+
+    def _parse_match(self, request: Dict) -> Dict:
+        """
+        Validate a match request and fill in the server's defaults.
+
+        Returns:
+            {'seek', 'hide', 'games', 'seed', 'max_steps', 'step_timeout'}
+
+        Raises:
+            ValueError: If a field is missing, of the wrong type or out of range
+        """
+        if 'seek' not in request or 'hide' not in request:
+            raise ValueError("match needs 'seek' and 'hide'")
+        self._check_agent(request['seek'], 'pacman')
+        self._check_agent(request['hide'], 'ghost')
+
+        def integer(name: str, default: int, low: int, high: int) -> int:
+            value = request.get(name, default)
+            if type(value) is not int or not low <= value <= high:
+                raise ValueError(f"'{name}' must be an integer from {low} to {high}")
+            return value
+
+        step_timeout = request.get('step_timeout')
+        if step_timeout is None:
+            step_timeout = self.step_timeout
+        elif (type(step_timeout) not in (int, float) or not step_timeout > 0
+              or (self.step_timeout is not None and step_timeout > self.step_timeout)):
+            raise ValueError(f"'step_timeout' must be a number of seconds above 0"
+                             + (f" and at most {self.step_timeout:g}" if self.step_timeout else ''))
+        return {
+            'seek': request['seek'],
+            'hide': request['hide'],
+            'games': integer('games', 1, 1, self.max_match_games),
+            'seed': integer('seed', 0, 0, 2**32 - 1),
+            'max_steps': integer('max_steps', self.max_steps, 1, MAX_STEPS_LIMIT),
+            'step_timeout': step_timeout,
+        }
+
+    async def _play(self, match: Dict, game: int) -> Dict:
+        async with self._slots:
+            self.active_games += 1
+            try:
+                seed = (match['seed'] + game) % 2**32
+                try:
+                    record = await play_game(
+                        self.submissions_dir, match['seek'], match['hide'], seed,
+                        max_steps=match['max_steps'], step_timeout=match['step_timeout'],
+                    )
+                except Exception as e:
+                    record = {'seed': seed, 'seek': match['seek'], 'hide': match['hide'],
+                              'result': 'error', 'error': str(e)}
+                record['game'] = game
+                self.games_played += 1
+                return record
+            finally:
+                self.active_games -= 1
+
+    async def run_match(self, request: Dict, send):
+        """
+        Play all games of a match request, streaming events to ``send``.
+
+        Args:
+            request: Match request (see module docstring)
+            send: Coroutine function called with each event dictionary
+        """
+        try:
+            settings = self._parse_match(request)
+        except ValueError as e:
+            await send({'event': 'error', 'error': str(e)})
+            return
+        match = next(self._match_ids)
+        games = settings['games']
+        await send({'event': 'accepted', 'match': match, 'games': games})
+
+        totals = {'pacman_wins': 0, 'ghost_wins': 0, 'draw': 0, 'error': 0}
+        tasks = [asyncio.create_task(self._play(settings, game)) for game in range(1, games + 1)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                record = await finished
+                totals[record['result'] if record['result'] in totals else 'error'] += 1
+                await send({'event': 'game', 'match': match, **record})
+        finally:
+            for task in tasks:
+                task.cancel()
+        await send({'event': 'done', 'match': match, **totals})
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one client connection."""
+        async def send(event: Dict):
+            writer.write((json.dumps(event) + '\n').encode())
+            await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    await send({'event': 'error', 'error': 'invalid JSON'})
+                    continue
+                if not isinstance(request, dict):
+                    await send({'event': 'error', 'error': 'request must be a JSON object'})
+                    continue
+                op = request.get('op')
+                if op == 'match':
+                    await self.run_match(request, send)
+                elif op == 'status':
+                    await send({'event': 'status', 'active_games': self.active_games,
+                                'games_played': self.games_played, 'max_games': self.max_games})
+                else:
+                    await send({'event': 'error', 'error': f'unknown op {op!r}'})
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path: Optional[str] = None, host: str = '127.0.0.1',
+                    port: Optional[int] = None):
+        """Listen on a Unix socket, or on TCP host:port, until cancelled."""
+        if port is not None:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            where = f"{host}:{port}"
+        else:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            server = await asyncio.start_unix_server(self.handle_client, socket_path)
+            where = socket_path
+        print(f"Arena server listening on {where} (max {self.max_games} concurrent games)")
+        async with server:
+            await server.serve_forever()
+
+
+async def submit(request: Dict, socket_path: Optional[str] = None, host: str = '127.0.0.1',
+                 port: Optional[int] = None):
+    """
+    Send one request to a server and yield its events until it is done.
+    """
+    if port is not None:
+        reader, writer = await asyncio.open_connection(host, port)
+    else:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        writer.write((json.dumps(request) + '\n').encode())
+        await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            event = json.loads(line)
+            last = event['event'] in ('done', 'status', 'error')
+            yield event
+            if last:
+                return
+    finally:
+        writer.close()
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('serve', 'Run the server'), ('submit', 'Submit a match and print results'),
+                            ('status', 'Show server status')):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('--socket', default='/tmp/pacman_arena.sock',
+                       help='Unix socket path (default: /tmp/pacman_arena.sock)')
+        p.add_argument('--host', default='127.0.0.1', help='TCP host (with --port)')
+        p.add_argument('--port', type=int, help='Use TCP on this port instead of the Unix socket')
+
+    serve_parser = sub.choices['serve']
+    serve_parser.add_argument('--submissions-dir', default='../submissions',
+                              help='Directory containing student submissions')
+    serve_parser.add_argument('--max-games', type=int, default=8,
+                              help='Games played concurrently (default: 8)')
+    serve_parser.add_argument('--step-timeout', type=float, default=3.0,
+                              help='Default and longest seconds per agent step (default: 3.0)')
+    serve_parser.add_argument('--max-match-games', type=int, default=MAX_MATCH_GAMES,
+                              help=f'Most games per match request (default: {MAX_MATCH_GAMES})')
+
+    submit_parser = sub.choices['submit']
+    submit_parser.add_argument('--seek', required=True, help='Student ID for Pacman')
+    submit_parser.add_argument('--hide', required=True, help='Student ID for Ghost')
+    submit_parser.add_argument('--games', type=int, default=10, help='Number of games')
+    submit_parser.add_argument('--seed', type=int, default=0, help='Base seed of the start positions')
+    submit_parser.add_argument('--max-steps', type=int, default=200, help='Maximum steps per game')
+    submit_parser.add_argument('--step-timeout', type=float, help='Seconds per agent step')
+    submit_parser.add_argument('--output', help='Append game records (JSONL) to this file')
+
+    args = parser.parse_args()
+    address = {'socket_path': args.socket, 'host': args.host, 'port': args.port}
+
+    if args.command == 'serve':
+        server = MatchServer(args.submissions_dir, args.max_games, args.step_timeout or None,
+                             max_match_games=args.max_match_games)
+        try:
+            asyncio.run(server.serve(**address))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == 'status':
+        request = {'op': 'status'}
+    else:
+        request = {'op': 'match', 'seek': args.seek, 'hide': args.hide, 'games': args.games,
+                   'seed': args.seed, 'max_steps': args.max_steps}
+        if args.step_timeout is not None:
+            request['step_timeout'] = args.step_timeout
+
+    async def run():
+        out = open(args.output, 'a', encoding='utf-8') if getattr(args, 'output', None) else None
+        try:
+            async for event in submit(request, **address):
+                kind = event.pop('event')
+                if kind == 'game':
+                    print(f"Game {event['game']}: {event['result']}"
+                          + (f" ({event['forfeit']['role']} forfeited: {event['forfeit']['reason']})"
+                             if event.get('forfeit') else ''))
+                    if out is not None:
+                        event.pop('match')
+                        out.write(json.dumps(event) + '\n')
+                else:
+                    print(f"{kind}: {event}")
+        finally:
+            if out is not None:
+                out.close()
+
+    asyncio.run(run())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Per-layout map artifacts shared between processes.
+
+A process pool playing games on one map would otherwise have every
+worker compile the map and run the O(n_cells^2) all-pairs BFS again,
+each holding its own copy of the distance matrix. publish() writes the
+wall mask, cell tables, neighbour table and distance matrix once, as
+.npy files in a directory named after the layout's map_key and the file
+format version; attach() memory-maps them read-only, so all workers
+share the same pages of the page cache and start without recomputing
+anything.
+
+The directory doubles as an on-disk cache: publishing a layout that is
+already there only checks the files exist. The default location is
+private to the user (mode 0700), and attach() checks the format version,
+the shapes and dtypes of the arrays and the map's key before using them,
+so a stale or foreign directory is rejected instead of mis-read.
+
+Usage:
+  path = shared_map.publish(env.map)             # parent
+  compiled = shared_map.attach(path)             # each worker
+  # compile_map(map_state) now returns the shared map in this process
+"""
+
+import json
+import os
+import shutil
+import stat
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from map_graph import MOVES, CompiledMap, compile_map, map_key, register
+
+
+# Arrays of a CompiledMap stored per layout, in file order
+_ARRAYS = ('map', 'coords', 'cell_ids', 'neighbors', 'distances')
+
+# Version of the files' layout; bump it when _ARRAYS or their dtypes change
+FORMAT_VERSION = 1
+
+_MANIFEST = 'manifest.json'
+
+DEFAULT_DIR = os.path.join(
+    tempfile.gettempdir(),
+    f"pacman_shared_maps-{os.getuid() if hasattr(os, 'getuid') else os.getlogin()}",
+)
+
+
+def _check_private(path: Path):
+    """Raise PermissionError unless ``path`` belongs to this user and nobody else can write it."""
+    if not hasattr(os, 'getuid'):
+        return
+    info = path.lstat()
+    if (stat.S_ISLNK(info.st_mode) or info.st_uid != os.getuid()
+            or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)):
+        raise PermissionError(f"Shared map file {path} is not private to this user")
+
+
+def _private_root(root: Path):
+    """Create the parent directory (mode 0700) and check nobody else can write it."""
+    root.mkdir(mode=0o700, parents=True, exist_ok=True)
+    _check_private(root)
+
+
+def _check_arrays(arrays, key: str, path: Path):
+    """
+    Raise ValueError unless the arrays have a CompiledMap's shapes and
+    dtypes and agree with each other.
+
+    The contents are spot-checked in O(n_cells): cell tables are each
+    other's inverse, and the distance matrix is 0 on its diagonal and at
+    most 1 between neighbours. A full check would redo the all-pairs BFS
+    the files exist to avoid; tampering is kept out by the ownership
+    checks instead.
+    """
+    height, width = arrays['map'].shape if arrays['map'].ndim == 2 else (-1, -1)
+    n_cells = len(arrays['coords'])
+    expected = {
+        'map': (np.int8, (height, width)),
+        'coords': (np.int32, (n_cells, 2)),
+        'cell_ids': (np.int32, (height, width)),
+        'neighbors': (np.int32, (n_cells, len(MOVES))),
+        'distances': (np.int32, (n_cells, n_cells)),
+    }
+    for name, (dtype, shape) in expected.items():
+        array = arrays[name]
+        if array.dtype != dtype or array.shape != shape or min(shape) < 0:
+            raise ValueError(f"{path}: {name}.npy is {array.dtype} {array.shape}, "
+                             f"expected {np.dtype(dtype)} {shape}")
+    if map_key(arrays['map']) != key:
+        raise ValueError(f"{path}: map does not match its key {key}")
+    coords, neighbors, distances = arrays['coords'], arrays['neighbors'], arrays['distances']
+    cells = np.arange(n_cells)
+    if (n_cells and (neighbors.min() < 0 or neighbors.max() >= n_cells
+                     or not np.array_equal(arrays['cell_ids'][coords[:, 0], coords[:, 1]], cells))):
+        raise ValueError(f"{path}: cell tables are inconsistent")
+    if n_cells and (distances[cells, cells].any()
+                    or not np.isin(distances[cells[:, None], neighbors], (0, 1)).all()):
+        raise ValueError(f"{path}: distance matrix is inconsistent with the map")
+
+
+def publish(map_state: np.ndarray, directory: Optional[str] = None) -> str:
+    """
+    Write the artifacts of a layout, unless they already exist.
+
+    Args:
+        map_state: 2D numpy array where 1 = wall, 0 = empty
+        directory: Parent directory of the per-layout directories
+            (default: DEFAULT_DIR)
+
+    Returns:
+        Path of the layout's directory (pass it to attach())
+    """
+    root = Path(directory or DEFAULT_DIR)
+    key = map_key(map_state)
+    target = root / f'{key}.v{FORMAT_VERSION}'
+    # Checked before trusting an existing layout: the default location is
+    # a predictable name another user could have created first
+    _private_root(root)
+    if (target / _MANIFEST).exists() and all((target / f'{name}.npy').exists() for name in _ARRAYS):
+        return str(target)
+
+    compiled = compile_map(map_state)
+    arrays = {
+        'map': compiled.map,
+        'coords': compiled.coords,
+        'cell_ids': compiled.cell_ids,
+        'neighbors': compiled.neighbors,
+        'distances': compiled.distance_matrix(),
+    }
+    # Write into a private directory and rename it into place, so readers
+    # never see a half-written layout
+    staging = Path(tempfile.mkdtemp(prefix=f'{key}.', dir=root))
+    try:
+        for name in _ARRAYS:
+            np.save(staging / f'{name}.npy', arrays[name])
+        (staging / _MANIFEST).write_text(json.dumps({'format': FORMAT_VERSION, 'key': key}))
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # Another process published the same layout first
+            if not target.exists():
+                raise
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+    return str(target)
+
+
+def attach(path: str, make_default: bool = True) -> CompiledMap:
+    """
+    Map a published layout into this process without copying it.
+
+    Args:
+        path: Directory returned by publish()
+        make_default: Register the map so compile_map() returns it
+
+    Returns:
+        CompiledMap whose arrays are read-only memory-mapped views
+
+    Raises:
+        ValueError: If the directory was written by another format
+            version or its arrays do not form a valid compiled map
+        PermissionError: If the directory, its parent or its files
+            belong to another user or are writable by others
+    """
+    directory = Path(path)
+    for item in (directory.parent, directory, directory / _MANIFEST,
+                 *(directory / f'{name}.npy' for name in _ARRAYS)):
+        if item.exists():
+            _check_private(item)
+    try:
+        manifest = json.loads((directory / _MANIFEST).read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"{directory}: not a shared map of format version {FORMAT_VERSION}; "
+                         f"publish it again")
+    key = manifest['key']
+    arrays = {name: np.load(directory / f'{name}.npy', mmap_mode='r') for name in _ARRAYS}
+    _check_arrays(arrays, key, directory)
+    compiled = CompiledMap.from_arrays(
+        arrays['map'], arrays['coords'], arrays['cell_ids'], arrays['neighbors'],
+        key=key, distances=arrays['distances'],
+    )
+    if make_default:
+        register(compiled)
+    return compiled
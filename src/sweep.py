@@ -0,0 +1,226 @@
+"""
+Exhaustive start-position sweep.
+
+Environment.reset() draws Pacman's start from the bottom 40% of the map
+and the Ghost's from the top 40%. Instead of sampling (which repeats some
+pairs and misses others), a sweep plays every (Pacman start, Ghost start)
+pair exactly once, or a stratified subset with a fixed number of pairs
+per start distance, spread over a pool of worker processes. The compiled
+map and its distance matrix are published once with shared_map and
+memory-mapped by every worker.
+
+Results are written in the same JSONL format as ``log.py --results``, so
+analytics.py can summarize them; the sweep also prints the summary.
+
+Examples:
+  python sweep.py --seek alice --hide bob --output sweep.jsonl
+  python sweep.py --seek alice --hide bob --stratify 20 --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agent_loader import AgentLoader, AgentLoadError
+from analytics import ResultsSummary, game_record
+from arena import Arena
+from environment import Environment
+from map_graph import compile_map
+import shared_map
+
+
+Start = Tuple[Tuple[int, int], Tuple[int, int]]
+
+
+def start_pairs(env: Environment) -> List[Start]:
+    """
+    Every distinct start configuration reset() can produce.
+
+    Returns:
+        List of (pacman_start, ghost_start) pairs
+    """
+    pacman_cells, ghost_cells = env.start_cells()
+    pacman_cells = [tuple(cell) for cell in pacman_cells.tolist()]
+    ghost_cells = [tuple(cell) for cell in ghost_cells.tolist()]
+    return [(p, g) for p in pacman_cells for g in ghost_cells]
+
+
+def stratified_pairs(env: Environment, per_distance: int, seed: int = 0) -> List[Start]:
+    """
+    A subset of start_pairs() with at most ``per_distance`` pairs for each
+    maze distance between the two starts (unreachable pairs form one more
+    stratum).
+
+    Args:
+        env: Environment defining the map and start areas
+        per_distance: Pairs sampled per distance
+        seed: Seed of the sampling
+
+    Returns:
+        List of (pacman_start, ghost_start) pairs, ordered by distance
+    """
+    pairs = start_pairs(env)
+    compiled = compile_map(env.map)
+    distances = compiled.distance_matrix()
+    strata: Dict[int, List[Start]] = {}
+    for pair in pairs:
+        d = int(distances[compiled.cell_id(pair[0]), compiled.cell_id(pair[1])])
+        strata.setdefault(d, []).append(pair)
+
+    rng = random.Random(seed)
+    selected = []
+    for d in sorted(strata):
+        group = strata[d]
+        selected.extend(group if len(group) <= per_distance else rng.sample(group, per_distance))
+    return selected
+
+
+# Per-process settings, set by _init_worker
+_settings: Dict = {}
+
+
+def _init_worker(settings: Dict):
+    _settings.update(settings)
+    # Agents and validators calling compile_map() get the shared tables
+    shared_map.attach(settings['shared_map'])
+
+
+def _play(task: Tuple[int, Start]) -> Dict:
+    """Play one start configuration in a worker process."""
+    index, (pacman_start, ghost_start) = task
+    s = _settings
+    seed = (s['seed'] + index) % 2**32
+    try:
+        arena = Arena(
+            pacman_id=s['seek'],
+            ghost_id=s['hide'],
+            submissions_dir=s['submissions_dir'],
+            max_steps=s['max_steps'],
+            visualize=False,
+            delay=0,
+            step_timeout=s['step_timeout'],
+            map_layout=s['map_layout'],
+            verbose=False,
+        )
+        arena.load_agents()
+        np.random.seed(seed)
+        random.seed(seed)
+        result, stats = arena.run_game(pacman_start, ghost_start)
+        arena.close()
+        return game_record(index, seed, s['seek'], s['hide'], result, stats, arena.env)
+    except (Exception, SystemExit) as e:
+        return {'game': index, 'seed': seed, 'seek': s['seek'], 'hide': s['hide'],
+                'result': 'error', 'error': str(e),
+                'pacman_start': list(pacman_start), 'ghost_start': list(ghost_start)}
+
+
+def run_sweep(seek: str, hide: str, pairs: List[Start], submissions_dir: str = "../submissions",
+              max_steps: int = 200, step_timeout: Optional[float] = 3.0, seed: int = 0,
+              workers: Optional[int] = None, map_layout: Optional[np.ndarray] = None,
+              output: Optional[str] = None, progress: bool = True) -> ResultsSummary:
+    """
+    Play every start configuration in ``pairs`` once.
+
+    Args:
+        seek: Pacman student ID
+        hide: Ghost student ID
+        pairs: Start configurations (see start_pairs / stratified_pairs)
+        submissions_dir: Directory containing student submissions
+        max_steps: Maximum steps per game
+        step_timeout: Seconds allowed per agent step (None disables)
+        seed: Base seed; game i is seeded with seed + i
+        workers: Worker processes (default: CPU count)
+        map_layout: Custom map (default map if None)
+        output: Write one JSON record per game to this file
+        progress: Print progress
+
+    Returns:
+        ResultsSummary of the sweep
+    """
+    settings = {
+        'seek': seek, 'hide': hide, 'submissions_dir': submissions_dir,
+        'max_steps': max_steps, 'step_timeout': step_timeout, 'seed': seed,
+        'map_layout': map_layout,
+    }
+    map_state = map_layout if map_layout is not None else Environment().map
+    settings['shared_map'] = shared_map.publish(map_state)
+    summary = ResultsSummary(map_state)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(pairs) // (workers * 8))
+    out = open(output, 'w', encoding='utf-8') if output else None
+    try:
+        with mp.Pool(workers, initializer=_init_worker, initargs=(settings,)) as pool:
+            for done, record in enumerate(pool.imap_unordered(_play, enumerate(pairs), chunksize), 1):
+                summary.update([record])
+                if out is not None:
+                    out.write(json.dumps(record) + '\n')
+                if progress and (done % 100 == 0 or done == len(pairs)):
+                    print(f"  {done}/{len(pairs)} starts played", flush=True)
+    finally:
+        if out is not None:
+            out.close()
+    return summary
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--seek', required=True, help='Student ID for the Pacman (seeker) agent, or builtin:<name>')
+    parser.add_argument('--hide', required=True, help='Student ID for the Ghost (hider) agent, or builtin:<name>')
+    parser.add_argument('--submissions-dir', default='../submissions',
+                        help='Directory containing student submissions')
+    parser.add_argument('--max-steps', type=int, default=200, help='Maximum steps per game')
+    parser.add_argument('--step-timeout', type=float, default=3.0,
+                        help='Seconds allowed per agent step (0 disables)')
+    parser.add_argument('--stratify', type=int, metavar='N',
+                        help='Play at most N start pairs per start distance instead of all pairs')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0, help='Base seed (default: 0)')
+    parser.add_argument('--output', help='Write per-game results (JSONL) to this file')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Start cells listed in the report (default: 10)')
+    args = parser.parse_args()
+
+    # Fail fast instead of once per game in every worker
+    loader = AgentLoader(submissions_dir=args.submissions_dir)
+    try:
+        loader.load_agent(args.seek, 'pacman')
+        loader.load_agent(args.hide, 'ghost')
+    except AgentLoadError as e:
+        print(f"✗ {e}")
+        return 1
+
+    env = Environment(max_steps=args.max_steps)
+    all_pairs = start_pairs(env)
+    pairs = stratified_pairs(env, args.stratify, args.seed) if args.stratify else all_pairs
+    print(f"Sweeping {len(pairs)} of {len(all_pairs)} start configurations...")
+
+    start = time.perf_counter()
+    summary = run_sweep(
+        args.seek, args.hide, pairs,
+        submissions_dir=args.submissions_dir,
+        max_steps=args.max_steps,
+        step_timeout=args.step_timeout or None,
+        seed=args.seed,
+        workers=args.workers,
+        output=args.output,
+    )
+    print(f"Done in {time.perf_counter() - start:.1f}s\n")
+    print(summary.format_report(top=args.top))
+    if args.output:
+        print(f"\nPer-game results → {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
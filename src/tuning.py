@@ -0,0 +1,601 @@
+"""
+Self-play tuning of evaluation weights.
+
+Hand-written agents score moves with weighted features (the 23120405
+ghost, for example, maximizes ``dist + 0.3 * free``). Tuning such weights
+with full log.py batches costs a whole Arena game per sample. This module
+plays parameterized versions of those evaluations instead, many games at
+once:
+
+  - VectorEnv steps a batch of games on one map with the compiled
+    neighbour table, so a step for N games is a few NumPy operations.
+  - A policy is a weight vector over FEATURES; each agent takes the move
+    whose resulting cell scores highest for the current state.
+  - A derivative-free optimizer (CMA-ES or SPSA) proposes weight vectors;
+    each generation's candidates are evaluated in parallel on a process
+    pool, all on the same start positions to cut the noise between them.
+  - With --role both, the ghost and the pacman are tuned against each
+    other (self-play): every generation tunes the ghost against the
+    current pacman, then the pacman against the just-updated ghost.
+  - The optimizer state is checkpointed as JSON after every generation,
+    so a run can be stopped and resumed with --resume.
+
+A game's value is the fraction of max_steps the ghost survived (1.0 when
+it is never caught); the ghost maximizes it, the pacman minimizes it.
+
+Examples:
+  python tuning.py --role ghost --generations 20 --checkpoint ghost.json
+  python tuning.py --role both --optimizer spsa --games 512 --workers 4
+  python tuning.py --role both --checkpoint selfplay.json --resume
+"""
+
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from environment import Environment
+from map_graph import compile_map
+import shared_map
+
+
+# Per candidate move: maze distance to the opponent, Manhattan distance to
+# the opponent, exits of the cell reached, and the fraction of cells the
+# mover reaches strictly before the opponent
+FEATURES = ('maze_distance', 'manhattan', 'freedom', 'territory')
+
+ROLES = ('ghost', 'pacman')
+
+# Starting weights: a greedy pursuer, and the 23120405 ghost's evaluation
+DEFAULT_WEIGHTS = {
+    'pacman': [-1.0, 0.0, 0.0, 0.0],
+    'ghost': [0.0, 1.0, 0.3, 0.0],
+}
+
+# Ties between equally scored moves are broken by noise of this size
+_TIE_NOISE = 1e-6
+
+
+class VectorEnv:
+    """
+    A batch of games on one map, stepped together.
+
+    Follows Environment.step(): both agents move at once, a blocked move
+    means staying, Pacman wins when both end on the same cell and the
+    Ghost wins after max_steps.
+
+    Attributes:
+        pacman, ghost: (N,) cell ids of the agents
+        steps: (N,) steps played per game
+        done: (N,) True once a game is over
+        caught: (N,) True where Pacman caught the Ghost
+    """
+
+    def __init__(self, map_state: np.ndarray, max_steps: int = 200):
+        """
+        Args:
+            map_state: 2D numpy array where 1 = wall, 0 = empty
+            max_steps: Steps before the Ghost wins
+        """
+        self.compiled = compile_map(map_state)
+        self.max_steps = max_steps
+        self.neighbors = np.asarray(self.compiled.neighbors)
+        self.coords = np.asarray(self.compiled.coords)
+        n = self.compiled.n_cells
+        distances = np.asarray(self.compiled.distance_matrix(), dtype=np.float32)
+        # Unreachable cells count as very far
+        self.distances = np.where(distances < 0, np.float32(n), distances)
+        self.freedom = (self.neighbors[:, :4] != np.arange(n)[:, None]).sum(axis=1).astype(np.float32)
+        self.reset(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    def reset(self, pacman_cells: np.ndarray, ghost_cells: np.ndarray):
+        """Start one game per (pacman_cells[i], ghost_cells[i]) pair."""
+        self.pacman = np.asarray(pacman_cells, dtype=np.int64).copy()
+        self.ghost = np.asarray(ghost_cells, dtype=np.int64).copy()
+        size = len(self.pacman)
+        self.steps = np.zeros(size, dtype=np.int64)
+        self.done = np.zeros(size, dtype=bool)
+        self.caught = np.zeros(size, dtype=bool)
+
+    def step(self, active: np.ndarray, pacman_moves: np.ndarray, ghost_moves: np.ndarray):
+        """
+        Play one step in the games ``active`` (indices of unfinished games).
+
+        Args:
+            active: Indices of the games to step
+            pacman_moves, ghost_moves: Move indices (map_graph.MOVES order)
+                for those games
+        """
+        pacman = self.neighbors[self.pacman[active], pacman_moves]
+        ghost = self.neighbors[self.ghost[active], ghost_moves]
+        self.pacman[active] = pacman
+        self.ghost[active] = ghost
+        self.steps[active] += 1
+        caught = pacman == ghost
+        self.caught[active] = caught
+        self.done[active] = caught | (self.steps[active] >= self.max_steps)
+
+    def move_features(self, mover: np.ndarray, other: np.ndarray,
+                      territory: bool = True) -> np.ndarray:
+        """
+        FEATURES of every move of ``mover`` against ``other``.
+
+        Args:
+            mover, other: (N,) cell ids
+            territory: Compute the territory feature (O(N * n_cells));
+                left at 0 when False
+
+        Returns:
+            (N, len(MOVES), len(FEATURES)) float32 array
+        """
+        targets = self.neighbors[mover]
+        features = np.zeros(targets.shape + (len(FEATURES),), dtype=np.float32)
+        features[..., 0] = self.distances[targets, other[:, None]]
+        features[..., 1] = np.abs(self.coords[targets] - self.coords[other][:, None, :]).sum(axis=2)
+        features[..., 2] = self.freedom[targets]
+        if territory:
+            mine = self.distances[targets]
+            theirs = self.distances[other][:, None, :]
+            features[..., 3] = (mine < theirs).mean(axis=2)
+        return features
+
+    def value(self) -> np.ndarray:
+        """Per game, the fraction of max_steps the Ghost survived."""
+        return np.where(self.caught, self.steps / self.max_steps, 1.0)
+
+
+def policy_moves(env: VectorEnv, mover: np.ndarray, other: np.ndarray,
+                 weights: Sequence[float], rng: np.random.Generator) -> np.ndarray:
+    """
+    Moves of a linear policy: the highest scoring move per game.
+
+    Args:
+        env: Environment holding the feature tables
+        mover, other: (N,) cell ids of the agent and its opponent
+        weights: One weight per FEATURES entry
+        rng: Generator of the tie-breaking noise
+
+    Returns:
+        (N,) move indices
+    """
+    weights = np.asarray(weights, dtype=np.float32)
+    features = env.move_features(mover, other, territory=bool(weights[3]))
+    scores = features @ weights
+    scores += rng.random(scores.shape, dtype=np.float32) * _TIE_NOISE
+    return scores.argmax(axis=1)
+
+
+def play_batch(env: VectorEnv, pacman_weights: Sequence[float], ghost_weights: Sequence[float],
+               pacman_cells: np.ndarray, ghost_cells: np.ndarray, seed: int = 0) -> np.ndarray:
+    """
+    Play one game per start pair to the end.
+
+    Returns:
+        (N,) game values (see VectorEnv.value)
+    """
+    rng = np.random.default_rng(seed)
+    env.reset(pacman_cells, ghost_cells)
+    while True:
+        active = np.flatnonzero(~env.done)
+        if not len(active):
+            break
+        pacman, ghost = env.pacman[active], env.ghost[active]
+        pacman_moves = policy_moves(env, pacman, ghost, pacman_weights, rng)
+        ghost_moves = policy_moves(env, ghost, pacman, ghost_weights, rng)
+        env.step(active, pacman_moves, ghost_moves)
+    return env.value()
+
+
+# ---------------------------------------------------------------------------
+# Optimizers
+# ---------------------------------------------------------------------------
+
+class CMAES:
+    """
+    Covariance matrix adaptation evolution strategy (maximizing).
+
+    The sampling generator is derived from (seed, generation), so the
+    optimizer is fully described by state() and resumes exactly.
+    """
+
+    def __init__(self, x0: Sequence[float], sigma: float = 0.5,
+                 popsize: Optional[int] = None, seed: int = 0):
+        """
+        Args:
+            x0: Initial mean
+            sigma: Initial step size
+            popsize: Candidates per generation (default: 4 + 3 ln n)
+            seed: Seed of the sampling
+        """
+        n = len(x0)
+        self.n = n
+        self.seed = seed
+        self.popsize = popsize or 4 + int(3 * math.log(n))
+        self.mu = self.popsize // 2
+        weights = math.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1.0 / float((self.weights ** 2).sum())
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0.0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n * n))
+
+        self.mean = np.asarray(x0, dtype=np.float64)
+        self.sigma = sigma
+        self.C = np.eye(n)
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.generation = 0
+        self._y: Optional[np.ndarray] = None
+
+    def _eigen(self) -> Tuple[np.ndarray, np.ndarray]:
+        self.C = (self.C + self.C.T) / 2
+        eigenvalues, B = np.linalg.eigh(self.C)
+        return B, np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+    def ask(self) -> np.ndarray:
+        """Candidates of this generation, one per row."""
+        rng = np.random.default_rng([self.seed, self.generation])
+        B, D = self._eigen()
+        z = rng.standard_normal((self.popsize, self.n))
+        self._y = (z * D) @ B.T
+        return self.mean + self.sigma * self._y
+
+    def tell(self, fitness: Sequence[float]):
+        """Update from the fitness of the candidates returned by ask()."""
+        order = np.argsort(-np.asarray(fitness))[:self.mu]
+        y = self._y[order]
+        y_w = self.weights @ y
+        self.mean = self.mean + self.sigma * y_w
+
+        B, D = self._eigen()
+        c_inv_sqrt_y = B @ ((B.T @ y_w) / D)
+        self.ps = (1 - self.cs) * self.ps + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * c_inv_sqrt_y
+        ps_norm = float(np.linalg.norm(self.ps))
+        hsig = ps_norm / math.sqrt(1 - (1 - self.cs) ** (2 * (self.generation + 1))) / self.chi_n < 1.4 + 2 / (self.n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+        rank_mu = (y * self.weights[:, None]).T @ y
+        self.C = ((1 - self.c1 - self.cmu) * self.C
+                  + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C)
+                  + self.cmu * rank_mu)
+        self.sigma *= math.exp((self.cs / self.damps) * (ps_norm / self.chi_n - 1))
+        self.generation += 1
+        self._y = None
+
+    @property
+    def solution(self) -> np.ndarray:
+        """Current estimate of the best weights."""
+        return self.mean
+
+    def state(self) -> Dict:
+        """JSON-serializable state."""
+        return {
+            'type': 'cma', 'seed': self.seed, 'popsize': self.popsize,
+            'generation': self.generation, 'mean': self.mean.tolist(), 'sigma': self.sigma,
+            'C': self.C.tolist(), 'pc': self.pc.tolist(), 'ps': self.ps.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "CMAES":
+        """Rebuild an optimizer saved with state()."""
+        optimizer = cls(state['mean'], state['sigma'], state['popsize'], state['seed'])
+        optimizer.generation = state['generation']
+        optimizer.C = np.asarray(state['C'])
+        optimizer.pc = np.asarray(state['pc'])
+        optimizer.ps = np.asarray(state['ps'])
+        return optimizer
+
+
+class SPSA:
+    """
+    Simultaneous perturbation stochastic approximation (maximizing).
+
+    Each generation evaluates ``pairs`` pairs of candidates x +/- c_k * delta
+    with random +/-1 directions delta, and steps along the averaged
+    gradient estimate with the standard gain sequences
+    a_k = a / (k + 1 + A)^0.602 and c_k = c / (k + 1)^0.101.
+    """
+
+    def __init__(self, x0: Sequence[float], a: float = 2.0, c: float = 0.2,
+                 pairs: int = 4, seed: int = 0, A: float = 10.0):
+        """
+        Args:
+            x0: Initial weights
+            a: Step size gain
+            c: Perturbation size
+            pairs: Perturbation pairs per generation
+            seed: Seed of the perturbations
+            A: Stability constant of the step size
+        """
+        self.x = np.asarray(x0, dtype=np.float64)
+        self.a = a
+        self.c = c
+        self.pairs = pairs
+        self.seed = seed
+        self.A = A
+        self.generation = 0
+        self._delta: Optional[np.ndarray] = None
+
+    def _ck(self) -> float:
+        return self.c / (self.generation + 1) ** 0.101
+
+    def ask(self) -> np.ndarray:
+        """Candidates of this generation: x + c_k d_i and x - c_k d_i, interleaved."""
+        rng = np.random.default_rng([self.seed, self.generation])
+        self._delta = rng.choice([-1.0, 1.0], size=(self.pairs, len(self.x)))
+        ck = self._ck()
+        candidates = np.empty((2 * self.pairs, len(self.x)))
+        candidates[0::2] = self.x + ck * self._delta
+        candidates[1::2] = self.x - ck * self._delta
+        return candidates
+
+    def tell(self, fitness: Sequence[float]):
+        """Update from the fitness of the candidates returned by ask()."""
+        fitness = np.asarray(fitness, dtype=np.float64)
+        # 1 / delta == delta for +/-1 entries
+        gradient = (((fitness[0::2] - fitness[1::2]) / (2 * self._ck()))[:, None] * self._delta).mean(axis=0)
+        ak = self.a / (self.generation + 1 + self.A) ** 0.602
+        self.x = self.x + ak * gradient
+        self.generation += 1
+        self._delta = None
+
+    @property
+    def solution(self) -> np.ndarray:
+        """Current estimate of the best weights."""
+        return self.x
+
+    def state(self) -> Dict:
+        """JSON-serializable state."""
+        return {
+            'type': 'spsa', 'x': self.x.tolist(), 'a': self.a, 'c': self.c,
+            'pairs': self.pairs, 'seed': self.seed, 'A': self.A, 'generation': self.generation,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "SPSA":
+        """Rebuild an optimizer saved with state()."""
+        optimizer = cls(state['x'], state['a'], state['c'], state['pairs'], state['seed'], state['A'])
+        optimizer.generation = state['generation']
+        return optimizer
+
+
+OPTIMIZERS = {'cma': CMAES, 'spsa': SPSA}
+
+
+def load_optimizer(state: Dict):
+    """Rebuild an optimizer from its state() dictionary."""
+    return OPTIMIZERS[state['type']].from_state(state)
+
+
+# ---------------------------------------------------------------------------
+# Parallel evaluation
+# ---------------------------------------------------------------------------
+
+# Per-process settings and environment, set by _init_worker
+_settings: Dict = {}
+
+
+def _init_worker(settings: Dict):
+    _settings.clear()
+    _settings.update(settings)
+    map_state = shared_map.attach(settings['shared_map']).map
+    _settings['env'] = VectorEnv(map_state, settings['max_steps'])
+
+
+def _evaluate(task: Tuple) -> float:
+    """Mean game value of one weight pairing on the given starts."""
+    pacman_weights, ghost_weights, pacman_cells, ghost_cells, seed = task
+    values = play_batch(_settings['env'], pacman_weights, ghost_weights,
+                        pacman_cells, ghost_cells, seed)
+    return float(values.mean())
+
+
+class Tuner:
+    """
+    Runs the generations of a tuning session and checkpoints them.
+    """
+
+    def __init__(self, roles: Sequence[str], optimizer: str = 'cma', games: int = 256,
+                 max_steps: int = 200, seed: int = 0, workers: Optional[int] = None,
+                 map_layout: Optional[np.ndarray] = None, checkpoint: Optional[str] = None,
+                 initial: Optional[Dict[str, Sequence[float]]] = None, **optimizer_args):
+        """
+        Args:
+            roles: Roles whose weights are tuned ('ghost', 'pacman' or both);
+                a role not tuned keeps its initial weights
+            optimizer: 'cma' or 'spsa'
+            games: Games per candidate evaluation
+            max_steps: Maximum steps per game
+            seed: Seed of the starts, the tie-breaking and the optimizers
+            workers: Worker processes (default: CPU count)
+            map_layout: Custom map (default map if None)
+            checkpoint: JSON file written after every generation
+            initial: Starting weights per role (default: DEFAULT_WEIGHTS)
+            optimizer_args: Extra arguments of the optimizer class
+        """
+        self.roles = list(roles)
+        self.games = games
+        self.max_steps = max_steps
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint = checkpoint
+        self.map_state = map_layout if map_layout is not None else Environment().map
+        self.weights = {role: list(map(float, (initial or {}).get(role, DEFAULT_WEIGHTS[role])))
+                        for role in ROLES}
+        self.optimizers = {
+            role: OPTIMIZERS[optimizer](self.weights[role], seed=seed + i, **optimizer_args)
+            for i, role in enumerate(self.roles)
+        }
+        self.generation = 0
+        self.history: List[Dict] = []
+
+        env = Environment(map_layout=self.map_state, max_steps=max_steps)
+        compiled = compile_map(self.map_state)
+        pacman_cells, ghost_cells = env.start_cells()
+        self._pacman_starts = compiled.cell_ids[pacman_cells[:, 0], pacman_cells[:, 1]]
+        self._ghost_starts = compiled.cell_ids[ghost_cells[:, 0], ghost_cells[:, 1]]
+
+    def _starts(self) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Start pairs and tie-breaking seed shared by a generation's candidates."""
+        rng = np.random.default_rng([self.seed, self.generation, 1])
+        pacman = rng.choice(self._pacman_starts, self.games)
+        ghost = rng.choice(self._ghost_starts, self.games)
+        return pacman, ghost, int(rng.integers(2**31))
+
+    def _tasks(self, role: str, candidates: np.ndarray, starts: Tuple) -> List[Tuple]:
+        tasks = []
+        for weights in candidates:
+            pairing = dict(self.weights, **{role: list(map(float, weights))})
+            tasks.append((pairing['pacman'], pairing['ghost']) + starts)
+        return tasks
+
+    def run(self, generations: int, progress: bool = True) -> Dict[str, List[float]]:
+        """
+        Run generations until ``generations`` have been played in total.
+
+        Returns:
+            The tuned weights per role
+        """
+        settings = {'shared_map': shared_map.publish(self.map_state), 'max_steps': self.max_steps}
+        if self.workers > 1:
+            pool = mp.Pool(self.workers, initializer=_init_worker, initargs=(settings,))
+            evaluate = lambda tasks: pool.map(_evaluate, tasks)
+        else:
+            pool = None
+            _init_worker(settings)
+            evaluate = lambda tasks: [_evaluate(task) for task in tasks]
+
+        try:
+            while self.generation < generations:
+                start = time.perf_counter()
+                starts = self._starts()
+                record = {'generation': self.generation}
+                for role in self.roles:
+                    optimizer = self.optimizers[role]
+                    candidates = optimizer.ask()
+                    # The current solution is evaluated alongside, for the log
+                    values = evaluate(self._tasks(role, np.vstack([candidates, optimizer.solution]), starts))
+                    sign = 1.0 if role == 'ghost' else -1.0
+                    optimizer.tell([sign * v for v in values[:-1]])
+                    self.weights[role] = [float(w) for w in optimizer.solution]
+                    record[role] = {'weights': self.weights[role], 'value': values[-1],
+                                    'best_candidate': float(max(sign * v for v in values[:-1]) * sign)}
+                record['seconds'] = time.perf_counter() - start
+                self.history.append(record)
+                self.generation += 1
+                self.save()
+                if progress:
+                    print(self.describe(record), flush=True)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+        return self.weights
+
+    def describe(self, record: Dict) -> str:
+        """One-line summary of a generation."""
+        parts = [f"gen {record['generation']:>3}"]
+        for role in self.roles:
+            weights = ', '.join(f'{w:+.3f}' for w in record[role]['weights'])
+            parts.append(f"{role} [{weights}] value {record[role]['value']:.3f}")
+        parts.append(f"{record['seconds']:.1f}s")
+        return '  '.join(parts)
+
+    def state(self) -> Dict:
+        """JSON-serializable state of the session."""
+        return {
+            'features': list(FEATURES),
+            'roles': self.roles,
+            'games': self.games,
+            'max_steps': self.max_steps,
+            'seed': self.seed,
+            'generation': self.generation,
+            'weights': self.weights,
+            'optimizers': {role: opt.state() for role, opt in self.optimizers.items()},
+            'history': self.history,
+        }
+
+    def save(self):
+        """Write the checkpoint (atomically), if one is configured."""
+        if not self.checkpoint:
+            return
+        tmp = f'{self.checkpoint}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state(), f, indent=2)
+        os.replace(tmp, self.checkpoint)
+
+    @classmethod
+    def resume(cls, checkpoint: str, workers: Optional[int] = None,
+               map_layout: Optional[np.ndarray] = None) -> "Tuner":
+        """Continue a session from its checkpoint file."""
+        with open(checkpoint, encoding='utf-8') as f:
+            state = json.load(f)
+        tuner = cls(state['roles'], games=state['games'], max_steps=state['max_steps'],
+                    seed=state['seed'], workers=workers, map_layout=map_layout,
+                    checkpoint=checkpoint, initial=state['weights'])
+        tuner.optimizers = {role: load_optimizer(s) for role, s in state['optimizers'].items()}
+        tuner.generation = state['generation']
+        tuner.history = state['history']
+        return tuner
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--role', choices=('ghost', 'pacman', 'both'), default='ghost',
+                        help='Weights to tune (default: ghost)')
+    parser.add_argument('--optimizer', choices=sorted(OPTIMIZERS), default='cma',
+                        help='Derivative-free optimizer (default: cma)')
+    parser.add_argument('--generations', type=int, default=20,
+                        help='Total generations, including resumed ones (default: 20)')
+    parser.add_argument('--games', type=int, default=256,
+                        help='Games per candidate evaluation (default: 256)')
+    parser.add_argument('--max-steps', type=int, default=200, help='Maximum steps per game')
+    parser.add_argument('--sigma', type=float, default=0.5, help='CMA-ES initial step size')
+    parser.add_argument('--popsize', type=int, help='CMA-ES candidates per generation')
+    parser.add_argument('--pairs', type=int, default=4, help='SPSA perturbation pairs per generation')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed (default: 0)')
+    parser.add_argument('--checkpoint', help='JSON checkpoint written after every generation')
+    parser.add_argument('--resume', action='store_true', help='Continue from --checkpoint')
+    args = parser.parse_args()
+
+    if args.resume:
+        if not args.checkpoint or not os.path.exists(args.checkpoint):
+            print("✗ --resume needs an existing --checkpoint file")
+            return 1
+        tuner = Tuner.resume(args.checkpoint, workers=args.workers)
+        print(f"Resuming at generation {tuner.generation}")
+    else:
+        roles = list(ROLES) if args.role == 'both' else [args.role]
+        if args.optimizer == 'cma':
+            optimizer_args = {'sigma': args.sigma, 'popsize': args.popsize}
+        else:
+            optimizer_args = {'pairs': args.pairs}
+        tuner = Tuner(roles, optimizer=args.optimizer, games=args.games, max_steps=args.max_steps,
+                      seed=args.seed, workers=args.workers, checkpoint=args.checkpoint,
+                      **optimizer_args)
+
+    print(f"Features: {', '.join(FEATURES)}")
+    weights = tuner.run(args.generations)
+    print()
+    for role in tuner.roles:
+        print(f"{role}: " + ', '.join(f'{name}={w:.4f}' for name, w in zip(FEATURES, weights[role])))
+    if args.checkpoint:
+        print(f"\nCheckpoint → {args.checkpoint}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""
+Warm arena server for repeated runs.
+
+Every ``python arena.py`` pays for starting the interpreter, importing
+NumPy and the arena modules and compiling the map before the first move.
+When games are launched one after another (run_game.sh in a loop,
+testing an agent by hand), the server pays that once: it preloads
+everything, listens on a Unix socket, and forks a child per request
+that runs arena.main() with the client's arguments. The child starts
+from the preloaded state and loads the student agents itself, so every
+game still gets fresh agent modules and fresh random seeds.
+
+The client side of this module only uses the standard library, so
+``warm_server.py run`` starts in a few milliseconds. The child's stdout
+and stderr are streamed back over the socket, followed by the exit code.
+If an arena source file changed since the server started, the request
+is run by a cold interpreter and the server exits, so the next run
+starts a server with the new code.
+
+Requires fork() and Unix sockets (Linux, macOS).
+
+Examples:
+  python warm_server.py run -- --seek alice --hide bob --no-viz
+  python warm_server.py start
+  python warm_server.py ping
+  python warm_server.py stop
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOCKET = os.path.join(
+    tempfile.gettempdir(), f'pacman_arena_warm-{os.getuid() if hasattr(os, "getuid") else 0}.sock'
+)
+
+# Environment variables forwarded to the child (terminal size and type)
+FORWARDED_ENV = ('TERM', 'COLUMNS', 'LINES')
+
+# Marks the end of a run's output; followed by one byte of exit code
+SENTINEL = b'\0'
+
+
+def _connect(path: str, timeout: Optional[float] = None) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _request(path: str, message: Dict, timeout: Optional[float] = 2.0) -> bytes:
+    """Send one request and return the whole reply."""
+    with _connect(path, timeout) as sock:
+        sock.sendall(json.dumps(message).encode() + b'\n')
+        chunks = []
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return b''.join(chunks)
+            chunks.append(data)
+
+
+def ping(path: str = DEFAULT_SOCKET) -> bool:
+    """True if a server answers on the socket."""
+    try:
+        return _request(path, {'op': 'ping'}) == b'pong\n'
+    except OSError:
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+def _source_mtimes() -> Dict[str, float]:
+    """Modification times of the loaded modules from this directory."""
+    mtimes = {}
+    for module in list(sys.modules.values()):
+        filename = getattr(module, '__file__', None)
+        if filename and os.path.dirname(os.path.abspath(filename)) == SRC_DIR:
+            try:
+                mtimes[filename] = os.stat(filename).st_mtime
+            except OSError:
+                pass
+    return mtimes
+
+
+def _stale(mtimes: Dict[str, float]) -> bool:
+    for filename, mtime in mtimes.items():
+        try:
+            if os.stat(filename).st_mtime != mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def _run_child(conn: socket.socket, request: Dict, cold: bool):
+    """Body of a forked child: run the arena with the client's arguments."""
+    code = 1
+    try:
+        # Undo the server's SIG_IGN, or subprocess and os.system in the
+        # arena could not wait for their children
+        import signal
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+        fd = conn.fileno()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(fd, 1)
+        os.dup2(fd, 2)
+        os.close(devnull)
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = open(1, 'w', buffering=1, closefd=False)
+        sys.stderr = open(2, 'w', buffering=1, closefd=False)
+
+        os.chdir(request.get('cwd') or SRC_DIR)
+        for name in FORWARDED_ENV:
+            os.environ.pop(name, None)
+        os.environ.update(request.get('env', {}))
+        argv = [str(arg) for arg in request.get('argv', [])]
+
+        if cold:
+            code = subprocess.call([sys.executable, os.path.join(SRC_DIR, 'arena.py'), *argv])
+        else:
+            import random
+            import numpy as np
+            import arena
+
+            # The fork copied the server's generator state; reseed from
+            # the OS like a fresh interpreter would
+            np.random.seed()
+            random.seed()
+            sys.argv = ['arena.py', *argv]
+            try:
+                code = arena.main()
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        try:
+            import traceback
+            traceback.print_exc()
+        except BaseException:
+            pass
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.write(1, SENTINEL + bytes([code & 0xFF]))
+        except BaseException:
+            pass
+        os._exit(0)
+
+
+def serve(path: str = DEFAULT_SOCKET):
+    """
+    Preload the arena and serve requests until stopped.
+
+    Args:
+        path: Unix socket to listen on
+    """
+    if not hasattr(os, 'fork'):
+        raise SystemExit("The warm server needs fork(); run arena.py directly")
+    if os.path.exists(path):
+        if ping(path):
+            print(f"Warm server already running on {path}")
+            return
+        os.unlink(path)
+
+    # Everything a run needs before loading the agents
+    import signal
+    import numpy  # noqa: F401
+    import agent_interface  # noqa: F401
+    import arena  # noqa: F401
+    import profiler  # noqa: F401
+    import visualizer  # noqa: F401
+    from environment import Environment
+    from map_graph import compile_map
+    compile_map(Environment().map).distance_matrix()
+    mtimes = _source_mtimes()
+
+    # Children are never waited for
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(16)
+    print(f"Warm server listening on {path} (pid {os.getpid()})", flush=True)
+
+    try:
+        while True:
+            conn, _ = listener.accept()
+            try:
+                conn.settimeout(5.0)
+                with conn.makefile('rb') as f:
+                    request = json.loads(f.readline() or b'{}')
+                conn.settimeout(None)
+            except (OSError, ValueError):
+                conn.close()
+                continue
+
+            op = request.get('op', 'run')
+            if op == 'ping':
+                conn.sendall(b'pong\n')
+                conn.close()
+                continue
+            if op == 'stop':
+                conn.sendall(b'stopping\n')
+                conn.close()
+                break
+
+            stale = _stale(mtimes)
+            if os.fork() == 0:
+                listener.close()
+                _run_child(conn, request, cold=stale)
+            conn.close()
+            if stale:
+                print("Arena sources changed; exiting", flush=True)
+                break
+    finally:
+        listener.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+def start(path: str = DEFAULT_SOCKET, timeout: float = 30.0) -> bool:
+    """
+    Start a detached server unless one is running.
+
+    Returns:
+        True once the server answers
+    """
+    if ping(path):
+        return True
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--socket', path, 'serve'],
+        cwd=SRC_DIR, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if ping(path):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def stop(path: str = DEFAULT_SOCKET) -> bool:
+    """Stop the server. Returns False if none was running."""
+    try:
+        return _request(path, {'op': 'stop'}) == b'stopping\n'
+    except OSError:
+        return False
+
+
+def run(argv: List[str], path: str = DEFAULT_SOCKET, auto_start: bool = True) -> int:
+    """
+    Run one arena invocation on the warm server.
+
+    Args:
+        argv: arena.py arguments
+        path: Server socket
+        auto_start: Start a server if none is running
+
+    Returns:
+        The arena's exit code
+    """
+    try:
+        sock = _connect(path)
+    except OSError:
+        if not auto_start or not start(path):
+            print(f"No warm server on {path}", file=sys.stderr)
+            return 1
+        sock = _connect(path)
+
+    request = {
+        'argv': argv,
+        'cwd': os.getcwd(),
+        'env': {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ},
+    }
+    out = sys.stdout.buffer
+    # The last two bytes may be the sentinel, so hold them back
+    tail = b''
+    with sock:
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            data = tail + data
+            out.write(data[:-2])
+            out.flush()
+            tail = data[-2:]
+    if len(tail) == 2 and tail[:1] == SENTINEL:
+        return tail[1]
+    # The child died without reporting
+    out.write(tail)
+    out.flush()
+    return 1
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                        help=f'Unix socket of the server (default: {DEFAULT_SOCKET})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('serve', help='Run the server in the foreground')
+    sub.add_parser('start', help='Start a background server')
+    sub.add_parser('stop', help='Stop the background server')
+    sub.add_parser('ping', help='Exit 0 if a server is running')
+    run_parser = sub.add_parser('run', help='Run arena.py on the server')
+    run_parser.add_argument('--no-start', action='store_true',
+                            help='Fail instead of starting a server')
+    run_parser.add_argument('arena_args', nargs=argparse.REMAINDER,
+                            help='Arguments for arena.py (after --)')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.socket)
+        return 0
+    if args.command == 'start':
+        return 0 if start(args.socket) else 1
+    if args.command == 'stop':
+        return 0 if stop(args.socket) else 1
+    if args.command == 'ping':
+        return 0 if ping(args.socket) else 1
+
+    arena_args = args.arena_args
+    if arena_args and arena_args[0] == '--':
+        arena_args = arena_args[1:]
+    return run(arena_args, args.socket, auto_start=not args.no_start)
+
+
+if __name__ == '__main__':
+    sys.exit(main())